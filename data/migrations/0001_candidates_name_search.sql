@@ -0,0 +1,11 @@
+-- Поиск кандидатов по ФИО (pg_trgm) и индекс постраничной выдачи списка кандидатов.
+-- Индексы совпадают с объявленными в models.Candidate.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_candidates_created_at_id ON candidates (created_at DESC, id DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_candidates_first_name_trgm ON candidates USING gin (first_name gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_candidates_last_name_trgm ON candidates USING gin (last_name gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_candidates_middle_name_trgm ON candidates USING gin (middle_name gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_candidates_fio_trgm ON candidates
+    USING gin ((last_name || ' ' || first_name || ' ' || coalesce(middle_name, '')) gin_trgm_ops);
@@ -0,0 +1,87 @@
+-- Денормализация company_id в кандидатов и собеседования: списки компании
+-- фильтруются по собственной колонке без соединения с users через creator_id.
+ALTER TABLE candidates ADD COLUMN IF NOT EXISTS company_id uuid REFERENCES companies (id);
+ALTER TABLE interviews ADD COLUMN IF NOT EXISTS company_id uuid REFERENCES companies (id);
+
+-- старая версия приложения, работающая до конца развертывания, вставляет строки без
+-- company_id; триггер заполняет его по создателю, поэтому NOT NULL ниже не ломает
+-- ее вставки. Триггеры удаляются после развертывания (post_deploy/0001)
+CREATE OR REPLACE FUNCTION fill_company_id_from_creator() RETURNS trigger AS $$
+BEGIN
+    IF NEW.company_id IS NULL THEN
+        SELECT u.company_id INTO NEW.company_id FROM users u WHERE u.id = NEW.creator_id;
+    END IF;
+    RETURN NEW;
+END $$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS candidates_fill_company_id ON candidates;
+CREATE TRIGGER candidates_fill_company_id BEFORE INSERT ON candidates
+    FOR EACH ROW EXECUTE FUNCTION fill_company_id_from_creator();
+DROP TRIGGER IF EXISTS interviews_fill_company_id ON interviews;
+CREATE TRIGGER interviews_fill_company_id BEFORE INSERT ON interviews
+    FOR EACH ROW EXECUTE FUNCTION fill_company_id_from_creator();
+
+-- заполнение существующих строк пачками по первичному ключу, каждая пачка в своей
+-- транзакции; вставленные после создания триггеров строки уже заполнены
+DO $$
+DECLARE
+    last_id uuid := '00000000-0000-0000-0000-000000000000';
+    batch_last_id uuid;
+BEGIN
+    LOOP
+        SELECT id INTO batch_last_id
+          FROM (SELECT id FROM candidates WHERE id > last_id ORDER BY id LIMIT 10000) batch
+         ORDER BY id DESC LIMIT 1;
+        EXIT WHEN batch_last_id IS NULL;
+        UPDATE candidates c SET company_id = u.company_id
+          FROM users u
+         WHERE u.id = c.creator_id AND c.company_id IS NULL
+           AND c.id > last_id AND c.id <= batch_last_id;
+        COMMIT;
+        last_id := batch_last_id;
+    END LOOP;
+END $$;
+
+DO $$
+DECLARE
+    last_id uuid := '00000000-0000-0000-0000-000000000000';
+    batch_last_id uuid;
+BEGIN
+    LOOP
+        SELECT id INTO batch_last_id
+          FROM (SELECT id FROM interviews WHERE id > last_id ORDER BY id LIMIT 10000) batch
+         ORDER BY id DESC LIMIT 1;
+        EXIT WHEN batch_last_id IS NULL;
+        UPDATE interviews i SET company_id = u.company_id
+          FROM users u
+         WHERE u.id = i.creator_id AND i.company_id IS NULL
+           AND i.id > last_id AND i.id <= batch_last_id;
+        COMMIT;
+        last_id := batch_last_id;
+    END LOOP;
+END $$;
+
+-- SET NOT NULL сканирует таблицу под эксклюзивной блокировкой, если NOT NULL
+-- не доказан уже проверенным CHECK; VALIDATE проверяет его, не блокируя запись
+ALTER TABLE candidates DROP CONSTRAINT IF EXISTS candidates_company_id_not_null;
+ALTER TABLE candidates ADD CONSTRAINT candidates_company_id_not_null CHECK (company_id IS NOT NULL) NOT VALID;
+ALTER TABLE candidates VALIDATE CONSTRAINT candidates_company_id_not_null;
+ALTER TABLE candidates ALTER COLUMN company_id SET NOT NULL;
+ALTER TABLE candidates DROP CONSTRAINT candidates_company_id_not_null;
+
+ALTER TABLE interviews DROP CONSTRAINT IF EXISTS interviews_company_id_not_null;
+ALTER TABLE interviews ADD CONSTRAINT interviews_company_id_not_null CHECK (company_id IS NOT NULL) NOT VALID;
+ALTER TABLE interviews VALIDATE CONSTRAINT interviews_company_id_not_null;
+ALTER TABLE interviews ALTER COLUMN company_id SET NOT NULL;
+ALTER TABLE interviews DROP CONSTRAINT interviews_company_id_not_null;
+
+-- индексы повторяют фильтр и сортировку списков: company_id = ? AND is_deleted = false ORDER BY created_at DESC, id DESC
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_candidates_company_id_created_at_id
+    ON candidates (company_id, is_deleted, created_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_interviews_company_id_created_at_id
+    ON interviews (company_id, is_deleted, created_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_vacancies_company_id_created_at
+    ON vacancies (company_id, is_deleted, created_at DESC);
+
+-- заменен индексом ix_candidates_company_id_created_at_id
+DROP INDEX CONCURRENTLY IF EXISTS ix_candidates_created_at_id;
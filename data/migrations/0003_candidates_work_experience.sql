@@ -0,0 +1,39 @@
+-- Хранимый стаж кандидата: текущее значение считается как
+-- experience_base + experience_open_count * (CURRENT_DATE - DATE '1970-01-01')
+-- без чтения candidate_work_places.
+ALTER TABLE candidates ADD COLUMN IF NOT EXISTS experience_base integer NOT NULL DEFAULT 0;
+ALTER TABLE candidates ADD COLUMN IF NOT EXISTS experience_open_count integer NOT NULL DEFAULT 0;
+
+-- места работы читаются и пересчитываются по кандидату
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_candidate_work_places_candidate_id
+    ON candidate_work_places (candidate_id);
+
+-- пересчет пачками по первичному ключу, каждая пачка в своей транзакции;
+-- изменения старой версии приложения после него досчитывает post_deploy/0002
+DO $$
+DECLARE
+    last_id uuid := '00000000-0000-0000-0000-000000000000';
+    batch_last_id uuid;
+BEGIN
+    LOOP
+        SELECT id INTO batch_last_id
+          FROM (SELECT id FROM candidates WHERE id > last_id ORDER BY id LIMIT 10000) batch
+         ORDER BY id DESC LIMIT 1;
+        EXIT WHEN batch_last_id IS NULL;
+        UPDATE candidates c
+           SET experience_base = w.base,
+               experience_open_count = w.open_count
+          FROM (SELECT candidate_id,
+                       sum(CASE WHEN work_to IS NULL THEN DATE '1970-01-01' - work_from
+                                ELSE work_to - work_from END) AS base,
+                       count(*) FILTER (WHERE work_to IS NULL) AS open_count
+                  FROM candidate_work_places
+                 WHERE NOT is_deleted
+                   AND candidate_id > last_id AND candidate_id <= batch_last_id
+                 GROUP BY candidate_id) w
+         WHERE w.candidate_id = c.id
+           AND (c.experience_base, c.experience_open_count) IS DISTINCT FROM (w.base, w.open_count);
+        COMMIT;
+        last_id := batch_last_id;
+    END LOOP;
+END $$;
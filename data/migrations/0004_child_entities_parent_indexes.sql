@@ -0,0 +1,12 @@
+-- Дочерние записи читаются (selectinload) и синхронизируются при обновлении
+-- по ключу родителя; без индекса каждый такой запрос сканирует таблицу целиком.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_candidate_contacts_candidate_id
+    ON candidate_contacts (candidate_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_candidate_language_ability_candidate_id
+    ON candidate_language_ability (candidate_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_candidate_notes_candidate_id
+    ON candidate_notes (candidate_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_candidate_skills_candidate_id
+    ON candidate_skills (candidate_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_vacancy_skills_vacancy_id
+    ON vacancy_skills (vacancy_id);
@@ -0,0 +1,4 @@
+-- Индекс подбора кандидатов (vacancies.matching) перед каждым запросом сверяет
+-- max(updated_at) кандидатов компании и дочитывает измененные после него.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_candidates_company_id_updated_at
+    ON candidates (company_id, updated_at);
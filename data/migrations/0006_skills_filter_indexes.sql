@@ -0,0 +1,7 @@
+-- Фильтры списков по навыкам (skills_all/skills_any) проверяют наличие навыка
+-- у каждой строки через EXISTS по паре (skill_id, родитель), а для редкого навыка
+-- планировщик может начать с его списка владельцев.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_candidate_skills_skill_id_candidate_id
+    ON candidate_skills (skill_id, candidate_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_vacancy_skills_skill_id_vacancy_id
+    ON vacancy_skills (skill_id, vacancy_id);
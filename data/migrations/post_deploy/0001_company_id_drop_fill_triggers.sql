@@ -0,0 +1,5 @@
+-- Старая версия приложения остановлена, новая всегда передает company_id сама:
+-- переходные триггеры из 0002 больше не нужны.
+DROP TRIGGER IF EXISTS candidates_fill_company_id ON candidates;
+DROP TRIGGER IF EXISTS interviews_fill_company_id ON interviews;
+DROP FUNCTION IF EXISTS fill_company_id_from_creator();
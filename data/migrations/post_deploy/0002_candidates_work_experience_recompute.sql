@@ -0,0 +1,33 @@
+-- Пересчет хранимого стажа (0003) после развертывания: пока 0003 и развертывание
+-- шли, старая версия приложения меняла места работы без пересчета. Кандидаты
+-- без действующих мест работы получают нулевой стаж, как в candidate_experience_update.
+DO $$
+DECLARE
+    last_id uuid := '00000000-0000-0000-0000-000000000000';
+    batch_last_id uuid;
+BEGIN
+    LOOP
+        SELECT id INTO batch_last_id
+          FROM (SELECT id FROM candidates WHERE id > last_id ORDER BY id LIMIT 10000) batch
+         ORDER BY id DESC LIMIT 1;
+        EXIT WHEN batch_last_id IS NULL;
+        UPDATE candidates c
+           SET experience_base = coalesce(w.base, 0),
+               experience_open_count = coalesce(w.open_count, 0)
+          FROM candidates b
+          LEFT JOIN (SELECT candidate_id,
+                            sum(CASE WHEN work_to IS NULL THEN DATE '1970-01-01' - work_from
+                                     ELSE work_to - work_from END) AS base,
+                            count(*) FILTER (WHERE work_to IS NULL) AS open_count
+                       FROM candidate_work_places
+                      WHERE NOT is_deleted
+                        AND candidate_id > last_id AND candidate_id <= batch_last_id
+                      GROUP BY candidate_id) w ON w.candidate_id = b.id
+         WHERE b.id = c.id
+           AND c.id > last_id AND c.id <= batch_last_id
+           AND (c.experience_base, c.experience_open_count)
+               IS DISTINCT FROM (coalesce(w.base, 0), coalesce(w.open_count, 0));
+        COMMIT;
+        last_id := batch_last_id;
+    END LOOP;
+END $$;
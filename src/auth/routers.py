@@ -10,13 +10,14 @@ from fastapi import (
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import exc as sa_exc
-from sqlalchemy.orm import selectinload
 from sqlalchemy import delete, update
 from sqlalchemy.future import select
 
 from ..service.fastapi_custom import generate_openapi_responses
 from ..service import exceptions as exc
 from ..service import models as m
+from ..service import loaders
+from ..service.passwords import password_hasher
 from .. import config
 from ..service.dependencies import (
     AccessJWTCookie,
@@ -69,7 +70,7 @@ async def login(response: Response,
     В случае успешной аутентификации устанавливает access и refresh токены в куки
     '''
     
-    stmt = select(m.User).where(m.User.username==body.username).limit(1).options(selectinload(m.User.role))
+    stmt = select(m.User).where(m.User.username==body.username).limit(1).options(*loaders.user_auth)
     res = await session.execute(stmt)
     
     try:
@@ -80,7 +81,7 @@ async def login(response: Response,
     if user.fails_count >= config.MAX_AUTH_FAILED_COUNT:
         raise exc.AccountBlockedError
     
-    if user.password != body.password:
+    if not await password_hasher.verify(user.password, body.password):
         stmt = update(m.User).values(fails_count=user.fails_count + 1).where(m.User.id == user.id)
         await session.execute(stmt)
         await session.commit()
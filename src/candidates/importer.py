@@ -0,0 +1,156 @@
+"""
+Пакетный импорт кандидатов из потока NDJSON (по записи candidate.Create на строку).
+Записи проверяются по мере чтения и пишутся пачками через COPY: на пачку
+приходится по одному запросу на таблицу, а не полный набор запросов на кандидата.
+"""
+import json
+import uuid
+import typing as tp
+from uuid import UUID
+
+import asyncpg
+import pydantic as pd
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import exc as sa_exc
+
+from ..skills.repos import SkillsRepo
+from ..service import models as m
+from ..service.pd_models import candidate, skill
+
+
+class ImportRecord(tp.NamedTuple):
+    line: int
+    data: candidate.Create
+
+
+class CandidatesImporter:
+    """
+    Результат по каждой записи отдается строкой NDJSON:
+    {"line": N, "id": ...} или {"line": N, "error": "invalid_request", "detail": ...},
+    последней строкой - итог {"imported": ..., "failed": ...}.
+    Ошибки формата отдаются сразу, результаты записи - после коммита пачки,
+    поэтому порядок строк ответа может не совпадать с порядком строк запроса.
+    """
+
+    def __init__(self, session: AsyncSession, company_id: UUID, initiator_id: UUID, batch_size: int) -> None:
+        self._session = session
+        self._company_id = company_id
+        self._initiator_id = initiator_id
+        self._batch_size = batch_size
+        self.imported = 0
+        self.failed = 0
+
+    async def run(self, lines: tp.AsyncIterator[tp.Tuple[int, tp.Optional[bytes]]]) -> tp.AsyncIterator[bytes]:
+        batch: tp.List[ImportRecord] = []
+        async for line_no, line in lines:
+            if line is None:
+                yield self._error(line_no, 'Line is too long')
+                continue
+            try:
+                data = candidate.Create.parse_raw(line)
+            except pd.ValidationError as e:
+                yield self._error(line_no, json.loads(e.json()))
+                continue
+
+            batch.append(ImportRecord(line_no, data))
+            if len(batch) >= self._batch_size:
+                for result in await self._flush(batch):
+                    yield result
+                batch = []
+
+        if batch:
+            for result in await self._flush(batch):
+                yield result
+        yield self._dumps({'imported': self.imported, 'failed': self.failed})
+
+    async def _flush(self, batch: tp.List[ImportRecord]) -> tp.List[bytes]:
+        results = await self._write(batch)
+        await self._session.commit()
+        return results
+
+    async def _write(self, batch: tp.List[ImportRecord]) -> tp.List[bytes]:
+        '''
+        Пишет пачку в savepoint; если ее отвергла бд, делит пополам, пока
+        ошибка не сведется к конкретным записям
+        '''
+
+        try:
+            async with self._session.begin_nested():
+                ids = await self._insert(batch)
+        except (sa_exc.DBAPIError, asyncpg.PostgresError) as e:
+            if len(batch) == 1:
+                return [self._error(batch[0].line, self._db_error_detail(e))]
+            middle = len(batch) // 2
+            return await self._write(batch[:middle]) + await self._write(batch[middle:])
+
+        self.imported += len(batch)
+        return [self._dumps({'line': record.line, 'id': str(id_)}) for record, id_ in zip(batch, ids)]
+
+    async def _insert(self, batch: tp.List[ImportRecord]) -> tp.List[UUID]:
+        skills_repo = SkillsRepo(self._session)
+        new_skill_ids = await skills_repo.add_many_by_names(
+            self._company_id,
+            (_skill.name for record in batch for _skill in record.data.skills if isinstance(_skill, skill.Create))
+        )
+
+        ids = [uuid.uuid4() for _ in batch]
+        candidates, contacts, work_places, languages, notes, skills = [], [], [], [], [], []
+        for id_, record in zip(ids, batch):
+            data = record.data
+            candidates.append((id_, data.position_id, data.grade_id, data.first_name, data.last_name,
+                               data.middle_name, data.birth_date, data.min_salary, data.adress_code,
+                               data.citizenship_code, data.family_status_code, self._company_id, self._initiator_id))
+            contacts.extend((id_, contact.type_code, contact.value, bool(contact.is_priority), self._initiator_id)
+                            for contact in data.contacts)
+            work_places.extend((id_, place.position, place.company, place.work_from, place.work_to,
+                                bool(place.is_actual), self._initiator_id)
+                               for place in data.work_places)
+            languages.extend((id_, language.language_code, language.language_level_code, self._initiator_id)
+                             for language in data.languages)
+            notes.extend((id_, note.note, self._initiator_id) for note in data.notes)
+            skills.extend((id_, new_skill_ids[_skill.name.capitalize()] if isinstance(_skill, skill.Create)
+                           else _skill.skill_id, self._initiator_id)
+                          for _skill in data.skills)
+
+        await self._copy(m.Candidate,
+                         ('id', 'position_id', 'grade_id', 'first_name', 'last_name', 'middle_name',
+                          'birth_date', 'min_salary', 'adress_code', 'citizenship_code', 'family_status_code',
+                          'company_id', 'creator_id'),
+                         candidates)
+        await self._copy(m.CandidateContact, ('candidate_id', 'type_code', 'value', 'is_priority', 'creator_id'),
+                         contacts)
+        await self._copy(m.CandidateWorkPlace,
+                         ('candidate_id', 'position', 'company', 'work_from', 'work_to', 'is_actual', 'creator_id'),
+                         work_places)
+        await self._copy(m.CandidateLanguageAbility,
+                         ('candidate_id', 'language_code', 'language_level_code', 'creator_id'),
+                         languages)
+        await self._copy(m.CandidateNote, ('candidate_id', 'note', 'creator_id'), notes)
+        await self._copy(m.CandidateSkill, ('candidate_id', 'skill_id', 'creator_id'), skills)
+
+        with_work_places = list({row[0] for row in work_places})
+        if with_work_places:
+            await self._session.execute(m.candidate_experience_update(m.Candidate.id.in_(with_work_places)))
+        return ids
+
+    async def _copy(self, sa_model, columns: tp.Sequence[str], records: tp.List[tuple]) -> None:
+        if not records:
+            return
+        conn = await self._session.connection()
+        raw_conn = await conn.get_raw_connection()
+        await raw_conn.dbapi_connection.driver_connection.copy_records_to_table(
+            sa_model.__tablename__, records=records, columns=columns)
+
+    def _error(self, line: int, detail: tp.Any) -> bytes:
+        self.failed += 1
+        return self._dumps({'line': line, 'error': 'invalid_request', 'detail': detail})
+
+    @staticmethod
+    def _db_error_detail(e: Exception) -> str:
+        # у ошибок, пришедших через sqlalchemy, исходная ошибка asyncpg лежит в __cause__
+        cause = e.orig.__cause__ if isinstance(e, sa_exc.DBAPIError) and e.orig.__cause__ is not None else e
+        return getattr(cause, 'message', None) or str(cause)
+
+    @staticmethod
+    def _dumps(data: dict) -> bytes:
+        return json.dumps(data, ensure_ascii=False).encode() + b'\n'
@@ -1,15 +1,21 @@
 from uuid import UUID
+import datetime as dt
 import typing as tp
 
 from sqlalchemy.orm.decl_api import DeclarativeMeta
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncResult
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.future import select
-from sqlalchemy import delete, update
+from sqlalchemy.sql import Select
+from sqlalchemy import update, tuple_, func, or_, exists, distinct, cast, String
 from sqlalchemy import exc as sa_exc
 
 from ..skills.repos import SkillsRepo
 from ..service import models as m
+from ..service import loaders
+from ..service.children import sync_child_entities
+from ..service.counting import Total, count_total
+from ..service.export import joined
 from ..service.pd_models import (
     candidate,
     skill,
@@ -23,9 +29,9 @@ class CandidatesRepo:
     
     async def get_one(self, id: UUID, company_id: UUID) -> candidate.Read:
         stmt = select(m.Candidate) \
-               .join(m.Candidate.creator) \
+               .options(*loaders.candidate_read) \
                .where(m.Candidate.id == id) \
-               .where(m.User.company_id == company_id) \
+               .where(m.Candidate.company_id == company_id) \
                .where(m.Candidate.is_deleted == False)
                 
         res = await self._session.scalars(stmt)
@@ -36,14 +42,152 @@ class CandidatesRepo:
         
         return candidate.Read.from_orm(candidate_orm)
         
-    async def get_list(self, company_id: UUID, filters: candidate.Filters) -> tp.List[candidate.Read]:
+    async def get_list(self,
+                       company_id: UUID,
+                       filters: candidate.Filters,
+                       limit: int,
+                       after: tp.Optional[tuple] = None
+                       ) -> tp.Tuple[tp.List[candidate.Read], tp.Optional[tuple]]:
+        '''
+        Возвращает страницу кандидатов и ключ для запроса следующей страницы:
+        (created_at, id), при сортировке по стажу - (стаж в днях, created_at, id)
+        '''
         
-        stmt = select(m.Candidate) \
-               .join(m.Candidate.creator) \
-               .where(m.User.company_id == company_id) \
-               .where(m.Candidate.is_deleted == False) \
-               .order_by(m.Candidate.created_at.desc())
+        experience = m.Candidate.work_experience_days
+        stmt = self._filter(select(m.Candidate), company_id, filters) \
+               .options(*loaders.candidate_read) \
+               .limit(limit + 1)
+        
+        if filters.q is not None:
+            # поиск по ФИО упорядочен по релевантности и отдает одну страницу без курсора
+            q = ' '.join(filters.q.split())
+            stmt = stmt.order_by(func.word_similarity(q, m.candidate_fio).desc(),
+                                 m.Candidate.created_at.desc(),
+                                 m.Candidate.id.desc())
+        elif filters.sort is not None:
+            # стаж зависит от текущей даты и не индексируется: сортируются все кандидаты компании,
+            # но по колонкам самой таблицы, без чтения мест работы
+            key = tuple_(experience, m.Candidate.created_at, m.Candidate.id)
+            if filters.sort == '-experience':
+                stmt = stmt.order_by(experience.desc(), m.Candidate.created_at.desc(), m.Candidate.id.desc())
+                if after is not None:
+                    stmt = stmt.filter(key < tuple_(*after))
+            else:
+                stmt = stmt.order_by(experience, m.Candidate.created_at, m.Candidate.id)
+                if after is not None:
+                    stmt = stmt.filter(key > tuple_(*after))
+        else:
+            stmt = stmt.order_by(m.Candidate.created_at.desc(), m.Candidate.id.desc())
+            # seek вместо offset: позиция в списке не влияет на стоимость запроса
+            if after is not None:
+                stmt = stmt.filter(tuple_(m.Candidate.created_at, m.Candidate.id) < tuple_(*after))
+        
+        res = await self._session.scalars(stmt)
+        candidates_orm = res.all()
+        
+        next_key = None
+        if len(candidates_orm) > limit:
+            candidates_orm = candidates_orm[:limit]
+            last = candidates_orm[-1]
+            if filters.q is None:
+                next_key = (last.created_at, last.id) if filters.sort is None \
+                           else (last.work_experience_days, last.created_at, last.id)
         
+        return [candidate.Read.from_orm(candidate_orm) for candidate_orm in candidates_orm], next_key
+    
+    async def count(self, company_id: UUID, filters: candidate.Filters, exact_limit: int) -> Total:
+        '''
+        Количество кандидатов, подходящих под фильтры, без учета страниц
+        '''
+        
+        stmt = self._filter(select(m.Candidate.id), company_id, filters)
+        return await count_total(self._session, stmt, exact_limit)
+
+    async def export(self, company_id: UUID, filters: candidate.Filters, batch_size: int) -> AsyncResult:
+        '''
+        Кандидаты по фильтрам get_list для выгрузки: строка на кандидата, справочники
+        развернуты в названия, дочерние записи собраны в строки.
+        Результат читается из серверного курсора пачками по batch_size
+        '''
+
+        candidate_id = m.Candidate.id
+        contacts = select(joined(m.ContactTypeRef.value + ': ' + m.CandidateContact.value,
+                                 m.CandidateContact.is_priority.desc(), m.CandidateContact.created_at)) \
+                   .select_from(m.CandidateContact) \
+                   .join(m.ContactTypeRef, m.ContactTypeRef.code == m.CandidateContact.type_code) \
+                   .where(m.CandidateContact.candidate_id == candidate_id) \
+                   .where(m.CandidateContact.is_deleted == False)
+        work_places = select(joined(func.concat(m.CandidateWorkPlace.position, ', ', m.CandidateWorkPlace.company,
+                                                ' (', m.CandidateWorkPlace.work_from, ' - ',
+                                                func.coalesce(cast(m.CandidateWorkPlace.work_to, String), 'н.в.'), ')'),
+                                    m.CandidateWorkPlace.work_from.desc())) \
+                      .where(m.CandidateWorkPlace.candidate_id == candidate_id) \
+                      .where(m.CandidateWorkPlace.is_deleted == False)
+        languages = select(joined(m.LanguageRef.value + ' (' + m.LanguageLevelRef.level_code + ')', m.LanguageRef.value)) \
+                    .select_from(m.CandidateLanguageAbility) \
+                    .join(m.LanguageRef, m.LanguageRef.code == m.CandidateLanguageAbility.language_code) \
+                    .join(m.LanguageLevelRef, m.LanguageLevelRef.code == m.CandidateLanguageAbility.language_level_code) \
+                    .where(m.CandidateLanguageAbility.candidate_id == candidate_id) \
+                    .where(m.CandidateLanguageAbility.is_deleted == False)
+        skills = select(joined(distinct(m.Skill.name), m.Skill.name)) \
+                 .select_from(m.CandidateSkill) \
+                 .join(m.Skill, m.Skill.id == m.CandidateSkill.skill_id) \
+                 .where(m.CandidateSkill.candidate_id == candidate_id) \
+                 .where(m.CandidateSkill.is_deleted == False)
+        notes = select(joined(m.CandidateNote.note, m.CandidateNote.created_at, separator='\n')) \
+                .where(m.CandidateNote.candidate_id == candidate_id) \
+                .where(m.CandidateNote.is_deleted == False)
+
+        stmt = select(candidate_id.label('id'),
+                      m.Candidate.last_name,
+                      m.Candidate.first_name,
+                      m.Candidate.middle_name,
+                      m.Candidate.birth_date,
+                      m.Position.name.label('position'),
+                      m.Grade.name.label('grade'),
+                      m.Candidate.min_salary,
+                      m.Candidate.work_experience_days.label('work_experience_days'),
+                      m.AdressRef.value.label('adress'),
+                      m.CountryRef.value.label('citizenship'),
+                      m.FamilyStatusRef.value.label('family_status'),
+                      contacts.scalar_subquery().label('contacts'),
+                      work_places.scalar_subquery().label('work_places'),
+                      languages.scalar_subquery().label('languages'),
+                      skills.scalar_subquery().label('skills'),
+                      notes.scalar_subquery().label('notes'),
+                      m.Candidate.created_at) \
+               .select_from(m.Candidate) \
+               .join(m.Position, m.Position.id == m.Candidate.position_id) \
+               .join(m.Grade, m.Grade.id == m.Candidate.grade_id) \
+               .outerjoin(m.AdressRef, m.AdressRef.code == m.Candidate.adress_code) \
+               .outerjoin(m.CountryRef, m.CountryRef.code == m.Candidate.citizenship_code) \
+               .outerjoin(m.FamilyStatusRef, m.FamilyStatusRef.code == m.Candidate.family_status_code)
+        stmt = self._filter(stmt, company_id, filters)
+
+        # порядок как в get_list; при поиске по q - без сортировки по релевантности
+        experience = m.Candidate.work_experience_days
+        if filters.sort == '-experience':
+            stmt = stmt.order_by(experience.desc(), m.Candidate.created_at.desc(), m.Candidate.id.desc())
+        elif filters.sort == 'experience':
+            stmt = stmt.order_by(experience, m.Candidate.created_at, m.Candidate.id)
+        else:
+            stmt = stmt.order_by(m.Candidate.created_at.desc(), m.Candidate.id.desc())
+
+        return await self._session.stream(stmt.execution_options(yield_per=batch_size))
+
+    def _filter(self, stmt: Select, company_id: UUID, filters: candidate.Filters) -> Select:
+        '''
+        Условия списка без сортировки и страниц, общие для get_list, count и export
+        '''
+        
+        experience = m.Candidate.work_experience_days
+        stmt = stmt.where(m.Candidate.company_id == company_id) \
+                   .where(m.Candidate.is_deleted == False)
+        
+        if filters.q is not None:
+            q = ' '.join(filters.q.split())
+            stmt = stmt.filter(or_(m.candidate_fio.op('%>')(q),
+                                   m.candidate_fio.ilike(f'%{self._escape_like(q)}%', escape='\\')))
         if filters.first_name is not None:
             stmt = stmt.filter(m.Candidate.first_name.ilike(f'%{filters.first_name}%'))
         if filters.last_name is not None:
@@ -60,15 +204,35 @@ class CandidatesRepo:
             stmt = stmt.filter(m.Candidate.min_salary >= filters.salary_from)
         if filters.salary_to is not None:
             stmt = stmt.filter(m.Candidate.min_salary <= filters.salary_to)
-        
-        res = await self._session.scalars(stmt)
-        candidates_orm = res.all()
-        return [candidate.Read.from_orm(candidate_orm) for candidate_orm in candidates_orm]
+        # наличие навыков проверяется по индексам candidate_skills, без просмотра всех его строк
+        if filters.skills_any:
+            stmt = stmt.filter(exists().where(m.CandidateSkill.candidate_id == m.Candidate.id)
+                                       .where(m.CandidateSkill.skill_id.in_(filters.skills_any)))
+        if filters.skills_all:
+            # группировка вместо EXISTS на каждый навык: оценка числа строк после нее мала,
+            # и планировщик выбирает поиск по первичному ключу, а не просмотр всей компании
+            skill_ids = set(filters.skills_all)
+            stmt = stmt.filter(m.Candidate.id.in_(
+                select(m.CandidateSkill.candidate_id)
+                .where(m.CandidateSkill.skill_id.in_(skill_ids))
+                .group_by(m.CandidateSkill.candidate_id)
+                .having(func.count(distinct(m.CandidateSkill.skill_id)) == len(skill_ids))
+            ))
+        # полные годы стажа считаются как в total_work_expirience: дни // 365
+        if filters.experience_from is not None:
+            stmt = stmt.filter(experience >= filters.experience_from * 365)
+        if filters.experience_to is not None:
+            stmt = stmt.filter(experience < (filters.experience_to + 1) * 365)
+        return stmt
+    
+    @staticmethod
+    def _escape_like(value: str) -> str:
+        return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
     
     async def delete(self, id: UUID, company_id: UUID) -> UUID:
-        # TODO: check company id
         stmt = update(m.Candidate) \
                .where(m.Candidate.id == id) \
+               .where(m.Candidate.company_id == company_id) \
                .where(m.Candidate.is_deleted == False) \
                .values(is_deleted=True) \
                .returning(m.Candidate.id)
@@ -89,6 +253,7 @@ class CandidatesRepo:
         # добавляем данные в таблицу кандидата
         candidate_data = pd_model.dict_candidate_only()
         candidate_data['creator_id'] = initiator_id
+        candidate_data['company_id'] = company_id
         
         stmt = insert(m.Candidate).values(candidate_data).returning(m.Candidate.id)
         res = await self._session.execute(stmt)
@@ -110,6 +275,7 @@ class CandidatesRepo:
         await self._add_child_entities(initiator_id, candidate_id, existing_skills, m.CandidateSkill)
         await self._add_child_entities(initiator_id, candidate_id, pd_model.contacts, m.CandidateContact)
         await self._add_child_entities(initiator_id, candidate_id, pd_model.work_places, m.CandidateWorkPlace)
+        await self._session.execute(m.candidate_experience_update(m.Candidate.id == candidate_id))
         await self._add_child_entities(initiator_id, candidate_id, pd_model.languages, m.CandidateLanguageAbility)
         await self._add_child_entities(initiator_id, candidate_id, pd_model.notes, m.CandidateNote)
         return candidate_id
@@ -141,6 +307,7 @@ class CandidatesRepo:
         stmt = update(m.Candidate) \
                .values(candidate_data) \
                .where(m.Candidate.id == candidate_id) \
+               .where(m.Candidate.company_id == company_id) \
                .where(m.Candidate.is_deleted == False) \
                .returning(m.Candidate.id) 
 
@@ -162,30 +329,10 @@ class CandidatesRepo:
         await self._update_child_entities(initiator_id, candidate_id, existing_skills, m.CandidateSkill)
         await self._update_child_entities(initiator_id, candidate_id, pd_model.contacts, m.CandidateContact)
         await self._update_child_entities(initiator_id, candidate_id, pd_model.work_places, m.CandidateWorkPlace)
+        await self._session.execute(m.candidate_experience_update(m.Candidate.id == candidate_id))
         await self._update_child_entities(initiator_id, candidate_id, pd_model.languages, m.CandidateLanguageAbility)
         await self._update_child_entities(initiator_id, candidate_id, pd_model.notes, m.CandidateNote)
         return candidate_id
         
     async def _update_child_entities(self, initiator_id: UUID, candidate_id: UUID, entities_list, sa_model: DeclarativeMeta):
-        # удаляем все записи, которых нет в списке полученных
-        entities_ids = [entity.id for entity in entities_list if entity.id is not None]
-        stmt = delete(sa_model) \
-               .where(sa_model.id.not_in(entities_ids)) \
-               .where(sa_model.candidate_id == candidate_id)
-               
-        await self._session.execute(stmt)
-        
-        if not entities_list:
-            return 
-        
-        # вставляем новые записи и обновляем страые
-        for entity in entities_list:
-            entity_dict = entity.dict(exclude_none=True)
-            entity_dict['creator_id'] = initiator_id
-            entity_dict['candidate_id'] = candidate_id
-            stmt = insert(sa_model) \
-                   .values(**entity_dict) \
-                   .on_conflict_do_update(index_elements=[sa_model.id],
-                                          where=(sa_model.candidate_id == candidate_id),
-                                          set_=entity_dict)
-            await self._session.execute(stmt)
+        await sync_child_entities(self._session, sa_model, sa_model.candidate_id, candidate_id, initiator_id, entities_list)
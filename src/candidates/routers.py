@@ -1,17 +1,27 @@
-import datetime as dt
 from uuid import UUID
 from fastapi import (
     APIRouter,
     Depends,
-    Query
+    Query,
+    Request
 )
+from fastapi.responses import StreamingResponse
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import exc as sa_exc
 
 from ..service.fastapi_custom import generate_openapi_responses
+from ..service.responses import ModelResponse
 from ..service import exceptions as exc
 from ..service.roles import Roles
+from ..service.pagination import KeysetCursor
+from ..service.export import CSV_MEDIA_TYPE, export_response
+from ..service.ndjson import (
+    MEDIA_TYPE as NDJSON_MEDIA_TYPE,
+    iter_file,
+    iter_lines,
+    spool
+)
 from ..service.dependencies import (
     AccessJWTCookie,
     CheckRoles,
@@ -22,6 +32,8 @@ from ..service.tokens import (
 )
 
 from .repos import CandidatesRepo
+from .importer import CandidatesImporter
+from .. import config
 from . import schemas as sch
 
 
@@ -56,6 +68,73 @@ async def create(body: sch.Create.Request.Body,
     return sch.Create.Response.Body(id=candidate_id)
 
 
+@router.post('/import',
+             name='Импорт кандидатов',
+             responses=generate_openapi_responses(
+                 exc.InvalidTokenError,
+                 exc.ExpiredTokenError,
+                 exc.InvalidClientError,
+                 exc.AccessDenied
+                 ),
+             response_class=StreamingResponse,
+             dependencies=[Depends(CheckRoles(Roles.manager, Roles.recruiter, Roles.admin))],
+             openapi_extra={
+                 'requestBody': {
+                     'required': True,
+                     'content': {NDJSON_MEDIA_TYPE: {'schema': {'type': 'string', 'format': 'binary'}}}
+                     }
+                 }
+             )
+async def import_candidates(request: Request,
+                            session: AsyncSession = Depends(get_session),
+                            at: AccessToken = Depends(AccessJWTCookie())):
+    '''
+    Импорт кандидатов из NDJSON: по одной записи в формате POST /candidates на строку <br>
+    Ответ - NDJSON с результатом по каждой строке: {"line": N, "id": ...} или
+    {"line": N, "error": ..., "detail": ...}, последней строкой - {"imported": ..., "failed": ...} <br>
+    Записи сохраняются пачками, при обрыве соединения уже сохраненные пачки остаются в бд
+    '''
+    
+    importer = CandidatesImporter(session, at.company_id, at.user_id, config.CANDIDATES_IMPORT_BATCH_SIZE)
+    lines = iter_lines(request.stream(), config.CANDIDATES_IMPORT_MAX_LINE_BYTES)
+    results = await spool(importer.run(lines), config.CANDIDATES_IMPORT_RESULTS_MEMORY_BYTES)
+    return StreamingResponse(iter_file(results), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.get('/export',
+            name='Выгрузка кандидатов',
+            responses=generate_openapi_responses(
+                exc.InvalidRequestError,
+                exc.InvalidTokenError,
+                exc.ExpiredTokenError,
+                exc.InvalidClientError
+                ),
+            response_class=StreamingResponse,
+            dependencies=[Depends(CheckRoles(Roles.manager, Roles.recruiter, Roles.admin, Roles.customer))],
+            openapi_extra={
+                'responses': {
+                    '200': {'content': {CSV_MEDIA_TYPE: {'schema': {'type': 'string', 'format': 'binary'}},
+                                        NDJSON_MEDIA_TYPE: {'schema': {'type': 'string', 'format': 'binary'}}}}
+                    }
+                }
+            )
+async def export(query: Query = Depends(sch.Export.Request.Query),
+                 session: AsyncSession = Depends(get_session),
+                 at: AccessToken = Depends(AccessJWTCookie())):
+    '''
+    Выгрузка всех кандидатов компании по фильтрам списка, без страниц <br>
+    Строка на кандидата: справочники - названиями, контакты, места работы, языки, навыки
+    и заметки - одной ячейкой через "; " (заметки - через перевод строки) <br>
+    Ответ передается по мере чтения из бд, объем выгрузки не ограничен
+    '''
+    
+    candidates_repo = CandidatesRepo(session)
+    result = await candidates_repo.export(company_id=at.company_id,
+                                          filters=query,
+                                          batch_size=config.EXPORT_BATCH_SIZE)
+    return export_response(session, result, query.format, 'candidates')
+
+
 @router.patch('/{id}',
              name='Обновление данных кандидата',
              responses=generate_openapi_responses(
@@ -110,16 +189,8 @@ async def get_one(id: UUID,
         candidate = await candidates_repo.get_one(id, at.company_id)
     except sa_exc.NoResultFound:
         raise exc.InvalidClientError
-    
-    # TODO: перенести в sql
-    # подсчет общего стажа работы кандидата
-    total_exp = 0
-    for place in candidate.work_places:
-        exp = (place.work_to or dt.datetime.now()) - place.work_from
-        total_exp += exp.days
-    candidate.total_work_expirience = f'{total_exp // 365} {total_exp % 365 // 30}'
         
-    return sch.GetOne.Response.Body(**candidate.dict())
+    return ModelResponse(candidate)
 
 
 @router.get('',
@@ -137,20 +208,32 @@ async def get_list(query: Query = Depends(sch.GetList.Request.Query),
                    session: AsyncSession = Depends(get_session),
                    at: AccessToken = Depends(AccessJWTCookie())):
     '''
-    Получение списка кандидатов в текущей компании с фильтрами и сортировкой
+    Получение списка кандидатов в текущей компании с фильтрами и сортировкой <br>
+    Для получения следующей страницы передайте next_cursor из ответа в параметре cursor <br>
+    При поиске по q кандидаты упорядочены по схожести ФИО с запросом, выдача ограничена limit <br>
+    Общий стаж (work_experience_days, total_work_expirience) считается на текущую дату <br>
+    С with_total=true в ответе есть total: точное количество до порога, выше него - оценка (total_is_exact=false)
     '''
     
+    try:
+        key_size = 2 if query.sort is None else 3
+        after = KeysetCursor.decode(query.cursor, key_size) if query.cursor is not None else None
+    except ValueError:
+        raise exc.InvalidRequestError
+    
     candidates_repo = CandidatesRepo(session)
-    candidates = await candidates_repo.get_list(company_id=at.company_id, filters=query)
-    # TODO: перенести в sql
-    # подсчет общего стажа работы кандидата
-    for candidate in candidates:
-        total_exp = 0
-        for place in candidate.work_places:
-            exp = (place.work_to or dt.datetime.now()) - place.work_from
-            total_exp += exp.days
-        candidate.total_work_expirience = f'{total_exp // 365} {total_exp % 365 // 30}'
-    return sch.GetList.Response.Body(candidates=candidates, count=len(candidates))
+    candidates, next_key = await candidates_repo.get_list(company_id=at.company_id,
+                                                          filters=query,
+                                                          limit=query.limit,
+                                                          after=after)
+    next_cursor = KeysetCursor.encode(*next_key) if next_key is not None else None
+    body = sch.GetList.Response.Body.construct(candidates=candidates, count=len(candidates), next_cursor=next_cursor)
+    if query.with_total:
+        total = await candidates_repo.count(company_id=at.company_id,
+                                            filters=query,
+                                            exact_limit=config.LIST_EXACT_COUNT_LIMIT)
+        body.total, body.total_is_exact = total.value, total.is_exact
+    return ModelResponse(body)
 
 
 @router.delete('/{id}',
@@ -3,7 +3,8 @@ import typing as tp
 
 from pydantic import BaseModel, Field
 
-from ..service.pd_models import candidate
+from ..service.fastapi_custom import query_lists
+from ..service.pd_models import candidate, pagination, export
 
 
 class Create:
@@ -24,13 +25,24 @@ class GetOne:
 
 class GetList:
     class Request:
-        class Query(candidate.Filters):
+        @query_lists
+        class Query(pagination.Params, candidate.Filters):
             ...
     
     class Response:
         class Body(BaseModel):
             candidates: tp.List[candidate.Read] = Field(default_factory=list)
             count: int
+            next_cursor: tp.Optional[str]
+            total: tp.Optional[int] = Field(None, description='Всего кандидатов по фильтрам, если запрошено with_total')
+            total_is_exact: tp.Optional[bool] = Field(None, description='false - total является оценкой')
+
+
+class Export:
+    class Request:
+        @query_lists
+        class Query(export.Params, candidate.Filters):
+            ...
 
 
 class Update:
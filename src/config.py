@@ -19,6 +19,19 @@ class PostgresEnv(BaseEnv):
     DB: str
     HOST: str
     PORT: str
+    # пул соединений одного воркера: при N воркерах до
+    # N * (POOL_SIZE + MAX_OVERFLOW) соединений, что должно укладываться в max_connections
+    POOL_SIZE: int = 10
+    MAX_OVERFLOW: int = 10
+    # сколько секунд ждать свободного соединения перед ошибкой
+    POOL_TIMEOUT: float = 30
+    # пересоздавать соединения старше заданного числа секунд (-1 - никогда)
+    POOL_RECYCLE: int = 1800
+    POOL_PRE_PING: bool = True
+    # кэш подготовленных выражений asyncpg на соединение (0 - для pgbouncer в режиме transaction)
+    STATEMENT_CACHE_SIZE: int = 100
+    # ожидание соединения дольше порога (секунды) пишется в лог
+    POOL_WAIT_LOG_THRESHOLD: float = 0.1
 
     class Config:
         env_prefix = 'POSTGRES_'
@@ -41,6 +54,48 @@ ACCESS_TOKEN_NAME = 'at'
 REFRESH_TOKEN_NAME = 'rt'
 
 ACCESS_TOKEN_LIFETIME = dt.timedelta(minutes=15)
+ACCESS_TOKEN_CACHE_SIZE = 10000
 REFRESH_TOKEN_LIFETIME = dt.timedelta(days=1)
 
 MAX_AUTH_FAILED_COUNT = 5
+
+# гистограммы по маршрутам и счетчик запросов в обработке (service.instrumentation)
+INSTRUMENTATION_ENABLED = os.environ.get('INSTRUMENTATION_ENABLED', 'true').lower() in ('1', 'true')
+# заголовок Server-Timing раскрывает клиенту время работы с бд, по умолчанию выключен
+SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', 'false').lower() in ('1', 'true')
+# период замера задержки цикла событий, секунды
+EVENT_LOOP_LAG_INTERVAL = 0.5
+# общий секрет для /metrics (Authorization: Bearer <токен>), без него метрики не отдаются
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+# загружать ли при старте демонстрационные данные из service/mocks.py
+SEED_MOCKS = os.environ.get('SEED_MOCKS', 'false').lower() in ('1', 'true')
+REFS_SQL_PATH = './data/refs.sql'
+MIGRATIONS_PATH = './data/migrations'
+
+# размер пула потоков для хэширования и проверки паролей
+PASSWORD_HASHING_WORKERS = int(os.environ.get('PASSWORD_HASHING_WORKERS', 2))
+
+# импорт кандидатов из NDJSON: записей в одной пачке COPY, предельная длина строки
+# и объем результатов, после которого они сбрасываются во временный файл
+CANDIDATES_IMPORT_BATCH_SIZE = int(os.environ.get('CANDIDATES_IMPORT_BATCH_SIZE', 1000))
+CANDIDATES_IMPORT_MAX_LINE_BYTES = 1024 * 1024
+CANDIDATES_IMPORT_RESULTS_MEMORY_BYTES = 1024 * 1024
+
+# кэш id навыков по имени (skills.cache): записей на процесс и время жизни записи, секунды
+SKILLS_CACHE_SIZE = int(os.environ.get('SKILLS_CACHE_SIZE', 50000))
+SKILLS_CACHE_TTL = 3600
+
+# индекс подбора кандидатов на вакансию (vacancies.matching): компаний на процесс,
+# период полной перестройки (секунды) и запас при дочитывании изменений
+# на транзакции, закоммиченные позже своего начала
+MATCHES_INDEX_COMPANIES = int(os.environ.get('MATCHES_INDEX_COMPANIES', 16))
+MATCHES_INDEX_TTL = 600
+MATCHES_INDEX_OVERLAP = dt.timedelta(seconds=10)
+
+# общее количество записей в постраничных списках (service.counting): до порога
+# считается точно, выше него отдается оценка планировщика
+LIST_EXACT_COUNT_LIMIT = int(os.environ.get('LIST_EXACT_COUNT_LIMIT', 10000))
+
+# выгрузка списков (service.export): строк в одной пачке серверного курсора
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
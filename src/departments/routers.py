@@ -1,7 +1,8 @@
 from uuid import UUID
 from fastapi import (
     APIRouter,
-    Depends
+    Depends,
+    Request
 )
 
 from sqlalchemy.dialects.postgresql import insert as _insert
@@ -11,6 +12,13 @@ from sqlalchemy.future import select as _select
 from sqlalchemy import delete as _delete
 
 from ..service.fastapi_custom import generate_openapi_responses
+from ..service.etag import (
+    make_rows_etag,
+    is_not_modified,
+    not_modified_response,
+    set_etag_headers
+)
+from ..service.responses import ModelResponse
 from ..service.pd_models import department
 from ..service import exceptions as exc
 from ..service import models as m
@@ -37,13 +45,24 @@ router = APIRouter(tags=['departments'], prefix='/departments')
                 ),
             response_model=sch.GetList.Response.Body
             )
-async def get_list(session: AsyncSession = Depends(get_session),
+async def get_list(request: Request,
+                   session: AsyncSession = Depends(get_session),
                    at: AccessToken = Depends(AccessJWTCookie())):
     
-    stmt = _select(m.Department).where(m.Department.company_id == at.company_id)
-    res = await session.scalars(stmt)
-    departments = [department.Read.from_orm(orm_model) for orm_model in res.all()]
-    return sch.GetList.Response.Body(departments=departments)
+    stmt = _select(m.Department.id, m.Department.name) \
+           .where(m.Department.company_id == at.company_id) \
+           .order_by(m.Department.name, m.Department.id)
+    rows = (await session.execute(stmt)).all()
+    
+    # ETag считается по строкам, поэтому на 304 модели ответа не строятся
+    etag = make_rows_etag(rows)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    
+    departments = [department.Read.from_orm(row) for row in rows]
+    response = ModelResponse(sch.GetList.Response.Body.construct(departments=departments))
+    set_etag_headers(response, etag)
+    return response
 
 
 @router.post('',
@@ -1,7 +1,8 @@
 from uuid import UUID
 from fastapi import (
     APIRouter,
-    Depends
+    Depends,
+    Request
 )
 
 from sqlalchemy.dialects.postgresql import insert as _insert
@@ -11,7 +12,14 @@ from sqlalchemy import delete as _delete
 from sqlalchemy.orm import exc as sa_exc
 
 from ..service.fastapi_custom import generate_openapi_responses
+from ..service.etag import (
+    make_rows_etag,
+    is_not_modified,
+    not_modified_response,
+    set_etag_headers
+)
 from ..service import exceptions as exc
+from ..service.responses import ModelResponse
 from ..service.pd_models import grade
 from ..service import models as m
 from ..service.dependencies import (
@@ -37,13 +45,24 @@ router = APIRouter(tags=['grades'], prefix='/grades')
                  ),
              response_model=sch.GetList.Response.Body
              )
-async def get_list(session: AsyncSession = Depends(get_session),
+async def get_list(request: Request,
+                   session: AsyncSession = Depends(get_session),
                    at: AccessToken = Depends(AccessJWTCookie())):
     
-    stmt = _select(m.Grade).where(m.Grade.company_id == at.company_id)
-    res = await session.scalars(stmt)
-    grades = [grade.Read.from_orm(orm_model) for orm_model in res.all()]
-    return sch.GetList.Response.Body(grades=grades)
+    stmt = _select(m.Grade.id, m.Grade.name) \
+           .where(m.Grade.company_id == at.company_id) \
+           .order_by(m.Grade.name, m.Grade.id)
+    rows = (await session.execute(stmt)).all()
+    
+    # ETag считается по строкам, поэтому на 304 модели ответа не строятся
+    etag = make_rows_etag(rows)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    
+    grades = [grade.Read.from_orm(row) for row in rows]
+    response = ModelResponse(sch.GetList.Response.Body.construct(grades=grades))
+    set_etag_headers(response, etag)
+    return response
 
 
 @router.post('',
@@ -0,0 +1,102 @@
+from uuid import UUID
+import typing as tp
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from ..service import models as m
+from ..service.pd_models import (
+    interview,
+    candidate,
+    vacancy,
+    position,
+    department,
+    grade,
+    interview_stage_ref,
+    vacancy_priority_ref
+)
+
+
+class InterviewsRepo:
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def get_list(self, company_id: UUID, filters: interview.Filters) -> tp.List[interview.Summary]:
+        # для списка выбираются только нужные колонки одним запросом,
+        # полные графы кандидата и вакансии отдает только get_one
+        stmt = select(m.Interview.id,
+                      m.Interview.creator_id,
+                      m.Interview.created_at,
+                      m.InterviewStageRef.code.label('stage_code'),
+                      m.InterviewStageRef.value.label('stage_value'),
+                      m.InterviewStageRef.parent_id.label('stage_parent_id'),
+                      m.Candidate.id.label('candidate_id'),
+                      m.Candidate.first_name.label('candidate_first_name'),
+                      m.Candidate.last_name.label('candidate_last_name'),
+                      m.Candidate.middle_name.label('candidate_middle_name'),
+                      m.Vacancy.id.label('vacancy_id'),
+                      m.Vacancy.status_code.label('vacancy_status_code'),
+                      m.Vacancy.salary_from.label('vacancy_salary_from'),
+                      m.Vacancy.salary_to.label('vacancy_salary_to'),
+                      m.Vacancy.deadline.label('vacancy_deadline'),
+                      m.Position.id.label('position_id'),
+                      m.Position.name.label('position_name'),
+                      m.Department.id.label('department_id'),
+                      m.Department.name.label('department_name'),
+                      m.Grade.id.label('grade_id'),
+                      m.Grade.name.label('grade_name'),
+                      m.VacancyPriorityRef.code.label('priority_code'),
+                      m.VacancyPriorityRef.value.label('priority_value')) \
+               .select_from(m.Interview) \
+               .join(m.Interview.stage) \
+               .join(m.Interview.candidate) \
+               .join(m.Interview.vacancy) \
+               .join(m.Vacancy.position) \
+               .join(m.Vacancy.department) \
+               .join(m.Vacancy.priority) \
+               .outerjoin(m.Vacancy.grade) \
+               .where(m.Interview.is_deleted == False) \
+               .where(m.Interview.company_id == company_id) \
+               .order_by(m.Interview.created_at.desc(), m.Interview.id.desc())
+
+        if filters.creator_id:
+            stmt = stmt.filter(m.Interview.creator_id == filters.creator_id)
+        if filters.vacancy_id:
+            stmt = stmt.filter(m.Interview.vacancy_id == filters.vacancy_id)
+        if filters.candidate_id:
+            stmt = stmt.filter(m.Interview.candidate_id == filters.candidate_id)
+        if filters.stage_code:
+            stmt = stmt.filter(m.Interview.stage_code == filters.stage_code)
+        if filters.vacancy_priority_code:
+            stmt = stmt.filter(m.Vacancy.priority_code == filters.vacancy_priority_code)
+        if filters.vacancy_deadline_from:
+            stmt = stmt.filter(m.Vacancy.deadline >= filters.vacancy_deadline_from)
+        if filters.vacancy_deadline_to:
+            stmt = stmt.filter(m.Vacancy.deadline <= filters.vacancy_deadline_to)
+
+        res = await self._session.execute(stmt)
+        return [self._to_summary(row) for row in res.all()]
+
+    @staticmethod
+    def _to_summary(row) -> interview.Summary:
+        return interview.Summary(
+            id=row.id,
+            creator_id=row.creator_id,
+            created_at=row.created_at,
+            stage=interview_stage_ref.Read(code=row.stage_code,
+                                           value=row.stage_value,
+                                           parent_id=row.stage_parent_id),
+            candidate=candidate.Summary(id=row.candidate_id,
+                                        first_name=row.candidate_first_name,
+                                        last_name=row.candidate_last_name,
+                                        middle_name=row.candidate_middle_name),
+            vacancy=vacancy.Summary(id=row.vacancy_id,
+                                    position=position.Read(id=row.position_id, name=row.position_name),
+                                    department=department.Read(id=row.department_id, name=row.department_name),
+                                    grade=grade.Read(id=row.grade_id, name=row.grade_name) if row.grade_id is not None else None,
+                                    priority=vacancy_priority_ref.Read(code=row.priority_code, value=row.priority_value),
+                                    status_code=row.vacancy_status_code,
+                                    salary_from=row.vacancy_salary_from,
+                                    salary_to=row.vacancy_salary_to,
+                                    deadline=row.vacancy_deadline)
+        )
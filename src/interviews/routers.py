@@ -12,9 +12,11 @@ from sqlalchemy import update as _update
 from sqlalchemy import exc as sa_exc
 
 from ..service.fastapi_custom import generate_openapi_responses
+from ..service.responses import ModelResponse
 from ..service import exceptions as exc
 from ..service.roles import Roles
 from ..service import models as m
+from ..service import loaders
 from ..service.dependencies import (
     AccessJWTCookie,
     CheckRoles,
@@ -28,6 +30,7 @@ from ..service.tokens import (
     AccessToken,
 )
 
+from .repos import InterviewsRepo
 from . import schemas as sch
 
 
@@ -48,31 +51,13 @@ router = APIRouter(tags=['interviews'], prefix='/interviews')
 async def get_list(query: Query = Depends(sch.GetList.Request.Query),
                    session: AsyncSession = Depends(get_session),
                    at: AccessToken = Depends(AccessJWTCookie())):
+    '''
+    Список собеседований в сокращенном виде, полные данные кандидата и вакансии - в GET /interviews/{id}
+    '''
     
-    stmt = _select(m.Interview) \
-           .join(m.Interview.creator) \
-           .join(m.Interview.vacancy) \
-           .where(m.Interview.is_deleted == False) \
-           .where(m.User.company_id == at.company_id)
-    
-    if query.creator_id:
-        stmt = stmt.filter(m.Interview.creator_id == query.creator_id)
-    if query.vacancy_id:
-        stmt = stmt.filter(m.Interview.vacancy_id == query.vacancy_id)
-    if query.candidate_id:
-        stmt = stmt.filter(m.Interview.candidate_id == query.candidate_id)
-    if query.stage_code:
-        stmt = stmt.filter(m.Interview.stage_code == query.stage_code)
-    if query.vacancy_priority_code:
-        stmt = stmt.filter(m.Vacancy.priority_code == query.priority_code)
-    if query.vacancy_deadline_from:
-        stmt = stmt.filter(m.Vacancy.deadline >= query.vacancy_deadline_from)
-    if query.vacancy_deadline_to:
-        stmt = stmt.filter(m.Vacancy.deadline <= query.vacancy_deadline_to)
-    
-    res = await session.scalars(stmt)
-    interviews = [interview.Read.from_orm(orm_model) for orm_model in res.all()]
-    return sch.GetList.Response.Body(interviews=interviews)
+    interviews_repo = InterviewsRepo(session)
+    interviews = await interviews_repo.get_list(company_id=at.company_id, filters=query)
+    return ModelResponse(sch.GetList.Response.Body.construct(interviews=interviews))
 
 
 @router.get('/{interview_id}',
@@ -91,8 +76,8 @@ async def get_one(interview_id: UUID,
                   at: AccessToken = Depends(AccessJWTCookie())):
     
     stmt = _select(m.Interview) \
-           .join(m.Interview.creator) \
-           .where(m.User.company_id == at.company_id) \
+           .options(*loaders.interview_read) \
+           .where(m.Interview.company_id == at.company_id) \
            .where(m.Interview.id == interview_id) \
            .where(m.Interview.is_deleted == False)
     
@@ -100,7 +85,7 @@ async def get_one(interview_id: UUID,
         interview_orm = (await session.scalars(stmt)).one()
     except sa_exc.NoResultFound:
         raise exc.InvalidClientError
-    return sch.Get.Response.Body.from_orm(interview_orm)
+    return ModelResponse(sch.Get.Response.Body.from_orm(interview_orm))
 
 
 @router.post('',
@@ -120,6 +105,7 @@ async def create(body: sch.Create.Request.Body,
     
     data_dict = body.dict()
     data_dict['creator_id'] = at.user_id
+    data_dict['company_id'] = at.company_id
     data_dict['stage_code'] = 1
     
     stmt = _insert(m.Interview).values(**data_dict).returning(m.Interview.id)
@@ -148,6 +134,7 @@ async def delete(interview_id: UUID,
     stmt = _update(m.Interview) \
            .values(is_deleted=True) \
            .where(m.Interview.id == interview_id) \
+           .where(m.Interview.company_id == at.company_id) \
            .where(m.Interview.is_deleted == False) \
            .returning(m.Interview.id)
            
@@ -214,14 +201,15 @@ async def get_stage_results_list(interview_id: UUID,
                                  at: AccessToken = Depends(AccessJWTCookie())):
     
     stmt = _select(m.InterviewStageResult) \
-           .join(m.Interview.creator) \
+           .options(*loaders.interview_stage_result_read) \
+           .join(m.InterviewStageResult.interview) \
            .where(m.InterviewStageResult.interview_id == interview_id) \
            .where(m.InterviewStageResult.is_deleted == False) \
-           .where(m.User.company_id == at.company_id)
+           .where(m.Interview.company_id == at.company_id)
 
     res = await session.scalars(stmt)
     stage_results = [interview_stage_result.Read.from_orm(orm_model) for orm_model in res.all()]
-    return sch.GetStageResultsList.Response.Body(stage_results=stage_results)
+    return ModelResponse(sch.GetStageResultsList.Response.Body.construct(stage_results=stage_results))
 
 
 @router.get('/{interview_id}/stage-results/{stage_result_id}',
@@ -241,18 +229,19 @@ async def get_stage_result(interview_id: UUID,
                            at: AccessToken = Depends(AccessJWTCookie())):
     
     stmt = _select(m.InterviewStageResult) \
-           .join(m.Interview.creator) \
+           .options(*loaders.interview_stage_result_read) \
+           .join(m.InterviewStageResult.interview) \
            .where(m.InterviewStageResult.id == stage_result_id) \
            .where(m.InterviewStageResult.interview_id == interview_id) \
            .where(m.InterviewStageResult.is_deleted == False) \
-           .where(m.User.company_id == at.company_id)
+           .where(m.Interview.company_id == at.company_id)
     
     try:
         interview_stage_result_orm = (await session.scalars(stmt)).one()
     except sa_exc.NoResultFound:
         raise exc.InvalidClientError
     
-    return sch.GetStageResult.Response.Body.from_orm(interview_stage_result_orm)
+    return ModelResponse(sch.GetStageResult.Response.Body.from_orm(interview_stage_result_orm))
 
 
 @router.delete('/{interview_id}/stage-results/{stage_result_id}',
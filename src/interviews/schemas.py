@@ -12,7 +12,7 @@ class GetList:
             
     class Response:
         class Body(BaseModel):
-            interviews: tp.List[interview.Read]
+            interviews: tp.List[interview.Summary]
             
             
 class GetStageResultsList:        
@@ -13,7 +13,11 @@ from .grades.routers import router as grades_router
 from .users.routers import router as users_router
 from .refs.routers import router as refs_router
 from .auth.routers import router as auth_router
+from .metrics.routers import router as metrics_router
 from .service import events
+from .service import instrumentation
+from .service.database import engine
+from . import config
 from .service.fastapi_custom import (
     CustomHTTPException,
     CustomOpenAPIGenerator
@@ -41,6 +45,7 @@ def get_app() -> FastAPI:
     app.include_router(router=users_router, prefix='/api/v1')
     app.include_router(router=refs_router, prefix='/api/v1')
     app.include_router(router=auth_router, prefix='/api/v1')
+    app.include_router(router=metrics_router)
     app.add_event_handler('shutdown', events.on_shutdown)
     app.add_event_handler('startup', events.on_startup)
     app.add_middleware(
@@ -50,6 +55,8 @@ def get_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"]
     )
+    if config.INSTRUMENTATION_ENABLED:
+        instrumentation.install(app, engine, server_timing=config.SERVER_TIMING_ENABLED)
     app.openapi = CustomOpenAPIGenerator(app)
     return app
 
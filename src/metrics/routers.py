@@ -0,0 +1,80 @@
+from fastapi import (
+    APIRouter,
+    Depends,
+    Response
+)
+
+from ..service.database import engine
+from .. import config
+from ..config import postgres_env
+from ..service.dependencies import AccessJWTCookie, CheckBearerToken
+from ..service.metrics import (
+    CONTENT_TYPE,
+    Exposition,
+    route_histograms,
+    db_histograms,
+    loop_histograms,
+    in_flight_requests,
+    loop_lag_monitor
+)
+from ..refs.cache import refs_cache
+from ..skills.cache import skills_cache
+from ..vacancies.matching import match_indexes
+
+
+router = APIRouter(tags=['metrics'])
+
+HISTOGRAMS_HELP = {
+    'http_request_duration_seconds': 'Время обработки запроса целиком',
+    'http_request_db_duration_seconds': 'Суммарное время sql-запросов за один http-запрос',
+    'http_request_db_queries': 'Количество sql-запросов за один http-запрос',
+    'http_request_handler_duration_seconds': 'Время работы функции обработчика',
+    'http_request_serialize_duration_seconds': 'Время сериализации ответа',
+    'db_pool_wait_seconds': 'Время ожидания соединения из пула',
+    'event_loop_lag_seconds': 'Задержка цикла событий',
+}
+
+
+@router.get('/metrics',
+            include_in_schema=False,
+            dependencies=[Depends(CheckBearerToken(config.METRICS_TOKEN))])
+async def get_metrics() -> Response:
+    """
+    Метрики процесса в текстовом формате Prometheus.
+    Каждый воркер отдает только свои значения, поэтому опрашивать нужно
+    каждый экземпляр напрямую, а не через балансировщик.
+    Доступ - по токену METRICS_TOKEN в заголовке Authorization: Bearer.
+    """
+    exposition = Exposition()
+
+    exposition.histograms(route_histograms, HISTOGRAMS_HELP)
+    exposition.gauge('http_requests_in_flight', 'Запросы в обработке', in_flight_requests.value)
+
+    pool = engine.pool
+    exposition.gauge('db_pool_size', 'Размер пула соединений', pool.size())
+    exposition.gauge('db_pool_max_overflow', 'Допустимое число соединений сверх размера пула', postgres_env.MAX_OVERFLOW)
+    exposition.gauge('db_pool_checked_in', 'Свободные соединения в пуле', pool.checkedin())
+    exposition.gauge('db_pool_checked_out', 'Выданные соединения', pool.checkedout())
+    # пока пул не заполнен, overflow() отрицателен
+    exposition.gauge('db_pool_overflow', 'Соединения сверх размера пула', max(pool.overflow(), 0))
+    exposition.histograms(db_histograms, HISTOGRAMS_HELP)
+
+    exposition.gauge('event_loop_lag_seconds_last', 'Последний замер задержки цикла событий', loop_lag_monitor.lag.value)
+    exposition.histograms(loop_histograms, HISTOGRAMS_HELP)
+
+    token_cache = AccessJWTCookie.cache.stats()
+    exposition.counter('access_token_cache_hits_total', 'Попадания в кэш access-токенов', token_cache['hits'])
+    exposition.counter('access_token_cache_misses_total', 'Промахи кэша access-токенов', token_cache['misses'])
+    exposition.gauge('access_token_cache_size', 'Записи в кэше access-токенов', token_cache['size'])
+    skills = skills_cache.stats()
+    exposition.counter('skills_cache_hits_total', 'Попадания в кэш навыков', skills['hits'])
+    exposition.counter('skills_cache_misses_total', 'Промахи кэша навыков', skills['misses'])
+    exposition.gauge('skills_cache_size', 'Записи в кэше навыков', skills['size'])
+    matches = match_indexes.stats()
+    exposition.gauge('match_index_companies', 'Компании в индексе подбора кандидатов', matches['companies'])
+    exposition.gauge('match_index_candidates', 'Кандидаты в индексе подбора', matches['candidates'])
+    exposition.counter('match_index_builds_total', 'Полные построения индекса подбора', matches['builds'])
+    exposition.counter('match_index_refreshes_total', 'Дочитывания изменений в индекс подбора', matches['refreshes'])
+    exposition.gauge('refs_cache_version', 'Количество загрузок кэша справочников', refs_cache.version)
+
+    return Response(content=exposition.render(), media_type=CONTENT_TYPE)
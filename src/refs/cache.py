@@ -0,0 +1,114 @@
+import asyncio
+import json
+import typing as tp
+
+import pydantic as pd
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from ..service import models as m
+from ..service.etag import make_etag
+from ..service.responses import dumps
+
+from . import schemas as sch
+
+
+class CachedRef(tp.NamedTuple):
+    content: bytes
+    etag: str
+
+
+class RefSource(tp.NamedTuple):
+    sa_model: tp.Any
+    response_schema: tp.Type[pd.BaseModel]
+    item_schema: tp.Type[pd.BaseModel]
+    field: str
+
+
+class RefsCache:
+    """
+    Кэш справочников внутри процесса.
+    Справочники меняются только при загрузке refs.sql, поэтому все таблицы
+    читаются одним проходом и хранятся уже сериализованными в json.
+    """
+
+    sources: tp.Dict[str, RefSource] = {
+        'roles': RefSource(m.RoleRef, sch.GetRolesResponse, sch.RoleRef, 'roles'),
+        'vacancy-priorities': RefSource(m.VacancyPriorityRef, sch.GetRefsResponse, sch.Ref, 'data'),
+        'addresses': RefSource(m.AdressRef, sch.GetRefsResponse, sch.Ref, 'data'),
+        'countries': RefSource(m.CountryRef, sch.GetRefsResponse, sch.Ref, 'data'),
+        'family-stats': RefSource(m.FamilyStatusRef, sch.GetRefsResponse, sch.Ref, 'data'),
+        'contact-types': RefSource(m.ContactTypeRef, sch.GetRefsResponse, sch.Ref, 'data'),
+        'languages': RefSource(m.LanguageRef, sch.GetRefsResponse, sch.Ref, 'data'),
+        'language-levels': RefSource(m.LanguageLevelRef, sch.GetRefsResponse, sch.Ref, 'data'),
+        'interview-stages': RefSource(m.InterviewStageRef, sch.GetRefsResponse, sch.Ref, 'data'),
+        'vacancy-stats': RefSource(m.VacansyStatusRef, sch.GetRefsResponse, sch.Ref, 'data'),
+    }
+
+    def __init__(self) -> None:
+        self._content: tp.Dict[str, CachedRef] = {}
+        # сериализованные списки элементов, из которых собираются сводные ответы
+        self._fragments: tp.Dict[str, bytes] = {}
+        self._bundles: tp.Dict[tp.Tuple[str, ...], CachedRef] = {}
+        self._lock = asyncio.Lock()
+        self.version = 0
+        # номер сброса кэша, см. load
+        self._generation = 0
+
+    @property
+    def is_loaded(self) -> bool:
+        return bool(self._content)
+
+    async def get(self, name: str, session: AsyncSession) -> CachedRef:
+        if not self.is_loaded:
+            await self.load(session)
+        return self._content[name]
+
+    async def get_bundle(self, names: tp.Optional[tp.Iterable[str]], session: AsyncSession) -> CachedRef:
+        """
+        Все справочники (или только перечисленные) одним документом.
+        :raises KeyError: если передан неизвестный справочник
+        """
+        if not self.is_loaded:
+            await self.load(session)
+
+        key = tuple(self.sources) if not names else tuple(sorted(set(names)))
+        bundle = self._bundles.get(key)
+        if bundle is None:
+            content = b'{' + b','.join(json.dumps(name).encode() + b':' + self._fragments[name] for name in key) + b'}'
+            bundle = CachedRef(content=content, etag=make_etag(content))
+            self._bundles[key] = bundle
+        return bundle
+
+    async def load(self, session: AsyncSession) -> None:
+        async with self._lock:
+            # пока ждали блокировку, кэш мог заполнить другой запрос
+            while not self.is_loaded:
+                # сброс во время чтения означает, что прочитанное могло устареть:
+                # такой результат не публикуется, справочники читаются заново
+                generation = self._generation
+                content = {}
+                fragments = {}
+                for name, source in self.sources.items():
+                    res = await session.scalars(select(source.sa_model).order_by(source.sa_model.code))
+                    items = [source.item_schema.from_orm(orm_model) for orm_model in res.all()]
+                    # те же байты, что отдал бы FastAPI: компактный json в utf-8
+                    data = dumps(source.response_schema(**{source.field: items}))
+                    content[name] = CachedRef(content=data, etag=make_etag(data))
+                    fragments[name] = dumps(items)
+                if generation != self._generation:
+                    continue
+                self._content = content
+                self._fragments = fragments
+                self._bundles = {}
+                self.version += 1
+
+    def invalidate(self) -> None:
+        """
+        Сбрасывает кэш, справочники будут перечитаны при следующем обращении.
+        """
+        self._generation += 1
+        self._content = {}
+
+
+refs_cache = RefsCache()
@@ -1,14 +1,22 @@
+import typing as tp
+
 from fastapi import (
     APIRouter,
-    Depends
+    Depends,
+    Query,
+    Request,
+    Response
 )
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 
 from ..service.fastapi_custom import generate_openapi_responses
 from ..service import exceptions as exc
-from ..service import models as m
+from ..service.etag import (
+    is_not_modified,
+    not_modified_response,
+    set_etag_headers
+)
 from ..service.dependencies import (
     AccessJWTCookie,
     get_session
@@ -17,12 +25,50 @@ from ..service.tokens import (
     AccessToken,
 )
 
+from .cache import CachedRef, refs_cache
 from . import schemas as sch
 
 
 router = APIRouter(tags=['refs'], prefix='/refs')
 
 
+def _json_response(request: Request, ref: CachedRef) -> Response:
+    # справочники уже сериализованы в кэше, повторная валидация не нужна
+    if is_not_modified(request, ref.etag):
+        return not_modified_response(ref.etag)
+    response = Response(content=ref.content, media_type='application/json')
+    set_etag_headers(response, ref.etag)
+    return response
+
+
+@router.get('/all',
+             responses=generate_openapi_responses(
+                 exc.InvalidRequestError,
+                 exc.InvalidTokenError,
+                 exc.ExpiredTokenError,
+                 exc.InvalidClientError
+                 ),
+             response_model=sch.GetAllRefsResponse,
+             response_model_by_alias=True
+             )
+async def all_refs(request: Request,
+                   names: tp.Optional[tp.List[str]] = Query(None),
+                   session: AsyncSession = Depends(get_session),
+                   at: AccessToken = Depends(AccessJWTCookie())):
+    '''
+    Все справочники одним ответом <br>
+    Параметр names (можно повторять или перечислять через запятую) ограничивает набор справочников
+    '''
+    
+    if names is not None:
+        names = [name.strip() for value in names for name in value.split(',') if name.strip()]
+    try:
+        bundle = await refs_cache.get_bundle(names, session)
+    except KeyError:
+        raise exc.InvalidRequestError
+    return _json_response(request, bundle)
+
+
 @router.get('/roles',
              responses=generate_openapi_responses(
                  exc.InvalidRequestError,
@@ -32,11 +78,11 @@ router = APIRouter(tags=['refs'], prefix='/refs')
                  ),
              response_model=sch.GetRolesResponse
              )
-async def roles(session: AsyncSession = Depends(get_session),
+async def roles(request: Request,
+                session: AsyncSession = Depends(get_session),
                 at: AccessToken = Depends(AccessJWTCookie())):
     
-    res = await session.scalars(select(m.RoleRef))
-    return sch.GetRolesResponse(roles=[sch.RoleRef.from_orm(orm_model) for orm_model in res.all()])
+    return _json_response(request, await refs_cache.get('roles', session))
 
 
 @router.get('/vacancy-priorities',
@@ -48,11 +94,11 @@ async def roles(session: AsyncSession = Depends(get_session),
                  ),
              response_model=sch.GetRefsResponse
              )
-async def vacancy_priorities(session: AsyncSession = Depends(get_session),
+async def vacancy_priorities(request: Request,
+                             session: AsyncSession = Depends(get_session),
                              at: AccessToken = Depends(AccessJWTCookie())):
     
-    res = await session.scalars(select(m.VacancyPriorityRef))
-    return sch.GetRefsResponse(data=[sch.Ref.from_orm(orm_model) for orm_model in res.all()])
+    return _json_response(request, await refs_cache.get('vacancy-priorities', session))
 
 
 @router.get('/addresses',
@@ -64,11 +110,11 @@ async def vacancy_priorities(session: AsyncSession = Depends(get_session),
                  ),
              response_model=sch.GetRefsResponse
              )
-async def adresses(session: AsyncSession = Depends(get_session),
+async def adresses(request: Request,
+                   session: AsyncSession = Depends(get_session),
                    at: AccessToken = Depends(AccessJWTCookie())):
     
-    res = await session.scalars(select(m.AdressRef))
-    return sch.GetRefsResponse(data=[sch.Ref.from_orm(orm_model) for orm_model in res.all()])
+    return _json_response(request, await refs_cache.get('addresses', session))
 
 
 @router.get('/countries',
@@ -80,11 +126,11 @@ async def adresses(session: AsyncSession = Depends(get_session),
                  ),
              response_model=sch.GetRefsResponse
              )
-async def countries(session: AsyncSession = Depends(get_session),
+async def countries(request: Request,
+                    session: AsyncSession = Depends(get_session),
                     at: AccessToken = Depends(AccessJWTCookie())):
     
-    res = await session.scalars(select(m.CountryRef))
-    return sch.GetRefsResponse(data=[sch.Ref.from_orm(orm_model) for orm_model in res.all()])
+    return _json_response(request, await refs_cache.get('countries', session))
 
 
 @router.get('/family-stats',
@@ -96,11 +142,11 @@ async def countries(session: AsyncSession = Depends(get_session),
                  ),
              response_model=sch.GetRefsResponse
              )
-async def family_stats(session: AsyncSession = Depends(get_session),
+async def family_stats(request: Request,
+                       session: AsyncSession = Depends(get_session),
                        at: AccessToken = Depends(AccessJWTCookie())):
     
-    res = await session.scalars(select(m.FamilyStatusRef))
-    return sch.GetRefsResponse(data=[sch.Ref.from_orm(orm_model) for orm_model in res.all()])
+    return _json_response(request, await refs_cache.get('family-stats', session))
 
 
 @router.get('/contact-types',
@@ -112,11 +158,11 @@ async def family_stats(session: AsyncSession = Depends(get_session),
                  ),
              response_model=sch.GetRefsResponse
              )
-async def contact_types(session: AsyncSession = Depends(get_session),
+async def contact_types(request: Request,
+                        session: AsyncSession = Depends(get_session),
                         at: AccessToken = Depends(AccessJWTCookie())):
     
-    res = await session.scalars(select(m.ContactTypeRef))
-    return sch.GetRefsResponse(data=[sch.Ref.from_orm(orm_model) for orm_model in res.all()])
+    return _json_response(request, await refs_cache.get('contact-types', session))
 
 
 @router.get('/languages',
@@ -128,11 +174,11 @@ async def contact_types(session: AsyncSession = Depends(get_session),
                  ),
              response_model=sch.GetRefsResponse
              )
-async def languages(session: AsyncSession = Depends(get_session),
+async def languages(request: Request,
+                    session: AsyncSession = Depends(get_session),
                     at: AccessToken = Depends(AccessJWTCookie())):
     
-    res = await session.scalars(select(m.LanguageRef))
-    return sch.GetRefsResponse(data=[sch.Ref.from_orm(orm_model) for orm_model in res.all()])
+    return _json_response(request, await refs_cache.get('languages', session))
 
 
 @router.get('/language-levels',
@@ -144,11 +190,11 @@ async def languages(session: AsyncSession = Depends(get_session),
                  ),
              response_model=sch.GetRefsResponse
              )
-async def language_levels(session: AsyncSession = Depends(get_session),
+async def language_levels(request: Request,
+                          session: AsyncSession = Depends(get_session),
                           at: AccessToken = Depends(AccessJWTCookie())):
     
-    res = await session.scalars(select(m.LanguageLevelRef))
-    return sch.GetRefsResponse(data=[sch.Ref.from_orm(orm_model) for orm_model in res.all()])
+    return _json_response(request, await refs_cache.get('language-levels', session))
 
 
 @router.get('/interview-stages',
@@ -160,11 +206,11 @@ async def language_levels(session: AsyncSession = Depends(get_session),
                  ),
              response_model=sch.GetRefsResponse
              )
-async def interview_stages(session: AsyncSession = Depends(get_session),
+async def interview_stages(request: Request,
+                           session: AsyncSession = Depends(get_session),
                            at: AccessToken = Depends(AccessJWTCookie())):
     
-    res = await session.scalars(select(m.InterviewStageRef))
-    return sch.GetRefsResponse(data=[sch.Ref.from_orm(orm_model) for orm_model in res.all()])
+    return _json_response(request, await refs_cache.get('interview-stages', session))
 
 
 @router.get('/vacancy-stats',
@@ -176,8 +222,8 @@ async def interview_stages(session: AsyncSession = Depends(get_session),
                  ),
              response_model=sch.GetRefsResponse
              )
-async def vacancy_stats(session: AsyncSession = Depends(get_session),
+async def vacancy_stats(request: Request,
+                        session: AsyncSession = Depends(get_session),
                         at: AccessToken = Depends(AccessJWTCookie())):
     
-    res = await session.scalars(select(m.VacansyStatusRef))
-    return sch.GetRefsResponse(data=[sch.Ref.from_orm(orm_model) for orm_model in res.all()])
+    return _json_response(request, await refs_cache.get('vacancy-stats', session))
@@ -27,3 +27,16 @@ class GetRefsResponse(pd.BaseModel):
     
 class GetRolesResponse(pd.BaseModel):
     roles: tp.List[RoleRef]
+
+    
+class GetAllRefsResponse(pd.BaseModel):
+    roles: tp.Optional[tp.List[RoleRef]]
+    vacancy_priorities: tp.Optional[tp.List[Ref]] = pd.Field(alias='vacancy-priorities')
+    addresses: tp.Optional[tp.List[Ref]]
+    countries: tp.Optional[tp.List[Ref]]
+    family_stats: tp.Optional[tp.List[Ref]] = pd.Field(alias='family-stats')
+    contact_types: tp.Optional[tp.List[Ref]] = pd.Field(alias='contact-types')
+    languages: tp.Optional[tp.List[Ref]]
+    language_levels: tp.Optional[tp.List[Ref]] = pd.Field(alias='language-levels')
+    interview_stages: tp.Optional[tp.List[Ref]] = pd.Field(alias='interview-stages')
+    vacancy_stats: tp.Optional[tp.List[Ref]] = pd.Field(alias='vacancy-stats')
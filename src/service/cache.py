@@ -0,0 +1,57 @@
+import threading
+import time
+import typing as tp
+from collections import OrderedDict
+
+
+class TTLLRUCache:
+    """
+    Ограниченный по размеру LRU-кэш внутри процесса.
+    Каждая запись хранится до своего момента истечения (unix time).
+    Потокобезопасен: синхронные зависимости fastapi выполняются в пуле потоков.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._maxsize = maxsize
+        self._data: 'OrderedDict[tp.Hashable, tp.Tuple[tp.Any, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tp.Hashable) -> tp.Optional[tp.Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, expires_at = item
+            if expires_at <= time.time():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: tp.Hashable, value: tp.Any, expires_at: float) -> None:
+        if self._maxsize <= 0 or expires_at <= time.time():
+            return
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: tp.Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> tp.Dict[str, int]:
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._data),
+                'maxsize': self._maxsize}
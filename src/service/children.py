@@ -0,0 +1,62 @@
+"""
+Синхронизация дочерних сущностей (контакты, места работы, навыки и т.д.) с полным
+списком из запроса на обновление. На таблицу выполняется не больше двух запросов
+независимо от количества строк: удаление отсутствующих и один upsert остальных.
+"""
+import uuid
+import typing as tp
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy import delete, func, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+from sqlalchemy.orm.decl_api import DeclarativeMeta
+
+
+async def sync_child_entities(session: AsyncSession,
+                              sa_model: DeclarativeMeta,
+                              parent_column: InstrumentedAttribute,
+                              parent_id: UUID,
+                              initiator_id: UUID,
+                              entities_list: tp.Sequence[BaseModel]) -> None:
+    '''
+    Приводит дочерние записи родителя parent_id к списку entities_list:
+    удаляет записи, которых нет в списке, добавляет записи без id и обновляет
+    только те существующие, у которых изменились данные (updated_at меняется
+    только у них, creator_id остается за автором записи)
+    '''
+
+    table = sa_model.__table__
+    rows: tp.Dict[UUID, dict] = {}
+    for entity in entities_list:
+        row = entity.dict()
+        row['id'] = row['id'] or uuid.uuid4()
+        for key, value in row.items():
+            # null в NOT NULL колонке означает значение по умолчанию, как при вставке без поля
+            column = table.c[key]
+            if value is None and not column.nullable and column.server_default is not None:
+                row[key] = column.server_default.arg
+        row['creator_id'] = initiator_id
+        row[parent_column.key] = parent_id
+        # повтор id в одном запросе недопустим для ON CONFLICT, побеждает последний
+        rows[row['id']] = row
+
+    stmt = delete(sa_model) \
+           .where(parent_column == parent_id) \
+           .where(sa_model.id.not_in(list(rows)))
+    await session.execute(stmt)
+
+    if not rows:
+        return
+
+    stmt = insert(sa_model).values(list(rows.values()))
+    data_columns = [key for key in next(iter(rows.values())) if key not in ('id', 'creator_id', parent_column.key)]
+    changed = tuple_(*(table.c[key] for key in data_columns)) \
+              .is_distinct_from(tuple_(*(stmt.excluded[key] for key in data_columns)))
+    stmt = stmt.on_conflict_do_update(index_elements=[sa_model.id],
+                                      where=(parent_column == parent_id) & changed,
+                                      set_={**{key: stmt.excluded[key] for key in data_columns},
+                                            'updated_at': func.now()})
+    await session.execute(stmt)
@@ -0,0 +1,51 @@
+"""
+Общее количество строк для постраничных списков.
+Точный count(*) по большой выборке читает ее целиком, поэтому точное значение
+считается только до порога, а выше него отдается оценка планировщика.
+"""
+import typing as tp
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.future import select
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+class Explain(Executable, ClauseElement):
+    """
+    EXPLAIN (FORMAT JSON) для выражения sqlalchemy с обычной подстановкой параметров.
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select) -> None:
+        self.statement = statement
+
+
+@compiles(Explain, 'postgresql')
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return 'EXPLAIN (FORMAT JSON) ' + compiler.process(element.statement, **kw)
+
+
+class Total(tp.NamedTuple):
+    value: int
+    is_exact: bool
+
+
+async def count_total(session: AsyncSession, stmt: Select, exact_limit: int) -> Total:
+    '''
+    Точное количество строк, если их не больше exact_limit, иначе оценка планировщика
+    (не меньше exact_limit + 1). Счет ограничен LIMIT, поэтому стоит не дороже
+    чтения exact_limit записей индекса
+    :param stmt: выборка с условиями списка, без сортировки и лимита
+    '''
+
+    bounded = select(func.count()).select_from(stmt.limit(exact_limit + 1).subquery())
+    total = await session.scalar(bounded)
+    if total <= exact_limit:
+        return Total(total, True)
+
+    plan = await session.scalar(Explain(stmt))
+    return Total(max(int(plan[0]['Plan']['Plan Rows']), total), False)
@@ -1,12 +1,19 @@
 from abc import ABCMeta, abstractmethod
 import typing as tp
+import logging
+import time
 import asyncpg
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from ..config import postgres_env, POSTGRES_DSN
+from .metrics import db_histograms
+
+
+logger = logging.getLogger(__name__)
 
 
 def get_dsn(user: str, password: str, host: str, port: str, db: str, prefix: str = 'postgres'):
@@ -36,7 +43,39 @@ else:
     DATABASE_URL = get_dsn(*parse_dokku_dsn(POSTGRES_DSN), sa_prefix)
 
 
-engine = create_async_engine(DATABASE_URL)
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, замеряющий время ожидания свободного соединения
+    (включая открытие нового, если пул еще не заполнен).
+    Ожидание дольше wait_log_threshold пишется в лог вместе с состоянием пула.
+    """
+
+    wait_log_threshold = postgres_env.POOL_WAIT_LOG_THRESHOLD
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started
+            db_histograms.observe('db_pool_wait_seconds', waited)
+            if waited > self.wait_log_threshold:
+                logger.warning('Waited %.3fs for a pool connection (size=%d, checked out=%d, overflow=%d)',
+                               waited, self.size(), self.checkedout(), max(self.overflow(), 0))
+
+
+engine = create_async_engine(DATABASE_URL,
+                             poolclass=TimedAsyncQueuePool,
+                             pool_size=postgres_env.POOL_SIZE,
+                             max_overflow=postgres_env.MAX_OVERFLOW,
+                             pool_timeout=postgres_env.POOL_TIMEOUT,
+                             pool_recycle=postgres_env.POOL_RECYCLE,
+                             pool_pre_ping=postgres_env.POOL_PRE_PING,
+                             connect_args={
+                                 # кэш sqlalchemy и собственный кэш asyncpg
+                                 'prepared_statement_cache_size': postgres_env.STATEMENT_CACHE_SIZE,
+                                 'statement_cache_size': postgres_env.STATEMENT_CACHE_SIZE
+                             })
 async_session = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
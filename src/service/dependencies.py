@@ -1,16 +1,23 @@
-from typing import Any
+import hmac
+from typing import Any, Optional
 from fastapi import Depends, Request, HTTPException
 import asyncpg
+import jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
-from .tokens import AccessToken, RefreshToken, AccessTokenFactory, RefreshTokenFactory
+from .tokens import AccessToken, AccessTokenClaims, RefreshToken, AccessTokenFactory, RefreshTokenFactory
 from .database import database, async_session
+from .cache import TTLLRUCache
 from . import exceptions as exc
 from .. import config
 
 
 class AccessJWTCookie:    
+    # проверенные токены, общие для всех экземпляров; ключ - значение куки,
+    # запись живет до exp токена
+    cache = TTLLRUCache(config.ACCESS_TOKEN_CACHE_SIZE)
+    
     def __init__(self, 
                  name: str = config.ACCESS_TOKEN_NAME,
                  check_expires: bool = True,
@@ -21,28 +28,48 @@ class AccessJWTCookie:
         self._check_exp = check_expires
         self._check_sign = check_sign
     
+    # одинаково настроенные экземпляры равны, поэтому fastapi кэширует результат
+    # в рамках запроса и не проверяет токен повторно (например, в CheckRoles и в роуте)
+    def _key(self) -> tuple:
+        return (self._name, self._check_exp, self._check_sign)
+    
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, AccessJWTCookie):
+            return NotImplemented
+        return self._key() == other._key()
+    
+    def __hash__(self) -> int:
+        return hash(self._key())
+    
     def __call__(self, request: Request) -> AccessToken:
         raw_at = request.cookies.get(self._name)
         
         if raw_at is None:
             raise exc.InvalidTokenError
         
-        at = AccessTokenFactory.fromstring(raw_at)
+        claims = self.cache.get(raw_at)
+        if claims is not None:
+            return AccessToken(raw_at, claims)
         
-        is_valid = at.check_structure()
-        if not is_valid:
+        # фабрика проверяет структуру отдельным декодированием, здесь это лишнее
+        at = AccessToken(raw_at)
+        
+        try:
+            payload = at.verify(secret=config.jwt_env.SECRET,
+                                algorithm=config.JWT_ALG,
+                                verify_exp=self._check_exp,
+                                verify_sign=self._check_sign)
+            claims = AccessTokenClaims.from_payload(payload)
+        except jwt.ExpiredSignatureError:
+            raise exc.ExpiredTokenError
+        except (jwt.InvalidTokenError, KeyError):
             raise exc.InvalidTokenError
         
-        if self._check_exp:
-            is_valid = at.check_exp()
-            if not is_valid:
-                raise exc.ExpiredTokenError
-            
-        if self._check_sign:
-            is_valid = at.check_sign(secret=config.jwt_env.SECRET, algorithm=config.JWT_ALG)
-            if not is_valid:
-                raise exc.InvalidTokenError
-        return at
+        # кэшируем только токены с проверенными подписью и сроком действия
+        if self._check_sign and self._check_exp and claims.exp is not None:
+            self.cache.set(raw_at, claims, expires_at=claims.exp)
+        
+        return AccessToken(raw_at, claims)
     
     
 class RefreshUUIDCookie:
@@ -72,6 +99,22 @@ class CheckRoles:
             raise exc.AccessDenied
 
 
+class CheckBearerToken:
+    """
+    Доступ по общему секрету из конфигурации в заголовке Authorization: Bearer <токен>.
+    Если секрет не задан, доступ закрыт.
+    """
+
+    def __init__(self, token: Optional[str]) -> None:
+        self._token = token
+
+    def __call__(self, request: Request) -> None:
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if not self._token or scheme.lower() != 'bearer' \
+                or not hmac.compare_digest(token.encode(), self._token.encode()):
+            raise exc.InvalidTokenError
+
+
 def get_db_connection(con: asyncpg.Connection = Depends(database.connection)):
     return con
 
@@ -0,0 +1,44 @@
+import hashlib
+import typing as tp
+
+from fastapi import Request, Response
+
+
+# ответы зависят от пользователя (куки), поэтому кэшировать их можно только
+# в браузере и только с обязательной перепроверкой через If-None-Match
+CACHE_CONTROL = 'private, no-cache'
+
+
+def make_etag(content: bytes) -> str:
+    """
+    Сильный ETag по содержимому ответа.
+    """
+    return '"' + hashlib.sha1(content).hexdigest() + '"'
+
+
+def make_rows_etag(rows: tp.Iterable[tp.Iterable[tp.Any]]) -> str:
+    """
+    ETag по выбранным из бд строкам, без построения и сериализации моделей ответа.
+    """
+    content = '\n'.join('\t'.join(str(value) for value in row) for row in rows)
+    return make_etag(content.encode())
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get('if-none-match')
+    if header is None:
+        return False
+    if header.strip() == '*':
+        return True
+    # для GET допускается слабое сравнение, поэтому префикс W/ игнорируется
+    candidates = (tag.strip().removeprefix('W/') for tag in header.split(','))
+    return etag in candidates
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={'ETag': etag, 'Cache-Control': CACHE_CONTROL})
+
+
+def set_etag_headers(response: Response, etag: str) -> None:
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = CACHE_CONTROL
@@ -1,14 +1,23 @@
+import logging
 from contextlib import asynccontextmanager
 
-from .refs_loader import RefsLoader
 from .mocks_loader import MocksLoader
+from .seeds import Seeder, file_checksum
+from .migrations import pending_migrations
+from . import mocks
 from .database import database, engine, async_session
+from .passwords import password_hasher
+from .metrics import loop_lag_monitor
+from ..refs.cache import refs_cache
 from . import models as m
-from ..config import postgres_env, POSTGRES_DSN
+from ..config import postgres_env, POSTGRES_DSN, SEED_MOCKS, REFS_SQL_PATH, MIGRATIONS_PATH
 from sqlalchemy import update
 from sqlalchemy.dialects.postgresql import insert
 
 
+logger = logging.getLogger(__name__)
+
+
 async def on_startup() -> None:
     """
     Действия, выполняемые при запуске приложения
@@ -18,11 +27,20 @@ async def on_startup() -> None:
         # await conn.run_sync(m.Base.metadata.drop_all)
         # await conn.run_sync(m.Base.metadata.create_all)
         
-        refs_loader = RefsLoader(conn)
-        await refs_loader.load('./data/refs.sql')
-        mocks_loader = MocksLoader(conn)
-        await mocks_loader.load()
-        await conn.commit()
+        seeder = Seeder(conn)
+        await seeder.lock()
+        # миграции выполняются отдельным шагом (python -m src.service.migrations):
+        # построение индексов и заполнение колонок не должны держать старт воркеров
+        pending = await pending_migrations(conn, MIGRATIONS_PATH)
+        if pending:
+            logger.warning('Pending migrations: %s. Run python -m src.service.migrations', ', '.join(pending))
+        await seeder.apply_sql_file('refs', REFS_SQL_PATH)
+        if SEED_MOCKS:
+            mocks_loader = MocksLoader(conn)
+            await seeder.apply('mocks', file_checksum(mocks.__file__), mocks_loader.load)
+    
+    refs_cache.invalidate()
+    loop_lag_monitor.start()
         
         
     # dsn = POSTGRES_DSN if POSTGRES_DSN is not None \
@@ -42,4 +60,6 @@ async def on_shutdown() -> None:
     """
     Действия, выполняемые при завершении работы приложения.
     """
+    await loop_lag_monitor.stop()
+    password_hasher.shutdown()
     print('App is shutting down!')
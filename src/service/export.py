@@ -0,0 +1,97 @@
+"""
+Потоковая выгрузка списков в CSV и NDJSON.
+Строки читаются из серверного курсора пачками (AsyncSession.stream с yield_per)
+и кодируются в ответ по мере чтения: в памяти одна пачка при любом размере выборки.
+Дочерние коллекции сворачиваются в строку в самом запросе (joined), поэтому
+на запись приходится одна строка результата.
+"""
+import csv
+import io
+import typing as tp
+
+import anyio
+from sqlalchemy import func, literal
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
+from starlette.responses import StreamingResponse
+
+from .ndjson import MEDIA_TYPE as NDJSON_MEDIA_TYPE
+from .responses import dumps
+
+
+# кодировку (charset=utf-8) starlette добавляет к text/* сам
+CSV_MEDIA_TYPE = 'text/csv'
+# без BOM Excel читает UTF-8 как однобайтовую кодировку и портит кириллицу
+CSV_BOM = '\ufeff'
+SEPARATOR = '; '
+# начало ячейки, с которого табличные редакторы читают ее как формулу
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def joined(expression, *order_by, separator: str = SEPARATOR):
+    '''
+    Агрегат string_agg значений дочерних записей в заданном порядке
+    '''
+
+    return func.string_agg(expression, aggregate_order_by(literal(separator), *order_by))
+
+
+def escape_formula(value: tp.Any) -> tp.Any:
+    '''
+    Строка, которую Excel принял бы за формулу, выгружается как текст: с апострофом в начале.
+    В ячейки попадает текст кандидатов (заметки, места работы, контакты), и без этого
+    открытие выгрузки выполняло бы подставленные в него формулы
+    '''
+
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+async def iter_csv(result: AsyncResult) -> tp.AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write(CSV_BOM)
+    writer.writerow(result.keys())
+    yield buffer.getvalue().encode()
+    async for rows in result.partitions():
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([escape_formula(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode()
+
+
+async def iter_ndjson(result: AsyncResult) -> tp.AsyncIterator[bytes]:
+    keys = tuple(result.keys())
+    async for rows in result.partitions():
+        yield b''.join(dumps(dict(zip(keys, row))) + b'\n' for row in rows)
+
+
+async def _closing(session: AsyncSession, chunks: tp.AsyncIterator[bytes]) -> tp.AsyncIterator[bytes]:
+    # при обрыве соединения starlette отменяет отправку посреди чтения курсора, и
+    # соединение с бд остается в прерванной транзакции: откат выполняется здесь,
+    # вне отмены, иначе get_session упадет на commit
+    try:
+        async for chunk in chunks:
+            yield chunk
+    except BaseException:
+        with anyio.CancelScope(shield=True):
+            await session.rollback()
+        raise
+
+
+def export_response(session: AsyncSession, result: AsyncResult, format: str, name: str) -> StreamingResponse:
+    '''
+    :param session: сессия, в которой открыт result
+    :param result: результат AsyncSession.stream
+    :param format: csv или ndjson
+    :param name: имя файла без расширения
+    '''
+
+    if format == 'csv':
+        chunks, media_type = iter_csv(result), CSV_MEDIA_TYPE
+    else:
+        chunks, media_type = iter_ndjson(result), NDJSON_MEDIA_TYPE
+    return StreamingResponse(_closing(session, chunks),
+                             media_type=media_type,
+                             headers={'Content-Disposition': f'attachment; filename="{name}.{format}"'})
@@ -1,7 +1,10 @@
+import inspect
 import typing as tp
 
 from fastapi.openapi.utils import get_openapi
-from fastapi import FastAPI
+from fastapi import FastAPI, Query
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_LIST
 
 
 class CustomOpenAPIGenerator:
@@ -64,3 +67,24 @@ def generate_openapi_responses(*responses: CustomHTTPException):
         result[response.status_code]['content'][default_content_type]['examples'][response.error] = response_example
             
     return result
+
+
+def query_lists(model: tp.Type[BaseModel]) -> tp.Type[BaseModel]:
+    '''
+    Объявляет поля-списки модели query-параметрами, когда модель подключается
+    через Depends(model): иначе FastAPI ожидает их в теле запроса.
+    Меняется только сигнатура для FastAPI, значения по умолчанию самой модели остаются прежними
+    '''
+
+    parameters = []
+    for parameter in inspect.signature(model).parameters.values():
+        field = model.__fields__.get(parameter.name)
+        if field is not None and field.shape == SHAPE_LIST:
+            # ограничение max_items переносится из типа поля в Query
+            parameter = parameter.replace(annotation=tp.Optional[tp.List[field.type_]],
+                                          default=Query(field.default,
+                                                        max_items=field.field_info.max_items,
+                                                        description=field.field_info.description))
+        parameters.append(parameter)
+    model.__signature__ = inspect.Signature(parameters)
+    return model
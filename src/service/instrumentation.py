@@ -0,0 +1,180 @@
+"""
+Инструментирование запросов: количество и время sql-запросов, время обработчика
+и сериализации ответа. Результаты отдаются в заголовке Server-Timing и
+накапливаются в гистограммах по шаблону маршрута.
+"""
+import asyncio
+import contextvars
+import functools
+import time
+import typing as tp
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.routing import request_response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .metrics import route_histograms, in_flight_requests
+
+
+class RequestStats:
+    __slots__ = ('route', 'started_at', 'db_queries', 'db_time',
+                 'handler_started_at', 'handler_finished_at', 'response_started_at',
+                 'render_time')
+
+    def __init__(self) -> None:
+        self.route: tp.Optional[str] = None
+        self.started_at = time.perf_counter()
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.handler_started_at: tp.Optional[float] = None
+        self.handler_finished_at: tp.Optional[float] = None
+        self.response_started_at: tp.Optional[float] = None
+        # рендер ответов, собранных внутри обработчика (ModelResponse)
+        self.render_time = 0.0
+
+    @property
+    def handler_time(self) -> float:
+        if self.handler_started_at is None or self.handler_finished_at is None:
+            return 0.0
+        return max(self.handler_finished_at - self.handler_started_at - self.render_time, 0.0)
+
+    @property
+    def serialize_time(self) -> float:
+        # от возврата из обработчика до начала отправки ответа,
+        # плюс рендер ответа, если обработчик вернул его сам
+        if self.handler_finished_at is None or self.response_started_at is None:
+            return self.render_time
+        return self.response_started_at - self.handler_finished_at + self.render_time
+
+    def server_timing(self) -> str:
+        total = (self.response_started_at or time.perf_counter()) - self.started_at
+        return ', '.join((
+            f'db;desc="{self.db_queries} queries";dur={self.db_time * 1000:.2f}',
+            f'handler;dur={self.handler_time * 1000:.2f}',
+            f'serialize;dur={self.serialize_time * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ))
+
+
+_current_stats: contextvars.ContextVar[tp.Optional[RequestStats]] = contextvars.ContextVar('request_stats', default=None)
+
+
+def current_stats() -> tp.Optional[RequestStats]:
+    return _current_stats.get()
+
+
+class InstrumentationMiddleware:
+    def __init__(self, app: ASGIApp, server_timing: bool = False) -> None:
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                stats.response_started_at = time.perf_counter()
+            if message['type'] == 'http.response.start' and self.server_timing:
+                headers = list(message.get('headers', []))
+                headers.append((b'server-timing', stats.server_timing().encode()))
+                message = {**message, 'headers': headers}
+            await send(message)
+
+        in_flight_requests.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight_requests.dec()
+            _current_stats.reset(token)
+            if stats.route is not None:
+                self._observe(scope['method'], stats)
+
+    @staticmethod
+    def _observe(method: str, stats: RequestStats) -> None:
+        total = time.perf_counter() - stats.started_at
+        labels = {'method': method, 'route': stats.route}
+        route_histograms.observe('http_request_duration_seconds', total, **labels)
+        route_histograms.observe('http_request_db_duration_seconds', stats.db_time, **labels)
+        route_histograms.observe('http_request_db_queries', stats.db_queries, **labels)
+        route_histograms.observe('http_request_handler_duration_seconds', stats.handler_time, **labels)
+        route_histograms.observe('http_request_serialize_duration_seconds', stats.serialize_time, **labels)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current_stats.get() is not None:
+        conn.info.setdefault('instrumentation_started_at', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current_stats.get()
+    started = conn.info.get('instrumentation_started_at')
+    if stats is None or not started:
+        return
+    stats.db_queries += 1
+    stats.db_time += time.perf_counter() - started.pop()
+
+
+def _instrument_route(route: APIRoute) -> None:
+    """
+    Оборачивает функцию обработчика, чтобы отделить время его работы
+    от разрешения зависимостей и сериализации ответа.
+    """
+    call = route.dependant.call
+
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def timed_call(*args, **kwargs):
+            stats = _current_stats.get()
+            if stats is not None:
+                stats.handler_started_at = time.perf_counter()
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                if stats is not None:
+                    stats.handler_finished_at = time.perf_counter()
+    else:
+        @functools.wraps(call)
+        def timed_call(*args, **kwargs):
+            stats = _current_stats.get()
+            if stats is not None:
+                stats.handler_started_at = time.perf_counter()
+            try:
+                return call(*args, **kwargs)
+            finally:
+                if stats is not None:
+                    stats.handler_finished_at = time.perf_counter()
+
+    route.dependant.call = timed_call
+    handler_app = request_response(route.get_route_handler())
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.route = route.path
+        await handler_app(scope, receive, send)
+
+    route.app = app
+
+
+def install(app: FastAPI, engine: AsyncEngine, server_timing: bool = False) -> None:
+    """
+    Подключает инструментирование; вызывается после регистрации всех роутеров.
+    :param server_timing: добавлять ли в ответы заголовок Server-Timing
+    """
+    if not event.contains(engine.sync_engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine.sync_engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine.sync_engine, 'after_cursor_execute', _after_cursor_execute)
+
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            _instrument_route(route)
+
+    app.add_middleware(InstrumentationMiddleware, server_timing=server_timing)
@@ -0,0 +1,65 @@
+"""
+Профили загрузки связанных сущностей.
+Связи в моделях объявлены с lazy='raise', поэтому каждый запрос явно указывает
+профиль, который загружает ровно тот граф объектов, что нужен модели ответа.
+Связи "многие к одному" подтягиваются join-ом в основной запрос, коллекции -
+одним дополнительным запросом на коллекцию (selectin).
+"""
+from sqlalchemy.orm import joinedload, selectinload
+
+from . import models as m
+
+
+# pd_models.user.Read
+user_read = (
+    joinedload(m.User.department),
+    joinedload(m.User.position),
+    joinedload(m.User.grade),
+)
+
+# аутентификация: нужна только роль
+user_auth = (
+    joinedload(m.User.role),
+)
+
+# pd_models.candidate.Read
+candidate_read = (
+    joinedload(m.Candidate.position),
+    joinedload(m.Candidate.grade),
+    joinedload(m.Candidate.adress),
+    joinedload(m.Candidate.citizenship),
+    joinedload(m.Candidate.family_status),
+    selectinload(m.Candidate.contacts).joinedload(m.CandidateContact.type),
+    selectinload(m.Candidate.work_places),
+    selectinload(m.Candidate.languages).options(
+        joinedload(m.CandidateLanguageAbility.language),
+        joinedload(m.CandidateLanguageAbility.language_level),
+    ),
+    selectinload(m.Candidate.notes),
+    selectinload(m.Candidate.skills).joinedload(m.CandidateSkill.skill),
+)
+
+# pd_models.vacancy.Read
+vacancy_read = (
+    joinedload(m.Vacancy.position),
+    joinedload(m.Vacancy.department),
+    joinedload(m.Vacancy.grade),
+    joinedload(m.Vacancy.priority),
+    joinedload(m.Vacancy.adress),
+    joinedload(m.Vacancy.status),
+    selectinload(m.Vacancy.skills).joinedload(m.VacancySkill.skill),
+)
+
+# pd_models.interview.Read
+interview_read = (
+    joinedload(m.Interview.stage),
+    joinedload(m.Interview.creator).options(*user_read),
+    joinedload(m.Interview.candidate).options(*candidate_read),
+    joinedload(m.Interview.vacancy).options(*vacancy_read),
+)
+
+# pd_models.interview_stage_result.Read
+interview_stage_result_read = (
+    joinedload(m.InterviewStageResult.interview_stage_old),
+    joinedload(m.InterviewStageResult.interview_stage_new),
+)
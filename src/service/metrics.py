@@ -0,0 +1,198 @@
+import asyncio
+import bisect
+import threading
+import time
+import typing as tp
+
+from .. import config
+
+
+# границы корзин в секундах
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# границы корзин для количества sql-запросов
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4'
+
+
+class Histogram:
+    """
+    Накопительная гистограмма с фиксированными границами корзин.
+    """
+
+    def __init__(self, buckets: tp.Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> tp.List[tp.Tuple[float, int]]:
+        """
+        Пары (верхняя граница, количество наблюдений <= границы), последняя граница - +inf.
+        """
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class Gauge:
+    """
+    Текущее значение величины, которое может как расти, так и уменьшаться.
+    """
+
+    def __init__(self) -> None:
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class HistogramRegistry:
+    """
+    Набор гистограмм, сгруппированных по имени метрики и меткам.
+    """
+
+    def __init__(self) -> None:
+        self._histograms: tp.Dict[tp.Tuple[str, tp.Tuple[tp.Tuple[str, str], ...]], Histogram] = {}
+        self._buckets: tp.Dict[str, tp.Sequence[float]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, buckets: tp.Sequence[float]) -> None:
+        self._buckets[name] = buckets
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self._buckets[name])
+            histogram.observe(value)
+
+    def items(self) -> tp.List[tp.Tuple[str, tp.Dict[str, str], Histogram]]:
+        with self._lock:
+            return [(name, dict(labels), histogram) for (name, labels), histogram in self._histograms.items()]
+
+
+class EventLoopLagMonitor:
+    """
+    Фоновая задача, измеряющая задержку цикла событий:
+    насколько позже запланированного просыпается asyncio.sleep(interval).
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.lag = Gauge()
+        self._task: tp.Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(time.perf_counter() - started - self.interval, 0.0)
+            self.lag.set(lag)
+            loop_histograms.observe('event_loop_lag_seconds', lag)
+
+
+class Exposition:
+    """
+    Сборщик ответа в текстовом формате Prometheus (version 0.0.4).
+    """
+
+    def __init__(self) -> None:
+        self._lines: tp.List[str] = []
+
+    def gauge(self, name: str, help_: str, value: float, **labels: str) -> None:
+        self._header(name, help_, 'gauge')
+        self._sample(name, labels, value)
+
+    def counter(self, name: str, help_: str, value: float, **labels: str) -> None:
+        self._header(name, help_, 'counter')
+        self._sample(name, labels, value)
+
+    def histograms(self, registry: HistogramRegistry, help_: tp.Dict[str, str]) -> None:
+        by_name: tp.Dict[str, tp.List[tp.Tuple[tp.Dict[str, str], Histogram]]] = {}
+        for name, labels, histogram in registry.items():
+            by_name.setdefault(name, []).append((labels, histogram))
+        for name in sorted(by_name):
+            self._header(name, help_.get(name, name), 'histogram')
+            for labels, histogram in sorted(by_name[name], key=lambda item: sorted(item[0].items())):
+                for bound, count in histogram.cumulative():
+                    self._sample(f'{name}_bucket', {**labels, 'le': self._format_value(bound)}, count)
+                self._sample(f'{name}_sum', labels, histogram.sum)
+                self._sample(f'{name}_count', labels, histogram.count)
+
+    def render(self) -> bytes:
+        return ('\n'.join(self._lines) + '\n').encode()
+
+    def _header(self, name: str, help_: str, type_: str) -> None:
+        self._lines.append(f'# HELP {name} {help_}')
+        self._lines.append(f'# TYPE {name} {type_}')
+
+    def _sample(self, name: str, labels: tp.Dict[str, str], value: float) -> None:
+        self._lines.append(f'{name}{self._format_labels(labels)} {self._format_value(value)}')
+
+    @staticmethod
+    def _format_labels(labels: tp.Dict[str, str]) -> str:
+        if not labels:
+            return ''
+        pairs = []
+        for key, value in sorted(labels.items()):
+            value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            pairs.append(f'{key}="{value}"')
+        return '{' + ','.join(pairs) + '}'
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        if value == float('inf'):
+            return '+Inf'
+        if float(value).is_integer():
+            return str(int(value))
+        return repr(float(value))
+
+
+route_histograms = HistogramRegistry()
+route_histograms.register('http_request_duration_seconds', LATENCY_BUCKETS)
+route_histograms.register('http_request_db_duration_seconds', LATENCY_BUCKETS)
+route_histograms.register('http_request_db_queries', QUERY_COUNT_BUCKETS)
+route_histograms.register('http_request_handler_duration_seconds', LATENCY_BUCKETS)
+route_histograms.register('http_request_serialize_duration_seconds', LATENCY_BUCKETS)
+
+db_histograms = HistogramRegistry()
+db_histograms.register('db_pool_wait_seconds', LATENCY_BUCKETS)
+
+loop_histograms = HistogramRegistry()
+loop_histograms.register('event_loop_lag_seconds', LATENCY_BUCKETS)
+
+in_flight_requests = Gauge()
+loop_lag_monitor = EventLoopLagMonitor(config.EVENT_LOOP_LAG_INTERVAL)
@@ -0,0 +1,154 @@
+"""
+Миграции схемы из data/migrations, выполняемые отдельным шагом развертывания
+до запуска (перезапуска) приложения:
+    python -m src.service.migrations
+Файлы применяются вне транзакции, по одному оператору в автокоммите: индексы строятся
+через CREATE INDEX CONCURRENTLY, а заполнение колонок идет пачками с COMMIT внутри
+DO-блока, поэтому запись в таблицы во время миграции не блокируется.
+Примененные файлы отмечаются в seed_versions; при старте приложение только
+предупреждает о неприменённых.
+
+Пока идет развертывание, старые экземпляры приложения продолжают писать в бд,
+поэтому миграции из data/migrations должны быть совместимы со старым кодом (expand).
+Шаги, которые допустимы только когда старого кода не осталось (contract: удаление
+переходных триггеров, финальные пересчеты), лежат в data/migrations/post_deploy
+и выполняются после развертывания:
+    python -m src.service.migrations --post-deploy
+"""
+import argparse
+import asyncio
+import glob
+import logging
+import os
+import re
+import typing as tp
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio.engine import AsyncConnection
+
+from .database import engine
+from .seeds import Seeder, file_checksum
+from . import models as m
+from ..config import MIGRATIONS_PATH
+
+
+logger = logging.getLogger(__name__)
+
+# сессионная advisory-блокировка: не пересекается с блокировкой сидов при старте
+MIGRATION_LOCK_KEY = 7_301_240_002
+
+POST_DEPLOY_DIR = 'post_deploy'
+
+_SQL_TOKEN = re.compile(r"--[^\n]*|'(?:[^']|'')*'|(\$\w*\$).*?\1|;", re.S)
+_CONCURRENT_INDEX = re.compile(r'CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(\w+)', re.I)
+
+
+def split_statements(sql: str) -> tp.List[str]:
+    """
+    Делит sql-файл на операторы по ';' вне строк, $$-тел и комментариев; комментарии отбрасываются.
+    """
+    statements, parts = [], []
+    position = 0
+    for match in _SQL_TOKEN.finditer(sql):
+        parts.append(sql[position:match.start()])
+        token = match.group()
+        if token == ';':
+            statements.append(''.join(parts))
+            parts = []
+        elif not token.startswith('--'):
+            parts.append(token)
+        position = match.end()
+    parts.append(sql[position:])
+    statements.append(''.join(parts))
+    return [s.strip() for s in statements if s.strip()]
+
+
+def migration_name(path: str) -> str:
+    directory, filename = os.path.split(path)
+    if os.path.basename(directory) == POST_DEPLOY_DIR:
+        return f'migrations/{POST_DEPLOY_DIR}/{filename}'
+    return f'migrations/{filename}'
+
+
+def migration_files(directory: str) -> tp.List[str]:
+    return sorted(glob.glob(os.path.join(directory, '*.sql')))
+
+
+async def pending_migrations(conn: AsyncConnection, directory: str) -> tp.List[str]:
+    """
+    Имена файлов, которые еще не применены или изменились после применения.
+    """
+    stored = dict((await conn.execute(select(m.SeedVersion.name, m.SeedVersion.checksum))).all())
+    return [migration_name(path) for path in migration_files(directory)
+            if stored.get(migration_name(path)) != file_checksum(path)]
+
+
+class Migrator:
+    """
+    Применяет миграции на соединении в режиме AUTOCOMMIT.
+    Файлы должны быть идемпотентны: измененный или недовыполненный файл выполняется повторно целиком.
+    """
+
+    def __init__(self, conn: AsyncConnection) -> None:
+        self._conn = conn
+
+    async def apply(self, directory: str) -> None:
+        await self._conn.execute(text('SELECT pg_advisory_lock(:key)'), {'key': MIGRATION_LOCK_KEY})
+        try:
+            await self._conn.run_sync(m.SeedVersion.__table__.create, checkfirst=True)
+            seeder = Seeder(self._conn)
+            for path in migration_files(directory):
+                await seeder.apply(migration_name(path), file_checksum(path), lambda: self._execute_file(path))
+        finally:
+            await self._conn.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': MIGRATION_LOCK_KEY})
+
+    async def _execute_file(self, path: str) -> None:
+        with open(path, 'r') as f:
+            sql = f.read()
+
+        await self._drop_invalid_indexes(_CONCURRENT_INDEX.findall(sql))
+        raw_conn = await self._conn.get_raw_connection()
+        for statement in split_statements(sql):
+            await raw_conn.dbapi_connection.driver_connection.execute(statement)
+
+    async def _drop_invalid_indexes(self, names: tp.List[str]) -> None:
+        """
+        Прерванный CREATE INDEX CONCURRENTLY оставляет невалидный индекс,
+        который IF NOT EXISTS при повторном запуске пропустил бы.
+        """
+        if not names:
+            return
+        res = await self._conn.scalars(text('SELECT c.relname FROM pg_index i '
+                                            'JOIN pg_class c ON c.oid = i.indexrelid '
+                                            'WHERE NOT i.indisvalid AND c.relname = ANY(:names)'),
+                                       {'names': names})
+        for name in res.all():
+            logger.warning('Dropping invalid index %s left by an interrupted migration', name)
+            await self._conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS {name}'))
+
+
+async def migrate(directory: str = MIGRATIONS_PATH, post_deploy: bool = False) -> None:
+    """
+    :param post_deploy: после основных миграций применить и post_deploy;
+                        только когда старые экземпляры приложения остановлены
+    """
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level='AUTOCOMMIT')
+        migrator = Migrator(conn)
+        await migrator.apply(directory)
+        if post_deploy:
+            await migrator.apply(os.path.join(directory, POST_DEPLOY_DIR))
+
+
+async def main(post_deploy: bool) -> None:
+    await migrate(post_deploy=post_deploy)
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Применение миграций схемы')
+    parser.add_argument('--post-deploy', action='store_true',
+                        help='применить и post_deploy-миграции (после остановки старой версии)')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args.post_deploy))
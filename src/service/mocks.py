@@ -125,6 +125,7 @@ candidates = [
         "adress_code": 33,
         "citizenship_code": 1,
         "family_status_code": 1,
+        "company_id": "00000000-0000-0000-0000-000000000000",
         "creator_id": "00000000-0000-0000-0000-000000000001"
       },
       {
@@ -138,6 +139,7 @@ candidates = [
         "adress_code": 67,
         "citizenship_code": 1,
         "family_status_code": 2,
+        "company_id": "00000000-0000-0000-0000-000000000000",
         "creator_id": "00000000-0000-0000-0000-000000000001"
       },
       {
@@ -151,6 +153,7 @@ candidates = [
         "adress_code": 21,
         "citizenship_code": 1,
         "family_status_code": 1,
+        "company_id": "00000000-0000-0000-0000-000000000000",
         "creator_id": "00000000-0000-0000-0000-000000000001"
       },
       {
@@ -164,6 +167,7 @@ candidates = [
         "adress_code": 21,
         "citizenship_code": 1,
         "family_status_code": 1,
+        "company_id": "00000000-0000-0000-0000-000000000000",
         "creator_id": "00000000-0000-0000-0000-000000000001"
       }
 ]
@@ -401,6 +405,7 @@ interviews = [
         "vacancy_id": "00000000-0000-0000-0000-000000000030",
         "candidate_id": "00000000-0000-0000-0000-000000000020",
         "stage_code": 9,
+        "company_id": "00000000-0000-0000-0000-000000000000",
         "creator_id": "00000000-0000-0000-0000-000000000001"
       },
       {
@@ -408,6 +413,7 @@ interviews = [
         "vacancy_id": "00000000-0000-0000-0000-000000000030",
         "candidate_id": "00000000-0000-0000-0000-000000000021",
         "stage_code": 8,
+        "company_id": "00000000-0000-0000-0000-000000000000",
         "creator_id": "00000000-0000-0000-0000-000000000001"
       },
       {
@@ -415,6 +421,7 @@ interviews = [
         "vacancy_id": "00000000-0000-0000-0000-000000000031",
         "candidate_id": "00000000-0000-0000-0000-000000000022",
         "stage_code": 1,
+        "company_id": "00000000-0000-0000-0000-000000000000",
         "creator_id": "00000000-0000-0000-0000-000000000001"
       }
 ]
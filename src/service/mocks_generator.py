@@ -0,0 +1,354 @@
+"""
+Генератор синтетических данных крупного арендатора для профилирования и бенчмарков.
+В отличие от service/mocks.py записи создаются программно в заданном масштабе
+и загружаются в бд через COPY (asyncpg.copy_records_to_table).
+
+Запуск из корня репозитория:
+    python -m src.service.mocks_generator --scale 1
+Масштаб 1 - одна компания, 100 тыс. кандидатов, ~500 тыс. дочерних записей
+кандидатов и 50 тыс. собеседований. Каждый запуск добавляет новые компании.
+"""
+import argparse
+import asyncio
+import datetime as dt
+import logging
+import random
+import time
+import typing as tp
+import uuid
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio.engine import AsyncConnection
+
+from .database import engine
+from .seeds import Seeder
+from .migrations import migrate
+from .passwords import password_hasher
+from . import models as m
+from ..config import REFS_SQL_PATH
+
+
+logger = logging.getLogger(__name__)
+
+FIRST_NAMES_MALE = ('Александр', 'Дмитрий', 'Максим', 'Сергей', 'Андрей', 'Алексей', 'Артем', 'Илья',
+                    'Кирилл', 'Михаил', 'Никита', 'Матвей', 'Роман', 'Егор', 'Арсений', 'Иван',
+                    'Денис', 'Евгений', 'Даниил', 'Тимофей', 'Владислав', 'Игорь', 'Павел', 'Николай')
+FIRST_NAMES_FEMALE = ('Анастасия', 'Мария', 'Анна', 'Виктория', 'Екатерина', 'Наталья', 'Марина',
+                      'Полина', 'Дарья', 'Алиса', 'Ксения', 'Елена', 'Ольга', 'Татьяна', 'Ирина',
+                      'Юлия', 'Вероника', 'Софья', 'Александра', 'Валерия')
+# фамилии на -ов/-ев/-ин, женская форма образуется добавлением "а"
+LAST_NAMES = ('Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Петров', 'Соколов', 'Михайлов',
+              'Новиков', 'Федоров', 'Морозов', 'Волков', 'Алексеев', 'Лебедев', 'Семенов', 'Егоров',
+              'Павлов', 'Козлов', 'Степанов', 'Николаев', 'Орлов', 'Андреев', 'Макаров', 'Никитин',
+              'Захаров', 'Зайцев', 'Соловьев', 'Борисов', 'Яковлев', 'Григорьев', 'Романов', 'Воробьев',
+              'Сергеев', 'Кузьмин', 'Фролов', 'Александров', 'Дмитриев', 'Королев', 'Гусев', 'Киселев',
+              'Ильин', 'Максимов', 'Поляков', 'Сорокин', 'Виноградов', 'Ковалев', 'Белов', 'Медведев')
+MIDDLE_NAMES_MALE = ('Александрович', 'Дмитриевич', 'Сергеевич', 'Андреевич', 'Алексеевич', 'Иванович',
+                     'Михайлович', 'Николаевич', 'Владимирович', 'Петрович', 'Евгеньевич', 'Олегович')
+MIDDLE_NAMES_FEMALE = ('Александровна', 'Дмитриевна', 'Сергеевна', 'Андреевна', 'Алексеевна', 'Ивановна',
+                       'Михайловна', 'Николаевна', 'Владимировна', 'Петровна', 'Евгеньевна', 'Олеговна')
+
+DEPARTMENTS = ('Отдел разработки', 'Отдел аналитики', 'Отдел администрирования', 'Отдел тестирования',
+               'Отдел продаж', 'Отдел маркетинга', 'Отдел кадров', 'Бухгалтерия')
+POSITIONS = ('Python-developer', 'Java-developer', 'Frontend-developer', 'DevOps-engineer', 'QA-engineer',
+             'Data Scientist', 'Системный аналитик', 'Бизнес-аналитик', 'Project manager', 'HR-менеджер')
+GRADES = ('Intern', 'Junior', 'Middle', 'Senior', 'Lead')
+SKILLS = ('Python', 'FastAPI', 'Django', 'Flask', 'SQLAlchemy', 'PostgreSQL', 'MySQL', 'Redis', 'Kafka',
+          'RabbitMQ', 'Docker', 'Kubernetes', 'Linux', 'Git', 'CI/CD', 'Java', 'Spring', 'Kotlin', 'Go',
+          'JavaScript', 'TypeScript', 'React', 'Vue', 'Angular', 'HTML', 'CSS', 'Node.js', 'C#', '.NET',
+          'C++', 'SQL', 'Pandas', 'NumPy', 'PyTorch', 'TensorFlow', 'Airflow', 'Spark', 'Hadoop', 'ClickHouse',
+          'Elasticsearch', 'Nginx', 'Terraform', 'Ansible', 'Prometheus', 'Grafana', 'Selenium', 'Pytest',
+          'Jira', 'Confluence', 'Figma', 'UML', 'BPMN', 'REST', 'GraphQL', 'gRPC', 'Scrum', 'Kanban')
+EMPLOYERS = ('Яндекс', 'Сбер', 'Тинькофф', 'VK', 'Ozon', 'Wildberries', 'Авито', 'Касперский', 'РНКБ',
+             'МТС', 'Билайн', 'Ростелеком', 'Альфа-Банк', 'ВТБ', 'Газпром нефть', 'X5 Group', 'Lamoda',
+             'СКБ Контур', 'Positive Technologies', '1С', 'Kamenolomnya', 'AVTOVAZ', 'CryptoAnalitics')
+NOTES = ('Кандидат сильный, стоит пригласить', 'Рассматривает релокацию', 'Ожидания по зарплате выше вилки',
+         'Перезвонить через месяц', 'Хорошие софт-скиллы', 'Нужна дополнительная проверка навыков',
+         'Готов выйти через две недели', 'Интересуется удаленной работой')
+
+
+class Scale(tp.NamedTuple):
+    companies: int
+    users_per_company: int
+    skills_per_company: int
+    vacancies_per_company: int
+    candidates_per_company: int
+    interviews_per_company: int
+
+    @classmethod
+    def from_factor(cls, factor: float) -> 'Scale':
+        """
+        Масштаб 1: 1 компания × 100 тыс. кандидатов × 50 тыс. собеседований.
+        Дробный масштаб уменьшает объем внутри одной компании, масштаб больше 1 добавляет компании.
+        """
+        companies = max(1, int(factor))
+        per_company = factor / companies
+        return cls(companies=companies,
+                   users_per_company=50,
+                   skills_per_company=len(SKILLS),
+                   vacancies_per_company=max(1, int(2_000 * per_company)),
+                   candidates_per_company=max(1, int(100_000 * per_company)),
+                   interviews_per_company=max(1, int(50_000 * per_company)))
+
+
+class RefCodes(tp.NamedTuple):
+    adresses: tp.List[int]
+    countries: tp.List[int]
+    family_stats: tp.List[int]
+    contact_types: tp.List[int]
+    languages: tp.List[int]
+    language_levels: tp.List[int]
+    interview_stages: tp.List[int]
+    vacancy_priorities: tp.List[int]
+    vacancy_stats: tp.List[int]
+    roles: tp.List[int]
+
+
+class MocksGenerator:
+    """
+    Генерирует связанные данные, согласованные с ограничениями models.py:
+    кириллические ФИО (CHECK на first/last/middle_name), положительные зарплаты
+    и salary_from <= salary_to, существующие коды справочников и внешние ключи.
+    """
+
+    def __init__(self, conn: AsyncConnection, scale: Scale, seed: int = 0, skip_fk_checks: bool = True) -> None:
+        self._conn = conn
+        self._scale = scale
+        self._skip_fk_checks = skip_fk_checks
+        self._rng = random.Random(seed)
+        self._now = dt.datetime.now()
+        self.counts: tp.Dict[str, int] = {}
+
+    async def generate(self) -> None:
+        await self._ensure_refs()
+        refs = await self._load_ref_codes()
+        password = (await password_hasher.hash('password')).hash
+        if self._skip_fk_checks:
+            await self._disable_fk_triggers()
+        for _ in range(self._scale.companies):
+            await self._generate_company(refs, password)
+        for table in self.counts:
+            await self._conn.execute(text(f'ANALYZE {table}'))
+
+    async def _disable_fk_triggers(self) -> None:
+        """
+        Проверки внешних ключей выполняются триггером на каждую строку и занимают
+        больше половины времени загрузки. Данные согласованы по построению, поэтому
+        до конца транзакции триггеры отключаются (нужны права суперпользователя).
+        """
+        try:
+            async with self._conn.begin_nested():
+                await self._conn.execute(text('SET LOCAL session_replication_role = replica'))
+        except DBAPIError:
+            logger.warning('Not allowed to set session_replication_role, loading with foreign key checks')
+
+    async def _ensure_refs(self) -> None:
+        seeder = Seeder(self._conn)
+        await seeder.lock()
+        await seeder.apply_sql_file('refs', REFS_SQL_PATH)
+
+    async def _load_ref_codes(self) -> RefCodes:
+        async def codes(sa_model) -> tp.List[int]:
+            res = await self._conn.scalars(select(sa_model.code))
+            return list(res.all())
+
+        return RefCodes(adresses=await codes(m.AdressRef),
+                        countries=await codes(m.CountryRef),
+                        family_stats=await codes(m.FamilyStatusRef),
+                        contact_types=await codes(m.ContactTypeRef),
+                        languages=await codes(m.LanguageRef),
+                        language_levels=await codes(m.LanguageLevelRef),
+                        interview_stages=await codes(m.InterviewStageRef),
+                        vacancy_priorities=await codes(m.VacancyPriorityRef),
+                        vacancy_stats=await codes(m.VacansyStatusRef),
+                        roles=await codes(m.RoleRef))
+
+    async def _generate_company(self, refs: RefCodes, password: bytes) -> None:
+        rng = self._rng
+        scale = self._scale
+
+        company_id = self._uuid()
+        await self._copy(m.Company, ('id', 'full_name', 'short_name', 'ogrn'),
+                         [(company_id, f'ООО Компания {company_id.hex[:8]}', f'Компания {company_id.hex[:8]}',
+                           str(rng.randrange(10 ** 12, 10 ** 13)))])
+
+        departments = [self._uuid() for _ in DEPARTMENTS]
+        positions = [self._uuid() for _ in POSITIONS]
+        grades = [self._uuid() for _ in GRADES]
+        await self._copy(m.Department, ('id', 'name', 'company_id'),
+                         [(id_, name, company_id) for id_, name in zip(departments, DEPARTMENTS)])
+        await self._copy(m.Position, ('id', 'name', 'company_id'),
+                         [(id_, name, company_id) for id_, name in zip(positions, POSITIONS)])
+        await self._copy(m.Grade, ('id', 'name', 'company_id'),
+                         [(id_, name, company_id) for id_, name in zip(grades, GRADES)])
+
+        users = [self._uuid() for _ in range(scale.users_per_company)]
+        await self._copy(m.User,
+                         ('id', 'username', 'password', 'role_code', 'company_id', 'department_id',
+                          'position_id', 'grade_id', 'first_name', 'last_name', 'middle_name', 'email'),
+                         (self._user(id_, i, company_id, departments, positions, grades, refs, password)
+                          for i, id_ in enumerate(users)))
+
+        skills = await self._skills(company_id)
+
+        vacancies = [self._uuid() for _ in range(scale.vacancies_per_company)]
+        await self._copy(m.Vacancy,
+                         ('id', 'position_id', 'department_id', 'grade_id', 'salary_from', 'salary_to',
+                          'employee_count', 'priority_code', 'deadline', 'company_id', 'recruiter_id',
+                          'status_code', 'adress_code', 'project', 'creator_id', 'created_at'),
+                         (self._vacancy(id_, company_id, departments, positions, grades, users, refs)
+                          for id_ in vacancies))
+        await self._copy(m.VacancySkill, ('skill_id', 'vacancy_id', 'creator_id'),
+                         ((skill_id, vacancy_id, rng.choice(users))
+                          for vacancy_id in vacancies
+                          for skill_id in rng.sample(skills, rng.randint(2, 6))))
+
+        candidates = [self._uuid() for _ in range(scale.candidates_per_company)]
+        await self._copy(m.Candidate,
+                         ('id', 'position_id', 'grade_id', 'first_name', 'last_name', 'middle_name',
+                          'birth_date', 'min_salary', 'adress_code', 'citizenship_code', 'family_status_code',
+                          'company_id', 'creator_id', 'created_at'),
+                         (self._candidate(id_, company_id, positions, grades, users, refs) for id_ in candidates))
+        await self._copy(m.CandidateContact, ('candidate_id', 'type_code', 'value', 'is_priority', 'creator_id'),
+                         (row for id_ in candidates for row in self._contacts(id_, users, refs)))
+        await self._copy(m.CandidateWorkPlace,
+                         ('candidate_id', 'position', 'company', 'work_from', 'work_to', 'is_actual', 'creator_id'),
+                         (row for id_ in candidates for row in self._work_places(id_, users)))
+        await self._conn.execute(m.candidate_experience_update(m.Candidate.company_id == company_id))
+        await self._copy(m.CandidateLanguageAbility,
+                         ('candidate_id', 'language_code', 'language_level_code', 'creator_id'),
+                         ((id_, language, rng.choice(refs.language_levels), rng.choice(users))
+                          for id_ in candidates
+                          for language in rng.sample(refs.languages, rng.randint(0, min(2, len(refs.languages))))))
+        await self._copy(m.CandidateNote, ('candidate_id', 'note', 'creator_id'),
+                         ((id_, rng.choice(NOTES), rng.choice(users))
+                          for id_ in candidates for _ in range(rng.randint(0, 1))))
+        await self._copy(m.CandidateSkill, ('candidate_id', 'skill_id', 'creator_id'),
+                         ((id_, skill_id, rng.choice(users))
+                          for id_ in candidates for skill_id in rng.sample(skills, rng.randint(0, 3))))
+
+        interviews = []
+        await self._copy(m.Interview,
+                         ('id', 'candidate_id', 'vacancy_id', 'stage_code', 'company_id', 'creator_id', 'created_at'),
+                         (self._interview(interviews, company_id, candidates, vacancies, users, refs)
+                          for _ in range(scale.interviews_per_company)))
+        await self._copy(m.InterviewStageResult,
+                         ('interview_id', 'interview_stage_code_old', 'interview_stage_code_new',
+                          'note', 'creator_id', 'created_at'),
+                         (row for interview in interviews for row in self._stage_results(interview, users, refs)))
+
+    async def _skills(self, company_id) -> tp.List[uuid.UUID]:
+        # навыки уникальны по normalized_name во всей бд (см. skills/repos.py),
+        # поэтому уже существующие переиспользуются
+        names = SKILLS[:self._scale.skills_per_company]
+        normalized = [name.capitalize() for name in names]
+        stmt = insert(m.Skill).values([{'name': name, 'normalized_name': normalized_name, 'company_id': company_id}
+                                       for name, normalized_name in zip(names, normalized)])
+        await self._conn.execute(stmt.on_conflict_do_nothing())
+        res = await self._conn.scalars(select(m.Skill.id).where(m.Skill.normalized_name.in_(normalized)))
+        return list(res.all())
+
+    def _user(self, id_, i, company_id, departments, positions, grades, refs, password):
+        rng = self._rng
+        first_name, last_name, middle_name = self._fio()
+        return (id_, f'user{i}_{id_.hex[:12]}', password, rng.choice(refs.roles), company_id,
+                rng.choice(departments), rng.choice(positions), rng.choice(grades),
+                first_name, last_name, middle_name, f'{id_.hex[:12]}@example.com')
+
+    def _vacancy(self, id_, company_id, departments, positions, grades, users, refs):
+        rng = self._rng
+        salary_from = rng.randrange(40, 400) * 1000
+        return (id_, rng.choice(positions), rng.choice(departments), rng.choice(grades),
+                salary_from, salary_from + rng.randrange(0, 200) * 1000, rng.randint(1, 10),
+                rng.choice(refs.vacancy_priorities), (self._now + dt.timedelta(days=rng.randint(-180, 180))).date(),
+                company_id, rng.choice(users), rng.choice(refs.vacancy_stats), rng.choice(refs.adresses),
+                None, rng.choice(users), self._created_at())
+
+    def _candidate(self, id_, company_id, positions, grades, users, refs):
+        rng = self._rng
+        first_name, last_name, middle_name = self._fio()
+        birth_date = dt.date(rng.randint(1965, 2004), rng.randint(1, 12), rng.randint(1, 28))
+        return (id_, rng.choice(positions), rng.choice(grades), first_name, last_name, middle_name,
+                birth_date, rng.randrange(30, 500) * 1000, rng.choice(refs.adresses), rng.choice(refs.countries),
+                rng.choice(refs.family_stats), company_id, rng.choice(users), self._created_at())
+
+    def _contacts(self, candidate_id, users, refs):
+        rng = self._rng
+        creator_id = rng.choice(users)
+        yield (candidate_id, rng.choice(refs.contact_types), f'7978{rng.randrange(10 ** 6, 10 ** 7)}', True, creator_id)
+        if rng.random() < 0.5:
+            yield (candidate_id, rng.choice(refs.contact_types), f'{candidate_id.hex[:10]}@mail.ru', False, creator_id)
+
+    def _work_places(self, candidate_id, users):
+        rng = self._rng
+        creator_id = rng.choice(users)
+        work_from = dt.date(rng.randint(2005, 2015), rng.randint(1, 12), rng.randint(1, 28))
+        for i in range(rng.randint(0, 3)):
+            work_to = work_from + dt.timedelta(days=rng.randint(180, 1500))
+            is_actual = work_to >= self._now.date()
+            yield (candidate_id, rng.choice(POSITIONS), rng.choice(EMPLOYERS), work_from,
+                   None if is_actual else work_to, is_actual, creator_id)
+            if is_actual:
+                return
+            work_from = work_to + dt.timedelta(days=rng.randint(1, 90))
+
+    def _interview(self, interviews, company_id, candidates, vacancies, users, refs):
+        rng = self._rng
+        row = (self._uuid(), rng.choice(candidates), rng.choice(vacancies), rng.choice(refs.interview_stages),
+               company_id, rng.choice(users), self._created_at())
+        interviews.append(row)
+        return row
+
+    def _stage_results(self, interview, users, refs):
+        rng = self._rng
+        interview_id, _, _, stage_code, _, creator_id, created_at = interview
+        for i in range(rng.randint(0, 2)):
+            yield (interview_id, rng.choice(refs.interview_stages), stage_code, rng.choice(NOTES), creator_id,
+                   created_at + dt.timedelta(days=i + 1))
+
+    def _fio(self) -> tp.Tuple[str, str, str]:
+        rng = self._rng
+        if rng.random() < 0.5:
+            return rng.choice(FIRST_NAMES_MALE), rng.choice(LAST_NAMES), rng.choice(MIDDLE_NAMES_MALE)
+        return rng.choice(FIRST_NAMES_FEMALE), rng.choice(LAST_NAMES) + 'а', rng.choice(MIDDLE_NAMES_FEMALE)
+
+    def _created_at(self) -> dt.datetime:
+        # равномерно за последние три года
+        return self._now - dt.timedelta(seconds=self._rng.randrange(3 * 365 * 24 * 3600))
+
+    def _uuid(self) -> uuid.UUID:
+        return uuid.UUID(int=self._rng.getrandbits(128), version=4)
+
+    async def _copy(self, sa_model, columns: tp.Sequence[str], records: tp.Iterable[tuple]) -> None:
+        raw_conn = await self._conn.get_raw_connection()
+        records = list(records)
+        await raw_conn.dbapi_connection.driver_connection.copy_records_to_table(
+            sa_model.__tablename__, records=records, columns=columns)
+        self.counts[sa_model.__tablename__] = self.counts.get(sa_model.__tablename__, 0) + len(records)
+
+
+async def main(scale: Scale, seed: int, skip_fk_checks: bool = True) -> None:
+    started = time.perf_counter()
+    # старых экземпляров приложения здесь нет, поэтому сразу с post_deploy
+    await migrate(post_deploy=True)
+    async with engine.begin() as conn:
+        generator = MocksGenerator(conn, scale, seed, skip_fk_checks)
+        await generator.generate()
+    await engine.dispose()
+    password_hasher.shutdown()
+
+    for table, count in generator.counts.items():
+        print(f'{table:<30} {count:>10}')
+    print(f'{"total":<30} {sum(generator.counts.values()):>10} rows in {time.perf_counter() - started:.1f}s')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Генерация синтетических данных через COPY')
+    parser.add_argument('--scale', type=float, default=1.0, help='1 = компания на 100 тыс. кандидатов')
+    parser.add_argument('--seed', type=int, default=None, help='зерно генератора для воспроизводимости')
+    parser.add_argument('--fk-checks', action='store_true', help='не отключать проверки внешних ключей при загрузке')
+    args = parser.parse_args()
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    asyncio.run(main(Scale.from_factor(args.scale), seed, skip_fk_checks=not args.fk_checks))
@@ -20,6 +20,7 @@ class MocksLoader:
         await self._load(mocks.candidates, m.Candidate)
         await self._load(mocks.candidate_contacts, m.CandidateContact)
         await self._load(mocks.candidate_work_places, m.CandidateWorkPlace)
+        await self._conn.execute(m.candidate_experience_update(m.Candidate.id.in_([c['id'] for c in mocks.candidates])))
         await self._load(mocks.candidate_languages, m.CandidateLanguageAbility)
         await self._load(mocks.candidate_notes, m.CandidateNote)
         await self._load(mocks.candidate_skills, m.CandidateSkill)
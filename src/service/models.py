@@ -1,13 +1,19 @@
 import uuid
 import sqlalchemy as sa
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, column_property
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy_utils.types.password import PasswordType
 
 
 Base = declarative_base()
 
+# индексы поиска по ФИО (gin_trgm_ops) требуют расширения pg_trgm
+sa.event.listen(Base.metadata, 'before_create', sa.DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+
+# точка отсчета для хранения дат в виде количества дней
+EPOCH = sa.literal_column("DATE '1970-01-01'")
+
 
 class VacancyPriorityRef(Base):
     __tablename__ = 'vacancy_priorities_ref'
@@ -120,7 +126,7 @@ class Department(Base):
     name = sa.Column(sa.String, nullable=False)
     company_id = sa.Column(UUID(as_uuid=True), sa.ForeignKey('companies.id'), nullable=False)
     
-    company = relationship('Company', lazy='selectin')
+    company = relationship('Company', lazy='raise')
     
 
 class Position(Base):
@@ -130,7 +136,7 @@ class Position(Base):
     name = sa.Column(sa.String, nullable=False)
     company_id = sa.Column(UUID(as_uuid=True), sa.ForeignKey('companies.id'), nullable=False)
     
-    company = relationship('Company', lazy='selectin')    
+    company = relationship('Company', lazy='raise')    
 
     
 class Grade(Base):
@@ -140,7 +146,7 @@ class Grade(Base):
     name = sa.Column(sa.String, nullable=False)
     company_id = sa.Column(UUID(as_uuid=True), sa.ForeignKey('companies.id'), nullable=False)
     
-    company = relationship('Company', lazy='selectin')
+    company = relationship('Company', lazy='raise')
     
     
 class User(Base):
@@ -164,12 +170,12 @@ class User(Base):
     updated_at = sa.Column(sa.DateTime, server_default=sa.sql.func.now(), onupdate=sa.sql.func.now())
     logged_in_at = sa.Column(sa.DateTime)
     
-    role = relationship('RoleRef', lazy='selectin')
-    company = relationship('Company', lazy='selectin')
-    department = relationship('Department', lazy='selectin')
-    position = relationship('Position', lazy='selectin')
-    grade = relationship('Grade', lazy='selectin')
-    creator = relationship('User', lazy='selectin')
+    role = relationship('RoleRef', lazy='raise')
+    company = relationship('Company', lazy='raise')
+    department = relationship('Department', lazy='raise')
+    position = relationship('Position', lazy='raise')
+    grade = relationship('Grade', lazy='raise')
+    creator = relationship('User', lazy='raise')
     
     
 class RefreshToken(Base):
@@ -179,7 +185,7 @@ class RefreshToken(Base):
     expires_at = sa.Column(sa.DateTime, nullable=False)
     user_id = sa.Column(UUID(as_uuid=True), sa.ForeignKey('users.id'))
     
-    user = relationship('User', lazy='selectin')
+    user = relationship('User', lazy='raise')
     
     
 class Skill(Base):
@@ -190,7 +196,7 @@ class Skill(Base):
     normalized_name = sa.Column(sa.String, nullable=False, unique=True)
     company_id = sa.Column(UUID(as_uuid=True), sa.ForeignKey('companies.id'), nullable=False)
     
-    company = relationship('Company', lazy='selectin')
+    company = relationship('Company', lazy='raise')
     
     
 class DepartmentSkill(Base):
@@ -204,9 +210,9 @@ class DepartmentSkill(Base):
     updated_at = sa.Column(sa.DateTime, server_default=sa.sql.func.now(), onupdate=sa.sql.func.now())
     is_deleted = sa.Column(sa.Boolean, server_default=sa.text('False'), nullable=False)
 
-    skill = relationship('Skill', lazy='selectin')
-    department = relationship('Department', lazy='selectin')
-    creator = relationship('User', lazy='selectin')
+    skill = relationship('Skill', lazy='raise')
+    department = relationship('Department', lazy='raise')
+    creator = relationship('User', lazy='raise')
     
     
 class Vacancy(Base):
@@ -214,6 +220,7 @@ class Vacancy(Base):
     __table_args__ = (
         sa.CheckConstraint("salary_from > 0 AND salary_from <= salary_to"),
         sa.CheckConstraint("employee_count >= 0 AND employee_count <= 1000"),
+        sa.Index('ix_vacancies_company_id_created_at', 'company_id', 'is_deleted', sa.text('created_at DESC')),
         )
     
     id = sa.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=sa.text("gen_random_uuid()"))
@@ -235,19 +242,23 @@ class Vacancy(Base):
     updated_at = sa.Column(sa.DateTime, server_default=sa.sql.func.now(), onupdate=sa.sql.func.now())
     is_deleted = sa.Column(sa.Boolean, server_default=sa.text('False'), nullable=False)
 
-    department = relationship('Department', lazy='selectin')
-    position = relationship('Position', lazy='selectin')
-    grade = relationship('Grade', lazy='selectin')
-    priority = relationship('VacancyPriorityRef', lazy='selectin')
-    adress = relationship('AdressRef', lazy='selectin')
-    status = relationship('VacansyStatusRef', lazy='selectin')
-    skills = relationship('VacancySkill', lazy='selectin')
+    department = relationship('Department', lazy='raise')
+    position = relationship('Position', lazy='raise')
+    grade = relationship('Grade', lazy='raise')
+    priority = relationship('VacancyPriorityRef', lazy='raise')
+    adress = relationship('AdressRef', lazy='raise')
+    status = relationship('VacansyStatusRef', lazy='raise')
+    skills = relationship('VacancySkill', lazy='raise')
     # recruiter = relationship('User', primaryjoin = 'Vacancy.recruiter_id == User.id')
-    creator = relationship('User', primaryjoin = 'Vacancy.creator_id == User.id')
+    creator = relationship('User', primaryjoin = 'Vacancy.creator_id == User.id', lazy='raise')
     
     
 class VacancySkill(Base):
     __tablename__ = 'vacancy_skills'
+    __table_args__ = (
+        sa.Index('ix_vacancy_skills_vacancy_id', 'vacancy_id'),
+        sa.Index('ix_vacancy_skills_skill_id_vacancy_id', 'skill_id', 'vacancy_id'),
+        )
     
     id = sa.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=sa.text("gen_random_uuid()"))
     skill_id = sa.Column(UUID(as_uuid=True), sa.ForeignKey('skills.id'), nullable=False)
@@ -257,8 +268,8 @@ class VacancySkill(Base):
     updated_at = sa.Column(sa.DateTime, server_default=sa.sql.func.now(), onupdate=sa.sql.func.now())
     is_deleted = sa.Column(sa.Boolean, server_default=sa.text('False'), nullable=False)
 
-    skill = relationship('Skill', lazy='selectin')
-    creator = relationship('User', lazy='selectin')
+    skill = relationship('Skill', lazy='raise')
+    creator = relationship('User', lazy='raise')
     
     
 class File(Base):
@@ -281,6 +292,11 @@ class Candidate(Base):
         sa.CheckConstraint("last_name ~ '^([А-я]|-)*$'"),
         sa.CheckConstraint("middle_name ~ '^([А-я]|-)*$'"),
         sa.CheckConstraint("min_salary > 0"),
+        sa.Index('ix_candidates_company_id_created_at_id', 'company_id', 'is_deleted', sa.text('created_at DESC'), sa.text('id DESC')),
+        sa.Index('ix_candidates_company_id_updated_at', 'company_id', 'updated_at'),
+        sa.Index('ix_candidates_first_name_trgm', 'first_name', postgresql_using='gin', postgresql_ops={'first_name': 'gin_trgm_ops'}),
+        sa.Index('ix_candidates_last_name_trgm', 'last_name', postgresql_using='gin', postgresql_ops={'last_name': 'gin_trgm_ops'}),
+        sa.Index('ix_candidates_middle_name_trgm', 'middle_name', postgresql_using='gin', postgresql_ops={'middle_name': 'gin_trgm_ops'}),
         )
     
     id = sa.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=sa.text("gen_random_uuid()"))
@@ -294,26 +310,47 @@ class Candidate(Base):
     adress_code = sa.Column(sa.Integer, sa.ForeignKey('adresses_ref.code'))
     citizenship_code = sa.Column(sa.Integer, sa.ForeignKey('countries_ref.code'))
     family_status_code = sa.Column(sa.Integer, sa.ForeignKey('family_stats_ref.code'))
+    # стаж хранится так, чтобы его текущее значение считалось без чтения мест работы:
+    # experience_base - сумма дней завершенных периодов минус дни от EPOCH до начала
+    # незавершенных, experience_open_count - количество незавершенных периодов.
+    # Пересчитываются candidate_experience_update при каждом изменении мест работы
+    experience_base = sa.Column(sa.Integer, server_default=sa.text('0'), nullable=False)
+    experience_open_count = sa.Column(sa.Integer, server_default=sa.text('0'), nullable=False)
+    company_id = sa.Column(UUID(as_uuid=True), sa.ForeignKey('companies.id'), nullable=False)
     creator_id = sa.Column(UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False)
     created_at = sa.Column(sa.DateTime, server_default=sa.sql.func.now())
     updated_at = sa.Column(sa.DateTime, server_default=sa.sql.func.now(), onupdate=sa.sql.func.now())
     is_deleted = sa.Column(sa.Boolean, server_default=sa.text('False'), nullable=False)
 
-    position = relationship('Position', lazy='selectin')
-    grade = relationship('Grade', lazy='selectin')
-    adress = relationship('AdressRef', lazy='selectin')
-    citizenship = relationship('CountryRef', lazy='selectin')
-    family_status = relationship('FamilyStatusRef', lazy='selectin')
-    contacts = relationship('CandidateContact', lazy='selectin')
-    languages = relationship('CandidateLanguageAbility', lazy='selectin')
-    notes = relationship('CandidateNote', lazy='selectin')
-    skills = relationship('CandidateSkill', lazy='selectin')
-    work_places = relationship('CandidateWorkPlace', lazy='selectin')
-    creator = relationship('User', lazy='selectin')
+    # общий стаж в днях на текущую дату
+    work_experience_days = column_property(experience_base + experience_open_count * (sa.func.current_date() - EPOCH))
+
+    position = relationship('Position', lazy='raise')
+    grade = relationship('Grade', lazy='raise')
+    adress = relationship('AdressRef', lazy='raise')
+    citizenship = relationship('CountryRef', lazy='raise')
+    family_status = relationship('FamilyStatusRef', lazy='raise')
+    company = relationship('Company', lazy='raise')
+    contacts = relationship('CandidateContact', lazy='raise')
+    languages = relationship('CandidateLanguageAbility', lazy='raise')
+    notes = relationship('CandidateNote', lazy='raise')
+    skills = relationship('CandidateSkill', lazy='raise')
+    work_places = relationship('CandidateWorkPlace', lazy='raise')
+    creator = relationship('User', lazy='raise')
+
+
+# полное ФИО одной строкой; выражение должно совпадать с индексом ix_candidates_fio_trgm,
+# поэтому разделители подставляются литералами, а не параметрами запроса
+candidate_fio = Candidate.last_name + sa.literal_column("' '") + Candidate.first_name \
+                + sa.literal_column("' '") + sa.func.coalesce(Candidate.middle_name, sa.literal_column("''"))
+sa.Index('ix_candidates_fio_trgm', candidate_fio.label('fio'), postgresql_using='gin', postgresql_ops={'fio': 'gin_trgm_ops'})
     
     
 class CandidateContact(Base):
     __tablename__ = 'candidate_contacts'
+    __table_args__ = (
+        sa.Index('ix_candidate_contacts_candidate_id', 'candidate_id'),
+        )
     
     id = sa.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=sa.text("gen_random_uuid()"))
     candidate_id = sa.Column(UUID(as_uuid=True), sa.ForeignKey('candidates.id'), nullable=False)
@@ -325,12 +362,15 @@ class CandidateContact(Base):
     updated_at = sa.Column(sa.DateTime, server_default=sa.sql.func.now(), onupdate=sa.sql.func.now())
     is_deleted = sa.Column(sa.Boolean, server_default=sa.text('False'), nullable=False)
 
-    type = relationship('ContactTypeRef', lazy='selectin')
-    creator = relationship('User', lazy='selectin')
+    type = relationship('ContactTypeRef', lazy='raise')
+    creator = relationship('User', lazy='raise')
 
 
 class CandidateWorkPlace(Base):
     __tablename__ = 'candidate_work_places'
+    __table_args__ = (
+        sa.Index('ix_candidate_work_places_candidate_id', 'candidate_id'),
+        )
     
     id = sa.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=sa.text("gen_random_uuid()"))
     candidate_id = sa.Column(UUID(as_uuid=True), sa.ForeignKey('candidates.id'), nullable=False)
@@ -344,11 +384,35 @@ class CandidateWorkPlace(Base):
     updated_at = sa.Column(sa.DateTime, server_default=sa.sql.func.now(), onupdate=sa.sql.func.now())
     is_deleted = sa.Column(sa.Boolean, server_default=sa.text('False'), nullable=False)
 
-    creator = relationship('User', lazy='selectin')
+    creator = relationship('User', lazy='raise')
+
+
+def candidate_experience_update(*criteria) -> sa.Update:
+    '''
+    Пересчитывает хранимые части стажа кандидатов, отобранных criteria
+    '''
+    
+    open_ = CandidateWorkPlace.work_to.is_(None)
+    work_places = sa.select(CandidateWorkPlace) \
+                  .where(CandidateWorkPlace.candidate_id == Candidate.id) \
+                  .where(CandidateWorkPlace.is_deleted == False)
+    base = sa.func.sum(sa.case((open_, EPOCH - CandidateWorkPlace.work_from),
+                               else_=CandidateWorkPlace.work_to - CandidateWorkPlace.work_from))
+    open_count = sa.func.count().filter(open_)
+    
+    # пересчет стажа не считается изменением карточки, updated_at сохраняется
+    return sa.update(Candidate) \
+           .where(*criteria) \
+           .values(experience_base=work_places.with_only_columns(sa.func.coalesce(base, 0)).scalar_subquery(),
+                   experience_open_count=work_places.with_only_columns(open_count).scalar_subquery(),
+                   updated_at=Candidate.updated_at)
 
 
 class CandidateLanguageAbility(Base):
     __tablename__ = 'candidate_language_ability'
+    __table_args__ = (
+        sa.Index('ix_candidate_language_ability_candidate_id', 'candidate_id'),
+        )
     
     id = sa.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=sa.text("gen_random_uuid()"))
     candidate_id = sa.Column(UUID(as_uuid=True), sa.ForeignKey('candidates.id'), nullable=False)
@@ -359,13 +423,16 @@ class CandidateLanguageAbility(Base):
     updated_at = sa.Column(sa.DateTime, server_default=sa.sql.func.now(), onupdate=sa.sql.func.now())
     is_deleted = sa.Column(sa.Boolean, server_default=sa.text('False'), nullable=False)
 
-    language = relationship('LanguageRef', lazy="selectin")
-    language_level = relationship('LanguageLevelRef', lazy="selectin")
-    creator = relationship('User', lazy='selectin')
+    language = relationship('LanguageRef', lazy='raise')
+    language_level = relationship('LanguageLevelRef', lazy='raise')
+    creator = relationship('User', lazy='raise')
 
 
 class CandidateNote(Base):
     __tablename__ = 'candidate_notes'
+    __table_args__ = (
+        sa.Index('ix_candidate_notes_candidate_id', 'candidate_id'),
+        )
     
     id = sa.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=sa.text("gen_random_uuid()"))
     candidate_id = sa.Column(UUID(as_uuid=True), sa.ForeignKey('candidates.id'), nullable=False)
@@ -375,11 +442,15 @@ class CandidateNote(Base):
     updated_at = sa.Column(sa.DateTime, server_default=sa.sql.func.now(), onupdate=sa.sql.func.now())
     is_deleted = sa.Column(sa.Boolean, server_default=sa.text('False'), nullable=False)
 
-    creator = relationship('User', lazy='selectin')
+    creator = relationship('User', lazy='raise')
 
 
 class CandidateSkill(Base):
     __tablename__ = 'candidate_skills'
+    __table_args__ = (
+        sa.Index('ix_candidate_skills_candidate_id', 'candidate_id'),
+        sa.Index('ix_candidate_skills_skill_id_candidate_id', 'skill_id', 'candidate_id'),
+        )
     
     id = sa.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=sa.text("gen_random_uuid()"))
     candidate_id = sa.Column(UUID(as_uuid=True), sa.ForeignKey('candidates.id'), nullable=False)
@@ -389,26 +460,31 @@ class CandidateSkill(Base):
     updated_at = sa.Column(sa.DateTime, server_default=sa.sql.func.now(), onupdate=sa.sql.func.now())
     is_deleted = sa.Column(sa.Boolean, server_default=sa.text('False'), nullable=False)
 
-    skill = relationship('Skill', lazy='selectin')
-    creator = relationship('User', lazy='selectin')
+    skill = relationship('Skill', lazy='raise')
+    creator = relationship('User', lazy='raise')
 
 
 class Interview(Base):
     __tablename__ = 'interviews'
+    __table_args__ = (
+        sa.Index('ix_interviews_company_id_created_at_id', 'company_id', 'is_deleted', sa.text('created_at DESC'), sa.text('id DESC')),
+        )
     
     id = sa.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=sa.text("gen_random_uuid()"))
     candidate_id = sa.Column(UUID(as_uuid=True), sa.ForeignKey('candidates.id'), nullable=False)
     vacancy_id = sa.Column(UUID(as_uuid=True), sa.ForeignKey('vacancies.id'), nullable=False)
     stage_code = sa.Column(sa.Integer, sa.ForeignKey('interview_stages_ref.code'), nullable=False)    
+    company_id = sa.Column(UUID(as_uuid=True), sa.ForeignKey('companies.id'), nullable=False)
     creator_id = sa.Column(UUID(as_uuid=True), sa.ForeignKey('users.id'))
     created_at = sa.Column(sa.DateTime, server_default=sa.sql.func.now())
     updated_at = sa.Column(sa.DateTime, server_default=sa.sql.func.now(), onupdate=sa.sql.func.now())
     is_deleted = sa.Column(sa.Boolean, server_default=sa.text('False'), nullable=False)
 
-    candidate = relationship('Candidate', lazy='joined')
-    vacancy = relationship('Vacancy', lazy='joined')
-    stage = relationship('InterviewStageRef', lazy='joined')
-    creator = relationship('User', lazy='joined')
+    candidate = relationship('Candidate', lazy='raise')
+    vacancy = relationship('Vacancy', lazy='raise')
+    stage = relationship('InterviewStageRef', lazy='raise')
+    company = relationship('Company', lazy='raise')
+    creator = relationship('User', lazy='raise')
 
 
 class InterviewStageResult(Base):
@@ -424,7 +500,15 @@ class InterviewStageResult(Base):
     updated_at = sa.Column(sa.DateTime, server_default=sa.sql.func.now(), onupdate=sa.sql.func.now())
     is_deleted = sa.Column(sa.Boolean, server_default=sa.text('False'), nullable=False)
     
-    interview = relationship('Interview', lazy='selectin')
-    interview_stage_old = relationship('InterviewStageRef', primaryjoin = 'InterviewStageResult.interview_stage_code_old == InterviewStageRef.code', lazy='selectin')
-    interview_stage_new = relationship('InterviewStageRef', primaryjoin = 'InterviewStageResult.interview_stage_code_new == InterviewStageRef.code', lazy='selectin')
-    creator = relationship('User', lazy='selectin')
+    interview = relationship('Interview', lazy='raise')
+    interview_stage_old = relationship('InterviewStageRef', primaryjoin = 'InterviewStageResult.interview_stage_code_old == InterviewStageRef.code', lazy='raise')
+    interview_stage_new = relationship('InterviewStageRef', primaryjoin = 'InterviewStageResult.interview_stage_code_new == InterviewStageRef.code', lazy='raise')
+    creator = relationship('User', lazy='raise')
+
+
+class SeedVersion(Base):
+    __tablename__ = 'seed_versions'
+
+    name = sa.Column(sa.String, primary_key=True)
+    checksum = sa.Column(sa.String(64), nullable=False)
+    applied_at = sa.Column(sa.DateTime, server_default=sa.sql.func.now(), onupdate=sa.sql.func.now())
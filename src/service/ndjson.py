@@ -0,0 +1,67 @@
+"""
+Потоковый обмен в формате NDJSON: по одному json-документу на строку.
+"""
+import tempfile
+import typing as tp
+
+
+MEDIA_TYPE = 'application/x-ndjson'
+
+
+async def iter_lines(stream: tp.AsyncIterator[bytes],
+                     max_line_bytes: int) -> tp.AsyncIterator[tp.Tuple[int, tp.Optional[bytes]]]:
+    '''
+    Разбивает поток байт на строки, не накапливая его целиком.
+    Возвращает пары (номер строки с 1, строка без перевода строки \n или \r\n); пустые
+    строки пропускаются. Вместо строки длиннее max_line_bytes возвращается None
+    '''
+
+    buffer = b''
+    line_no = 0
+    overflow = False
+    async for chunk in stream:
+        *lines, buffer = (buffer + chunk).split(b'\n')
+        for line in lines:
+            line_no += 1
+            line = line[:-1] if line.endswith(b'\r') else line
+            if overflow:
+                overflow = False
+                yield line_no, None
+            elif line.strip():
+                yield line_no, line if len(line) <= max_line_bytes else None
+        # один байт сверх предела допустим: это может быть \r, чей \n придет следующим куском
+        if len(buffer) > max_line_bytes + 1:
+            # хвост строки до перевода строки отбрасывается
+            overflow = True
+            buffer = b''
+    line_no += 1
+    buffer = buffer[:-1] if buffer.endswith(b'\r') else buffer
+    if overflow:
+        yield line_no, None
+    elif buffer.strip():
+        yield line_no, buffer if len(buffer) <= max_line_bytes else None
+
+
+async def spool(lines: tp.AsyncIterator[bytes], max_memory_bytes: int) -> tp.IO[bytes]:
+    '''
+    Собирает строки во временный файл, который уходит на диск после max_memory_bytes.
+    Ответ отдается только после полного чтения тела запроса: клиенты, которые
+    читают ответ лишь после отправки тела, иначе заблокировались бы взаимно
+    с сервером на заполненных буферах сокета
+    '''
+
+    file = tempfile.SpooledTemporaryFile(max_size=max_memory_bytes)
+    try:
+        async for line in lines:
+            file.write(line)
+    except BaseException:
+        file.close()
+        raise
+    file.seek(0)
+    return file
+
+
+def iter_file(file: tp.IO[bytes], chunk_size: int = 64 * 1024) -> tp.Iterator[bytes]:
+    with file:
+        while chunk := file.read(chunk_size):
+            yield chunk
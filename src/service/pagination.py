@@ -0,0 +1,33 @@
+import base64
+import datetime as dt
+import json
+import typing as tp
+from uuid import UUID
+
+
+class KeysetCursor:
+    """
+    Непрозрачный курсор для постраничной выборки по ключу (..., created_at, id).
+    Перед created_at могут идти целочисленные поля сортировки, например стаж.
+    """
+
+    @staticmethod
+    def encode(*key: tp.Union[int, dt.datetime, UUID]) -> str:
+        *prefix, created_at, id = key
+        payload = json.dumps([*prefix, created_at.isoformat(), str(id)], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode(cursor: str, size: int = 2) -> tp.Tuple[tp.Union[int, dt.datetime, UUID], ...]:
+        """
+        :param size: ожидаемое количество полей ключа
+        :raises ValueError: если курсор поврежден или выдан для другой сортировки
+        """
+        try:
+            padding = '=' * (-len(cursor) % 4)
+            *prefix, created_at, id = json.loads(base64.urlsafe_b64decode(cursor + padding))
+            if len(prefix) != size - 2 or not all(type(value) is int for value in prefix):
+                raise ValueError('Invalid cursor')
+            return (*prefix, dt.datetime.fromisoformat(created_at), UUID(id))
+        except (TypeError, ValueError) as e:
+            raise ValueError('Invalid cursor') from e
@@ -0,0 +1,47 @@
+import asyncio
+import typing as tp
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy_utils.types.password import Password
+
+from . import models as m
+from .. import config
+
+
+class PasswordHasher:
+    """
+    Хэширование и проверка паролей в отдельном ограниченном пуле потоков,
+    чтобы pbkdf2 не блокировал event loop.
+    """
+
+    def __init__(self, context, max_workers: int) -> None:
+        self._context = context
+        self._max_workers = max_workers
+        self._executor: tp.Optional[ThreadPoolExecutor] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers,
+                                                thread_name_prefix='password-hasher')
+        return self._executor
+
+    async def hash(self, secret: str) -> Password:
+        """
+        Возвращает уже захэшированный пароль, который PasswordType сохранит без повторного хэширования.
+        """
+        loop = asyncio.get_running_loop()
+        hashed = await loop.run_in_executor(self.executor, self._context.hash, secret)
+        return Password(hashed, context=self._context)
+
+    async def verify(self, password: Password, secret: str) -> bool:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, password.__eq__, secret)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(m.User.password.type.context, config.PASSWORD_HASHING_WORKERS)
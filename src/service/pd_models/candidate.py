@@ -2,7 +2,7 @@ from uuid import UUID
 from datetime import datetime, date
 import typing as tp
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, validator
 
 from . import (
     position,
@@ -20,6 +20,7 @@ from . import (
 
 
 class Filters(BaseModel):
+    q: tp.Optional[str] = Field(None, min_length=2, max_length=100, description='Поиск по ФИО')
     first_name: tp.Optional[str]
     last_name: tp.Optional[str]
     middle_name: tp.Optional[str]
@@ -28,6 +29,20 @@ class Filters(BaseModel):
     position_id: tp.Optional[UUID]
     salary_from: tp.Optional[int]
     salary_to: tp.Optional[int]
+    experience_from: tp.Optional[int] = Field(None, ge=0, description='Общий стаж от, полных лет')
+    experience_to: tp.Optional[int] = Field(None, ge=0, description='Общий стаж до, полных лет')
+    skills_all: tp.Optional[tp.List[UUID]] = Field(None, max_items=20, description='Кандидат владеет всеми навыками')
+    skills_any: tp.Optional[tp.List[UUID]] = Field(None, max_items=20, description='Кандидат владеет хотя бы одним навыком')
+    sort: tp.Optional[tp.Literal['experience', '-experience']] = Field(
+        None, description='Сортировка по общему стажу, "-" - по убыванию. По умолчанию - сначала новые'
+    )
+
+
+class Summary(BaseModel):
+    id: UUID
+    first_name: str
+    last_name: str
+    middle_name: tp.Optional[str]
 
 
 class Read(BaseModel):
@@ -46,6 +61,7 @@ class Read(BaseModel):
     grade: grade.Read
     contacts: tp.List[contact.Read] = Field(default_factory=list)
     work_places: tp.List[work_place.Read] = Field(default_factory=list)
+    work_experience_days: int = 0
     total_work_expirience: tp.Optional[str]
     languages: tp.List[candidate_language.Read] = Field(default_factory=list)
     notes: tp.List[candidate_note.Read] = Field(default_factory=list)
@@ -53,6 +69,12 @@ class Read(BaseModel):
     
     class Config:
         orm_mode = True
+    
+    @validator('total_work_expirience', always=True)
+    def format_work_expirience(cls, value, values):
+        # "<лет> <месяцев>" по стажу в днях
+        days = values.get('work_experience_days') or 0
+        return f'{days // 365} {days % 365 // 30}'
 
 
 class Create(BaseModel):
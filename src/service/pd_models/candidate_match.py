@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+
+from . import candidate
+
+
+class Filters(BaseModel):
+    limit: int = Field(50, ge=1, le=500)
+
+
+class Read(BaseModel):
+    candidate: candidate.Summary
+    score: float = Field(description='Итоговая оценка от 0 до 1')
+    skills_matched: int = Field(description='Количество навыков вакансии, которыми владеет кандидат')
+    skills_total: int = Field(description='Количество навыков вакансии')
+    position_match: bool
+    grade_match: bool = Field(description='Грейд совпадает или не указан в вакансии')
+    salary_match: bool = Field(description='Минимальная зарплата кандидата не выше бюджета вакансии')
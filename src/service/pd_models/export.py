@@ -0,0 +1,7 @@
+import typing as tp
+
+from pydantic import BaseModel, Field
+
+
+class Params(BaseModel):
+    format: tp.Literal['csv', 'ndjson'] = Field('csv', description='csv - для таблиц (UTF-8 с BOM), ndjson - объект на строку')
@@ -29,6 +29,15 @@ class Filters(BaseModel):
     vacancy_deadline_to: tp.Optional[date]
 
 
+class Summary(BaseModel):
+    id: UUID
+    candidate: candidate.Summary
+    vacancy: vacancy.Summary
+    stage: interview_stage_ref.Read
+    creator_id: tp.Optional[UUID]
+    created_at: datetime
+
+
 class Read(BaseModel):
     id: UUID
     candidate: candidate.Read
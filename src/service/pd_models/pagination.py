@@ -0,0 +1,9 @@
+import typing as tp
+
+from pydantic import BaseModel, Field
+
+
+class Params(BaseModel):
+    limit: int = Field(50, ge=1, le=500)
+    cursor: tp.Optional[str]
+    with_total: bool = Field(False, description='Посчитать общее количество записей (total, total_is_exact)')
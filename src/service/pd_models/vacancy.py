@@ -28,7 +28,20 @@ class Filters(BaseModel):
     date_to: tp.Optional[date]
     salary_from: tp.Optional[int]
     salary_to: tp.Optional[int]
-    # skills: tp.Optional[tp.List[UUID]]
+    skills_all: tp.Optional[tp.List[UUID]] = Field(None, max_items=20, description='Вакансия требует всех навыков')
+    skills_any: tp.Optional[tp.List[UUID]] = Field(None, max_items=20, description='Вакансия требует хотя бы одного навыка')
+
+
+class Summary(BaseModel):
+    id: UUID
+    position: position.Read
+    department: department.Read
+    grade: tp.Optional[grade.Read]
+    priority: vacancy_priority_ref.Read
+    status_code: tp.Optional[int]
+    salary_from: tp.Optional[int]
+    salary_to: tp.Optional[int]
+    deadline: tp.Optional[date]
 
 
 class Read(BaseModel):
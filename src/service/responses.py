@@ -0,0 +1,56 @@
+"""
+Быстрая отдача моделей ответа.
+Если обработчик возвращает модель, FastAPI переводит ее в dict, заново проверяет
+по response_model, проходит jsonable_encoder и сериализует стандартным json -
+несколько полных обходов графа объектов на каждую строку списка. Модели, уже
+проверенные при сборке (from_orm и т.п.), отдаются через ModelResponse:
+orjson сериализует их сразу в байты, а response_model остается только для схемы.
+Такой ответ рендерится еще внутри обработчика, поэтому время рендера переносится
+из handler в serialize (Server-Timing и гистограммы инструментирования).
+"""
+import time
+import typing as tp
+from uuid import UUID
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import Response
+
+from .instrumentation import current_stats
+
+
+def _default(obj: tp.Any) -> tp.Any:
+    # поля модели pydantic v1 лежат в __dict__ в объявленном порядке, вложенные
+    # модели orjson передаст сюда же; datetime, date и uuid.UUID он пишет сам,
+    # но не его подкласс из asyncpg, который pydantic оставляет как есть
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    if isinstance(obj, UUID):
+        return str(obj)
+    raise TypeError
+
+
+def dumps(content: tp.Any) -> bytes:
+    return orjson.dumps(content, default=_default)
+
+
+class ModelResponse(Response):
+    """
+    Ответ из готовой модели (или списков и словарей с ними) без повторной проверки.
+    Модель должна быть того же типа, что и response_model маршрута: лишние поля
+    подклассов не отбрасываются. Алиасы полей и include/exclude схемы или маршрута
+    не применяются, поэтому в таких маршрутах их быть не должно
+    (tests/test_responses.py это проверяет).
+    """
+
+    media_type = 'application/json'
+
+    def render(self, content: tp.Any) -> bytes:
+        stats = current_stats()
+        if stats is None:
+            return dumps(content)
+        started_at = time.perf_counter()
+        try:
+            return dumps(content)
+        finally:
+            stats.render_time += time.perf_counter() - started_at
@@ -0,0 +1,60 @@
+import hashlib
+import logging
+import typing as tp
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio.engine import AsyncConnection
+
+from .refs_loader import RefsLoader
+from . import models as m
+
+
+logger = logging.getLogger(__name__)
+
+# ключ pg_advisory_xact_lock, общий для всех воркеров и экземпляров приложения
+SEED_LOCK_KEY = 7_301_240_001
+
+
+def file_checksum(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class Seeder:
+    """
+    Применяет начальные данные только при изменении их источника.
+    Контрольные суммы примененных наборов хранятся в таблице seed_versions.
+    Работает внутри транзакции conn: первый воркер берет advisory-блокировку
+    и заполняет таблицы, остальные дожидаются коммита и видят актуальную сумму.
+    """
+
+    def __init__(self, conn: AsyncConnection) -> None:
+        self._conn = conn
+
+    async def lock(self) -> None:
+        await self._conn.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': SEED_LOCK_KEY})
+        # таблица создается под блокировкой, чтобы воркеры не гонялись за CREATE TABLE
+        await self._conn.run_sync(m.SeedVersion.__table__.create, checkfirst=True)
+
+    async def apply(self, name: str, checksum: str, load: tp.Callable[[], tp.Awaitable[None]]) -> bool:
+        """
+        Выполняет load, если сохраненная сумма набора name отличается от checksum.
+        :return: были ли применены данные
+        """
+        stored = await self._conn.scalar(select(m.SeedVersion.checksum).where(m.SeedVersion.name == name))
+        if stored == checksum:
+            logger.info('Seed %s is up to date, skipping', name)
+            return False
+
+        await load()
+        stmt = insert(m.SeedVersion).values(name=name, checksum=checksum)
+        stmt = stmt.on_conflict_do_update(index_elements=[m.SeedVersion.name],
+                                          set_={'checksum': stmt.excluded.checksum,
+                                                'applied_at': func.now()})
+        await self._conn.execute(stmt)
+        logger.info('Seed %s applied', name)
+        return True
+
+    async def apply_sql_file(self, name: str, path: str) -> bool:
+        return await self.apply(name, file_checksum(path), lambda: RefsLoader(self._conn).load(path))
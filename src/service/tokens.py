@@ -61,6 +61,18 @@ class JWTToken:
                    'verify_exp': False}
         return jwt.decode(self._token, options=options)
 
+    def verify(self, secret: str, algorithm: str, verify_exp: bool = True, verify_sign: bool = True) -> dict:
+        '''
+        Проверка структуры, срока действия и подписи за одно декодирование
+        :raises jwt.InvalidTokenError: 
+        '''
+        options = {"verify_signature": verify_sign,
+                   'verify_exp': verify_exp}
+        return jwt.decode(self._token,
+                          algorithms=[algorithm] if algorithm is not None else None,
+                          key=secret,
+                          options=options)
+
     def __str__(self) -> str:
         return self._token
 
@@ -95,18 +107,46 @@ class JWTTokenFactory:
         return jwt_token
 
 
+class AccessTokenClaims(tp.NamedTuple):
+    user_id: str
+    company_id: str
+    role: str
+    exp: tp.Optional[int]
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> 'AccessTokenClaims':
+        '''
+        :raises KeyError: если в токене нет обязательных полей
+        '''
+        return cls(user_id=payload['sub'],
+                   company_id=payload['company_id'],
+                   role=payload['role'],
+                   exp=payload.get('exp'))
+
+
 class AccessToken(JWTToken):
+    def __init__(self, token, claims: tp.Optional[AccessTokenClaims] = None) -> None:
+        super().__init__(token)
+        self._claims = claims
+
+    @property
+    def claims(self) -> AccessTokenClaims:
+        # токен декодируется не более одного раза, дальше используются сохраненные данные
+        if self._claims is None:
+            self._claims = AccessTokenClaims.from_payload(self.decode())
+        return self._claims
+
     @property
     def user_id(self):
-        return self.decode()['sub']
+        return self.claims.user_id
     
     @property
     def company_id(self):
-        return self.decode()['company_id']
+        return self.claims.company_id
     
     @property
     def role(self):
-        return self.decode()['role']
+        return self.claims.role
 
 
 class RefreshToken(UUIDToken):
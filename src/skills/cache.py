@@ -0,0 +1,52 @@
+import time
+import typing as tp
+from uuid import UUID
+
+from .. import config
+from ..service.cache import TTLLRUCache
+
+
+class SkillsCache:
+    """
+    Кэш id навыков по нормализованному имени отдельно для каждой компании.
+    Приложение навыки только добавляет и не меняет, поэтому записи других
+    воркеров не делают кэш устаревшим: новые для этого процесса навыки просто
+    не найдутся в кэше и будут прочитаны из бд. Удаления в обход приложения
+    ограничены временем жизни записи.
+    В кэш попадают только навыки, уже сохраненные в бд до текущей транзакции:
+    id только что вставленного навыка пропал бы при ее откате.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._cache = TTLLRUCache(maxsize)
+        self._ttl = ttl
+
+    def get_many(self, company_id: tp.Union[UUID, str], normalized_names: tp.Iterable[str]) -> tp.Dict[str, UUID]:
+        company_id = self._company_key(company_id)
+        found = {}
+        for normalized_name in normalized_names:
+            skill_id = self._cache.get((company_id, normalized_name))
+            if skill_id is not None:
+                found[normalized_name] = skill_id
+        return found
+
+    def set_many(self, company_id: tp.Union[UUID, str], skill_ids: tp.Dict[str, UUID]) -> None:
+        company_id = self._company_key(company_id)
+        expires_at = time.time() + self._ttl
+        for normalized_name, skill_id in skill_ids.items():
+            self._cache.set((company_id, normalized_name), skill_id, expires_at)
+
+    @staticmethod
+    def _company_key(company_id: tp.Union[UUID, str]) -> UUID:
+        # из access-токена company_id приходит строкой, из моделей - UUID (в том числе
+        # подклассом из asyncpg); без приведения один навык попадал бы в кэш дважды
+        return UUID(str(company_id))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> tp.Dict[str, int]:
+        return self._cache.stats()
+
+
+skills_cache = SkillsCache(config.SKILLS_CACHE_SIZE, config.SKILLS_CACHE_TTL)
@@ -7,6 +7,7 @@ from sqlalchemy.future import select
 
 from ..service import models as m
 from ..service.pd_models import skill
+from .cache import skills_cache
 
 
 class SkillsRepo:
@@ -14,23 +15,43 @@ class SkillsRepo:
         self._session = session
 
     async def add_many(self, company_id: UUID, pd_models_list: tp.List[skill.Create]) -> tp.List[UUID]:
+        '''
+        :return: id навыков в порядке pd_models_list
+        '''
+
         if not pd_models_list:
             return []
-        
-        skills_for_insert = []
-        for skill in pd_models_list:
-            skill_dict = skill.dict()
-            skill_dict['normalized_name'] = skill.name.capitalize()
-            skill_dict['company_id'] = company_id
-            skills_for_insert.append(skill_dict)
-            
-        stmt = insert(m.Skill).values(skills_for_insert)
-        stmt = stmt \
-               .on_conflict_do_update(index_elements=[m.Skill.normalized_name],
-                                      set_=dict(normalized_name=stmt.excluded.normalized_name)) \
-               .returning(m.Skill.id)
-        
-        stmt = select(m.Skill.id).from_statement(stmt).execution_options(populate_existing=True)
-        res = await self._session.execute(stmt)   
-        skill_ids = res.scalars().all()
+
+        skill_ids = await self.add_many_by_names(company_id, [_skill.name for _skill in pd_models_list])
+        return [skill_ids[_skill.name.capitalize()] for _skill in pd_models_list]
+
+    async def add_many_by_names(self, company_id: UUID, names: tp.Iterable[str]) -> tp.Dict[str, UUID]:
+        '''
+        Добавляет отсутствующие навыки; известные навыки берутся из кэша без обращения к бд
+        :return: id навыков по нормализованному имени
+        '''
+
+        normalized = {name.capitalize(): name for name in names}
+        skill_ids = skills_cache.get_many(company_id, normalized)
+        misses = {normalized_name: name for normalized_name, name in normalized.items() if normalized_name not in skill_ids}
+        if not misses:
+            return skill_ids
+
+        stmt = insert(m.Skill) \
+               .values([{'name': name, 'normalized_name': normalized_name, 'company_id': company_id}
+                        for normalized_name, name in misses.items()]) \
+               .on_conflict_do_nothing(index_elements=[m.Skill.normalized_name]) \
+               .returning(m.Skill.normalized_name, m.Skill.id)
+        inserted = dict((await self._session.execute(stmt)).all())
+        skill_ids.update(inserted)
+
+        # остальные уже были в бд; отдельный запрос видит и навыки, вставленные
+        # параллельными транзакциями, из-за которых сработал ON CONFLICT
+        existing_names = [normalized_name for normalized_name in misses if normalized_name not in inserted]
+        if existing_names:
+            stmt = select(m.Skill.normalized_name, m.Skill.id).where(m.Skill.normalized_name.in_(existing_names))
+            existing = dict((await self._session.execute(stmt)).all())
+            skill_ids.update(existing)
+            skills_cache.set_many(company_id, existing)
+
         return skill_ids
@@ -14,9 +14,12 @@ from sqlalchemy import exc as sa_exc
 
 
 from ..service.fastapi_custom import generate_openapi_responses
+from ..service.responses import ModelResponse
 from ..service import exceptions as exc
 from ..service.roles import Roles
 from ..service import models as m
+from ..service import loaders
+from ..service.passwords import password_hasher
 from ..service.dependencies import (
     AccessJWTCookie,
     CheckRoles,
@@ -52,8 +55,11 @@ async def create(body: sch.Create.Request.Body,
     Принимает данные для создания пользователя в теле запроса и вносит в бд <br>
     '''
     
+    user_data = body.dict()
+    user_data['password'] = await password_hasher.hash(body.password)
+    
     stmt = _insert(m.User) \
-           .values(creator_id=at.user_id, company_id=at.company_id, **body.dict()) \
+           .values(creator_id=at.user_id, company_id=at.company_id, **user_data) \
            .returning(m.User.id)
            
     try:
@@ -81,14 +87,14 @@ async def get_self(session: AsyncSession = Depends(get_session),
     Возвращает данные о пользователе, который авторизован в данный момент <br>
     '''
     
-    stmt = _select(m.User).where(m.User.id == at.user_id)
+    stmt = _select(m.User).options(*loaders.user_read).where(m.User.id == at.user_id)
 
     try:
         user = (await session.scalars(stmt)).one()
     except sa_exc.NoResultFound:
         raise exc.InvalidClientError
         
-    return sch.GetSelf.Response.Body.from_orm(user)
+    return ModelResponse(sch.GetSelf.Response.Body.from_orm(user))
 
 
 @router.get('/{id}',
@@ -110,14 +116,14 @@ async def get_one(id: UUID,
     Возвращает данные о пользователе <br>
     '''
     
-    stmt = _select(m.User).where(m.User.id == id)
+    stmt = _select(m.User).options(*loaders.user_read).where(m.User.id == id)
            
     try:
         user = (await session.scalars(stmt)).one()
     except sa_exc.NoResultFound:
         raise exc.InvalidClientError
     
-    return sch.GetOne.Response.Body.from_orm(user)
+    return ModelResponse(sch.GetOne.Response.Body.from_orm(user))
 
 
 @router.get('',
@@ -138,10 +144,10 @@ async def get_list(session: AsyncSession = Depends(get_session),
     Возвращает данные о всех пользователях <br>
     '''
     
-    stmt = _select(m.User).where(m.User.company_id == at.company_id)
+    stmt = _select(m.User).options(*loaders.user_read).where(m.User.company_id == at.company_id)
     res = await session.scalars(stmt)
     users = [sch.user.Read.from_orm(orm_model) for orm_model in res.all()]
-    return sch.GetList.Response.Body(users=users)
+    return ModelResponse(sch.GetList.Response.Body.construct(users=users))
 
 
 @router.delete('/{id}',
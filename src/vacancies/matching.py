@@ -0,0 +1,330 @@
+"""
+Подбор кандидатов на вакансию по совпадению навыков, должности, грейда и зарплаты.
+
+Для каждой компании в процессе держится инвертированный индекс: навыку, должности,
+грейду и значению минимальной зарплаты соответствует битовая маска кандидатов
+(int, бит i - кандидат с порядковым номером i). Число совпавших навыков считается
+побитовым сумматором по маскам навыков вакансии, поэтому ранжирование сводится
+к десяткам операций над масками, а не к агрегации candidate_skills на каждый запрос.
+"""
+import asyncio
+import time
+import typing as tp
+from collections import OrderedDict, defaultdict
+from itertools import islice, product
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from .. import config
+from ..service import models as m
+
+
+# вклад критериев в итоговую оценку, в сумме 1
+SKILLS_WEIGHT = 0.7
+POSITION_WEIGHT = 0.1
+GRADE_WEIGHT = 0.1
+SALARY_WEIGHT = 0.1
+
+
+class Match(tp.NamedTuple):
+    candidate_id: UUID
+    score: float
+    skills_matched: int
+    position_match: bool
+    grade_match: bool
+    salary_match: bool
+
+
+def _bitset(ordinals: tp.Iterable[int], size: int) -> int:
+    buffer = bytearray((size + 7) // 8)
+    for ordinal in ordinals:
+        buffer[ordinal >> 3] |= 1 << (ordinal & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def _iter_bits(mask: int) -> tp.Iterator[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class CompanyIndex:
+    """
+    Индекс кандидатов одной компании. Порядковые номера не переиспользуются:
+    удаленный кандидат только снимается с масок до следующей полной перестройки.
+    При построении номера выдаются от новых кандидатов к старым, кандидаты,
+    добавленные позже, получают номера в конце и при ранжировании
+    упорядочиваются по created_at отдельно.
+    """
+
+    def __init__(self) -> None:
+        self.ids: tp.List[UUID] = []
+        self._created: tp.List[datetime] = []
+        # номера [0, _sorted_size) упорядочены от новых кандидатов к старым
+        self._sorted_size = 0
+        self._ordinals: tp.Dict[UUID, int] = {}
+        self._alive = 0
+        self._skills: tp.Dict[UUID, int] = {}
+        self._positions: tp.Dict[UUID, int] = {}
+        self._grades: tp.Dict[UUID, int] = {}
+        self._salaries: tp.Dict[tp.Optional[int], int] = {}
+        self._salary_fit: tp.Dict[int, int] = {}
+        # максимальный прочитанный updated_at кандидатов компании
+        self.watermark: tp.Optional[datetime] = None
+        # updated_at прочитанных кандидатов, измененных не раньше watermark - overlap
+        self.recent: tp.Dict[UUID, datetime] = {}
+        self.built_at = time.monotonic()
+
+    @property
+    def size(self) -> int:
+        return self._alive.bit_count()
+
+    def apply(self, candidates: tp.Iterable[tp.Tuple], skills: tp.Iterable[tp.Tuple[UUID, tp.List[UUID]]]) -> None:
+        '''
+        Заменяет данные перечисленных кандидатов, новых добавляет в конец
+        :param candidates: строки (id, position_id, grade_id, min_salary, is_deleted, created_at, updated_at);
+                           в пустой индекс - от новых кандидатов к старым
+        :param skills: пары (skill_id, id кандидатов с этим навыком) для тех же кандидатов
+        '''
+
+        is_empty = not self.ids
+        changed, alive = [], set()
+        positions, grades, salaries = defaultdict(list), defaultdict(list), defaultdict(list)
+        for candidate_id, position_id, grade_id, min_salary, is_deleted, created_at, _ in candidates:
+            ordinal = self._ordinals.get(candidate_id)
+            if ordinal is None:
+                ordinal = self._ordinals[candidate_id] = len(self.ids)
+                self.ids.append(candidate_id)
+                self._created.append(created_at)
+            changed.append(ordinal)
+            if is_deleted:
+                continue
+            alive.add(ordinal)
+            positions[position_id].append(ordinal)
+            grades[grade_id].append(ordinal)
+            salaries[min_salary].append(ordinal)
+
+        ordinals = self._ordinals
+        skill_ordinals = {skill_id: [ordinals[candidate_id] for candidate_id in candidate_ids
+                                     if ordinals.get(candidate_id) in alive]
+                          for skill_id, candidate_ids in skills}
+
+        size = len(self.ids)
+        if is_empty:
+            self._sorted_size = size
+        keep = ~_bitset(changed, size)
+        self._alive = self._alive & keep | _bitset(alive, size)
+        for masks, added in ((self._skills, skill_ordinals), (self._positions, positions),
+                             (self._grades, grades), (self._salaries, salaries)):
+            for key in list(masks):
+                mask = masks[key] & keep
+                if mask:
+                    masks[key] = mask
+                else:
+                    del masks[key]
+            for key, key_ordinals in added.items():
+                masks[key] = masks.get(key, 0) | _bitset(key_ordinals, size)
+        self._salary_fit.clear()
+
+    def rank(self, skill_ids: tp.Collection[UUID], position_id: UUID, grade_id: tp.Optional[UUID],
+             salary: tp.Optional[int], limit: int) -> tp.List[Match]:
+        '''
+        Лучшие кандидаты по убыванию оценки, при равной оценке - сначала новые
+        :param grade_id: грейд вакансии, None - подходит любой
+        :param salary: верхняя граница зарплаты вакансии, None - подходит любая
+        '''
+
+        alive = self._alive
+        # разряды количества совпавших навыков: бит i кандидата в counter[j] - j-й разряд его суммы
+        counter: tp.List[int] = []
+        for skill_id in skill_ids:
+            carry = self._skills.get(skill_id, 0) & alive
+            for digit_no, digit in enumerate(counter):
+                if not carry:
+                    break
+                counter[digit_no], carry = digit ^ carry, digit & carry
+            if carry:
+                counter.append(carry)
+
+        criteria = (
+            self._positions.get(position_id, 0) & alive,
+            alive if grade_id is None else self._grades.get(grade_id, 0) & alive,
+            alive if salary is None else self._fit_salary(salary) & alive,
+        )
+        skills_total = len(skill_ids)
+        # разные сочетания критериев дают одну оценку (например, только должность
+        # и только грейд), поэтому кандидаты выбираются по оценке целиком
+        levels: tp.DefaultDict[float, tp.List[tp.Tuple[int, bool, bool, bool]]] = defaultdict(list)
+        for matched in range(skills_total + 1):
+            for flags in product((True, False), repeat=3):
+                levels[self._score(matched, skills_total, *flags)].append((matched, *flags))
+
+        matches: tp.List[Match] = []
+        for score in sorted(levels, reverse=True):
+            combinations, level_mask = [], 0
+            for matched, *flags in levels[score]:
+                mask = self._count_equals(counter, matched, alive)
+                for flag, criterion in zip(flags, criteria):
+                    if not mask:
+                        break
+                    mask &= criterion if flag else ~criterion
+                if mask:
+                    combinations.append((mask, matched, flags))
+                    level_mask |= mask
+            for ordinal in self._newest(level_mask, limit - len(matches)):
+                # сочетания не пересекаются: кандидат входит ровно в одно
+                matched, flags = next((matched, flags) for mask, matched, flags in combinations
+                                      if mask >> ordinal & 1)
+                matches.append(Match(self.ids[ordinal], score, matched, *flags))
+            if len(matches) >= limit:
+                return matches
+        return matches
+
+    def _newest(self, mask: int, count: int) -> tp.List[int]:
+        '''
+        Номера count самых новых кандидатов из mask
+        '''
+
+        sorted_size = self._sorted_size
+        ordinals = list(islice(_iter_bits(mask & ((1 << sorted_size) - 1)), count))
+        added = mask >> sorted_size
+        if added:
+            # добавленных после построения немного: они сливаются с упорядоченной частью
+            ordinals.extend(sorted_size + ordinal for ordinal in _iter_bits(added))
+            ordinals.sort(key=lambda ordinal: (self._created[ordinal], self.ids[ordinal]), reverse=True)
+            del ordinals[count:]
+        return ordinals
+
+    def _fit_salary(self, salary: int) -> int:
+        mask = self._salary_fit.get(salary)
+        if mask is None:
+            mask = 0
+            for min_salary, candidates in self._salaries.items():
+                if min_salary is None or min_salary <= salary:
+                    mask |= candidates
+            self._salary_fit[salary] = mask
+        return mask
+
+    @staticmethod
+    def _count_equals(counter: tp.List[int], value: int, alive: int) -> int:
+        if value >> len(counter):
+            return 0
+        mask = alive
+        for digit_no, digit in enumerate(counter):
+            mask &= digit if value >> digit_no & 1 else ~digit
+        return mask
+
+    @staticmethod
+    def _score(matched: int, skills_total: int, position: bool, grade: bool, salary: bool) -> float:
+        skills = matched / skills_total if skills_total else 0
+        return round(SKILLS_WEIGHT * skills + POSITION_WEIGHT * position + GRADE_WEIGHT * grade + SALARY_WEIGHT * salary, 4)
+
+
+class MatchIndexes:
+    """
+    Индексы последних запрошенных компаний.
+    Перед каждым подбором перечитываются кандидаты компании, измененные не раньше
+    прочитанного максимума updated_at минус overlap: все изменения кандидата,
+    включая навыки, проходят через обновление его строки, а запас покрывает
+    транзакции, закоммиченные позже более новых (их updated_at меньше максимума).
+    В индекс применяются только строки, которых еще не было в прошлых чтениях.
+    Полная перестройка - не реже раза в ttl секунд.
+    """
+
+    candidate_columns = (m.Candidate.id, m.Candidate.position_id, m.Candidate.grade_id,
+                         m.Candidate.min_salary, m.Candidate.is_deleted,
+                         m.Candidate.created_at, m.Candidate.updated_at)
+
+    def __init__(self, maxsize: int, ttl: float, overlap: timedelta) -> None:
+        self._indexes: tp.OrderedDict[UUID, CompanyIndex] = OrderedDict()
+        self._locks: tp.Dict[UUID, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._overlap = overlap
+        self.builds = 0
+        self.refreshes = 0
+
+    async def get(self, session: AsyncSession, company_id: UUID) -> CompanyIndex:
+        async with self._locks[company_id]:
+            index = self._indexes.get(company_id)
+            if index is None or time.monotonic() - index.built_at > self._ttl:
+                index = await self._build(session, company_id)
+            else:
+                await self._refresh(session, company_id, index)
+
+            self._indexes[company_id] = index
+            self._indexes.move_to_end(company_id)
+            while len(self._indexes) > self._maxsize:
+                evicted_id, _ = self._indexes.popitem(last=False)
+                # занятая блокировка остается: ее владелец снова сохранит индекс компании
+                if not self._locks[evicted_id].locked():
+                    del self._locks[evicted_id]
+            return index
+
+    async def _build(self, session: AsyncSession, company_id: UUID) -> CompanyIndex:
+        criteria = (m.Candidate.company_id == company_id, m.Candidate.is_deleted == False)
+        candidates = await self._load_candidates(session, criteria)
+        index = CompanyIndex()
+        index.apply(candidates, await self._load_skills(session, criteria))
+        self._advance(index, candidates)
+        self.builds += 1
+        return index
+
+    async def _refresh(self, session: AsyncSession, company_id: UUID, index: CompanyIndex) -> None:
+        criteria = (m.Candidate.company_id == company_id,)
+        if index.watermark is not None:
+            criteria += (m.Candidate.updated_at >= index.watermark - self._overlap,)
+        candidates = [row for row in await self._load_candidates(session, criteria)
+                      if index.recent.get(row.id) != row.updated_at]
+        if not candidates:
+            return
+
+        # навыки уже прочитанных кандидатов окна apply пропустит
+        index.apply(candidates, await self._load_skills(session, criteria))
+        self._advance(index, candidates)
+        self.refreshes += 1
+
+    def _advance(self, index: CompanyIndex, candidates: tp.Sequence[tp.Tuple]) -> None:
+        # сдвигает watermark и оставляет в recent только строки внутри нового окна
+        updated = [(row.id, row.updated_at) for row in candidates]
+        if updated:
+            newest = max(updated_at for _, updated_at in updated)
+            if index.watermark is None or newest > index.watermark:
+                index.watermark = newest
+        if index.watermark is None:
+            return
+        since = index.watermark - self._overlap
+        recent = {candidate_id: updated_at for candidate_id, updated_at in index.recent.items() if updated_at >= since}
+        recent.update((candidate_id, updated_at) for candidate_id, updated_at in updated if updated_at >= since)
+        index.recent = recent
+
+    async def _load_candidates(self, session: AsyncSession, criteria: tuple) -> list:
+        stmt = select(*self.candidate_columns) \
+               .where(*criteria) \
+               .order_by(m.Candidate.created_at.desc(), m.Candidate.id.desc())
+        return (await session.execute(stmt)).all()
+
+    async def _load_skills(self, session: AsyncSession, criteria: tuple) -> list:
+        # списки кандидатов собираются в бд: строка на навык вместо строки на пару
+        stmt = select(m.CandidateSkill.skill_id, func.array_agg(m.CandidateSkill.candidate_id)) \
+               .join(m.Candidate, m.Candidate.id == m.CandidateSkill.candidate_id) \
+               .where(*criteria) \
+               .where(m.CandidateSkill.is_deleted == False) \
+               .group_by(m.CandidateSkill.skill_id)
+        return (await session.execute(stmt)).all()
+
+    def stats(self) -> tp.Dict[str, int]:
+        return {
+            'companies': len(self._indexes),
+            'candidates': sum(index.size for index in self._indexes.values()),
+            'builds': self.builds,
+            'refreshes': self.refreshes,
+        }
+
+
+match_indexes = MatchIndexes(config.MATCHES_INDEX_COMPANIES, config.MATCHES_INDEX_TTL, config.MATCHES_INDEX_OVERLAP)
@@ -1,21 +1,29 @@
 from uuid import UUID
 import typing as tp
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncResult
+from sqlalchemy.orm import aliased
 from sqlalchemy.orm.decl_api import DeclarativeMeta
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.sql.functions import coalesce
 from sqlalchemy.future import select
-from sqlalchemy import delete, update
+from sqlalchemy.sql import Select
+from sqlalchemy import update, exists, func, distinct
 from sqlalchemy import exc as sa_exc
 
 from ..skills.repos import SkillsRepo
 from ..service import models as m
+from ..service import loaders
+from ..service.children import sync_child_entities
+from ..service.export import joined
 from ..service.pd_models import (
     vacancy,
     vacancy_skill,
-    skill
+    skill,
+    candidate,
+    candidate_match
 )
+from .matching import match_indexes
 
 
 class VacanciesRepo:
@@ -24,9 +32,9 @@ class VacanciesRepo:
     
     async def get_one(self, id: UUID, company_id: UUID) -> vacancy.Read:
         stmt = select(m.Vacancy) \
-               .join(m.Vacancy.creator) \
+               .options(*loaders.vacancy_read) \
                .where(m.Vacancy.id == id) \
-               .where(m.User.company_id == company_id) \
+               .where(m.Vacancy.company_id == company_id) \
                .where(m.Vacancy.is_deleted == False)
                
         try:
@@ -37,12 +45,64 @@ class VacanciesRepo:
         return vacancy.Read.from_orm(vacancy_orm)
         
     async def get_list(self, company_id: UUID, filters: vacancy.Filters) -> tp.List[vacancy.Read]:
-        stmt = select(m.Vacancy) \
-               .join(m.Vacancy.creator) \
-               .where(m.User.company_id == company_id) \
-               .where(m.Vacancy.is_deleted == False) \
+        stmt = self._filter(select(m.Vacancy), company_id, filters) \
+               .options(*loaders.vacancy_read) \
                .order_by(m.Vacancy.created_at.desc())
         
+        res = await self._session.scalars(stmt)
+        return [vacancy.Read.from_orm(vacancy_orm) for vacancy_orm in res.all()]
+    
+    async def export(self, company_id: UUID, filters: vacancy.Filters, batch_size: int) -> AsyncResult:
+        '''
+        Вакансии по фильтрам get_list для выгрузки: строка на вакансию, справочники
+        развернуты в названия, навыки собраны в строку.
+        Результат читается из серверного курсора пачками по batch_size
+        '''
+        
+        recruiter = aliased(m.User)
+        skills = select(joined(distinct(m.Skill.name), m.Skill.name)) \
+                 .select_from(m.VacancySkill) \
+                 .join(m.Skill, m.Skill.id == m.VacancySkill.skill_id) \
+                 .where(m.VacancySkill.vacancy_id == m.Vacancy.id) \
+                 .where(m.VacancySkill.is_deleted == False)
+        
+        stmt = select(m.Vacancy.id,
+                      m.Position.name.label('position'),
+                      m.Department.name.label('department'),
+                      m.Grade.name.label('grade'),
+                      m.Vacancy.salary_from,
+                      m.Vacancy.salary_to,
+                      m.Vacancy.employee_count,
+                      m.VacancyPriorityRef.value.label('priority'),
+                      m.Vacancy.deadline,
+                      m.VacansyStatusRef.value.label('status'),
+                      func.nullif(func.concat_ws(' ', recruiter.last_name, recruiter.first_name, recruiter.middle_name), '')
+                          .label('recruiter'),
+                      m.AdressRef.value.label('adress'),
+                      m.Vacancy.project,
+                      skills.scalar_subquery().label('skills'),
+                      m.Vacancy.created_at) \
+               .select_from(m.Vacancy) \
+               .join(m.Position, m.Position.id == m.Vacancy.position_id) \
+               .join(m.Department, m.Department.id == m.Vacancy.department_id) \
+               .join(m.VacancyPriorityRef, m.VacancyPriorityRef.code == m.Vacancy.priority_code) \
+               .outerjoin(m.Grade, m.Grade.id == m.Vacancy.grade_id) \
+               .outerjoin(m.VacansyStatusRef, m.VacansyStatusRef.code == m.Vacancy.status_code) \
+               .outerjoin(recruiter, recruiter.id == m.Vacancy.recruiter_id) \
+               .outerjoin(m.AdressRef, m.AdressRef.code == m.Vacancy.adress_code)
+        stmt = self._filter(stmt, company_id, filters) \
+               .order_by(m.Vacancy.created_at.desc(), m.Vacancy.id.desc())
+        
+        return await self._session.stream(stmt.execution_options(yield_per=batch_size))
+    
+    def _filter(self, stmt: Select, company_id: UUID, filters: vacancy.Filters) -> Select:
+        '''
+        Условия списка без сортировки, общие для get_list и export
+        '''
+        
+        stmt = stmt.where(m.Vacancy.company_id == company_id) \
+                   .where(m.Vacancy.is_deleted == False)
+        
         if filters.recruiter_id is not None:
             stmt = stmt.filter(m.Vacancy.recruiter_id == filters.recruiter_id)
         if filters.department_id is not None:
@@ -67,16 +127,75 @@ class VacanciesRepo:
         if filters.salary_to is not None:
             stmt = stmt.filter((coalesce(m.Vacancy.salary_from, m.Vacancy.salary_to) <= filters.salary_to))
         
-        # if filters.skills is not None:
-        #     stmt = stmt.filter(m.Vacancy)
+        # наличие навыков проверяется по индексам vacancy_skills, без просмотра всех его строк
+        if filters.skills_any:
+            stmt = stmt.filter(exists().where(m.VacancySkill.vacancy_id == m.Vacancy.id)
+                                       .where(m.VacancySkill.skill_id.in_(filters.skills_any)))
+        if filters.skills_all:
+            # группировка вместо EXISTS на каждый навык: оценка числа строк после нее мала,
+            # и планировщик выбирает поиск по первичному ключу, а не просмотр всей компании
+            skill_ids = set(filters.skills_all)
+            stmt = stmt.filter(m.Vacancy.id.in_(
+                select(m.VacancySkill.vacancy_id)
+                .where(m.VacancySkill.skill_id.in_(skill_ids))
+                .group_by(m.VacancySkill.vacancy_id)
+                .having(func.count(distinct(m.VacancySkill.skill_id)) == len(skill_ids))
+            ))
+        return stmt
+    
+    async def get_matches(self, id: UUID, company_id: UUID, filters: candidate_match.Filters) -> tp.List[candidate_match.Read]:
+        stmt = select(m.Vacancy.position_id,
+                      m.Vacancy.grade_id,
+                      coalesce(m.Vacancy.salary_to, m.Vacancy.salary_from)) \
+               .where(m.Vacancy.id == id) \
+               .where(m.Vacancy.company_id == company_id) \
+               .where(m.Vacancy.is_deleted == False)
+        
+        try:
+            position_id, grade_id, salary = (await self._session.execute(stmt)).one()
+        except sa_exc.NoResultFound:
+            raise #  TODO: custom exceptions
         
-        res = await self._session.scalars(stmt)
-        return [vacancy.Read.from_orm(vacancy_orm) for vacancy_orm in res.all()]
+        stmt = select(m.VacancySkill.skill_id) \
+               .where(m.VacancySkill.vacancy_id == id) \
+               .where(m.VacancySkill.is_deleted == False) \
+               .distinct()
+        skill_ids = (await self._session.scalars(stmt)).all()
+        
+        index = await match_indexes.get(self._session, company_id)
+        # кандидат мог быть удален или не виден в этой транзакции, хотя индекс его еще держит:
+        # такие отбрасываются, а недостающие места добираются следующими по рангу
+        summaries: tp.Dict[UUID, candidate.Summary] = {}
+        missing: tp.Set[UUID] = set()
+        while True:
+            requested = filters.limit + len(missing)
+            matches = index.rank(skill_ids, position_id, grade_id, salary, requested)
+            unknown = [match.candidate_id for match in matches
+                       if match.candidate_id not in summaries and match.candidate_id not in missing]
+            if unknown:
+                stmt = select(m.Candidate.id, m.Candidate.first_name, m.Candidate.last_name, m.Candidate.middle_name) \
+                       .where(m.Candidate.id.in_(unknown)) \
+                       .where(m.Candidate.company_id == company_id) \
+                       .where(m.Candidate.is_deleted == False)
+                summaries.update((row.id, candidate.Summary(**row._mapping)) for row in await self._session.execute(stmt))
+                missing.update(candidate_id for candidate_id in unknown if candidate_id not in summaries)
+            # индекс исчерпан или набрано limit видимых кандидатов
+            if len(matches) < requested or len(matches) - len(missing) >= filters.limit:
+                break
+        
+        return [candidate_match.Read(candidate=summaries[match.candidate_id],
+                                     score=match.score,
+                                     skills_matched=match.skills_matched,
+                                     skills_total=len(skill_ids),
+                                     position_match=match.position_match,
+                                     grade_match=match.grade_match,
+                                     salary_match=match.salary_match)
+                for match in matches if match.candidate_id in summaries][:filters.limit]
     
     async def delete(self, id: UUID, company_id: UUID) -> UUID:
-        # TODO: check company id
         stmt = update(m.Vacancy) \
                .where(m.Vacancy.id == id) \
+               .where(m.Vacancy.company_id == company_id) \
                .where(m.Vacancy.is_deleted == False) \
                .values(is_deleted=True) \
                .returning(m.Vacancy.id)
@@ -139,6 +258,7 @@ class VacanciesRepo:
         stmt = update(m.Vacancy) \
                .values(vacancy_data) \
                .where(m.Vacancy.id == vacancy_id) \
+               .where(m.Vacancy.company_id == company_id) \
                .where(m.Vacancy.is_deleted == False) \
                .returning(m.Vacancy.id)
         
@@ -160,23 +280,4 @@ class VacanciesRepo:
         return vacancy_id
         
     async def _update_child_entities(self, initiator_id: UUID, vacancy_id: UUID, entities_list, sa_model: DeclarativeMeta):
-        entities_ids = [entity.id for entity in entities_list if entity.id is not None]
-        stmt = delete(sa_model) \
-              .where(sa_model.id.not_in(entities_ids)) \
-              .where(sa_model.vacancy_id == vacancy_id)
-        
-        await self._session.execute(stmt)
-        
-        if not entities_list:
-            return 
-        
-        for entity in entities_list:
-            entity_dict = entity.dict(exclude_none=True)
-            entity_dict['creator_id'] = initiator_id
-            entity_dict['vacancy_id'] = vacancy_id
-            stmt = insert(sa_model) \
-                   .values(**entity_dict) \
-                   .on_conflict_do_update(index_elements=[sa_model.id],
-                                          where=(sa_model.vacancy_id == vacancy_id),
-                                          set_=entity_dict)
-            await self._session.execute(stmt)
+        await sync_child_entities(self._session, sa_model, sa_model.vacancy_id, vacancy_id, initiator_id, entities_list)
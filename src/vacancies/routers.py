@@ -4,11 +4,15 @@ from fastapi import (
     Depends,
     Query
 )
+from fastapi.responses import StreamingResponse
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import exc as sa_exc
 
 from ..service.fastapi_custom import generate_openapi_responses
+from ..service.responses import ModelResponse
+from ..service.export import CSV_MEDIA_TYPE, export_response
+from ..service.ndjson import MEDIA_TYPE as NDJSON_MEDIA_TYPE
 from ..service import exceptions as exc
 from ..service.roles import Roles
 from ..service.dependencies import (
@@ -21,6 +25,7 @@ from ..service.tokens import (
 )
 
 from .repos import VacanciesRepo
+from .. import config
 from . import schemas as sch
 
 
@@ -86,6 +91,39 @@ async def update(id: UUID,
     return sch.Update.Response.Body(id=vacancy_id)
 
 
+@router.get('/export',
+            name='Выгрузка вакансий',
+            responses=generate_openapi_responses(
+                exc.InvalidRequestError,
+                exc.InvalidTokenError,
+                exc.ExpiredTokenError,
+                exc.InvalidClientError
+                ),
+            response_class=StreamingResponse,
+            dependencies=[Depends(CheckRoles(Roles.manager, Roles.recruiter, Roles.admin, Roles.customer))],
+            openapi_extra={
+                'responses': {
+                    '200': {'content': {CSV_MEDIA_TYPE: {'schema': {'type': 'string', 'format': 'binary'}},
+                                        NDJSON_MEDIA_TYPE: {'schema': {'type': 'string', 'format': 'binary'}}}}
+                    }
+                }
+            )
+async def export(query: Query = Depends(sch.Export.Request.Query),
+                 session: AsyncSession = Depends(get_session),
+                 at: AccessToken = Depends(AccessJWTCookie())):
+    '''
+    Выгрузка всех вакансий компании по фильтрам списка <br>
+    Строка на вакансию: справочники и рекрутер - названиями, навыки - одной ячейкой через "; " <br>
+    Ответ передается по мере чтения из бд, объем выгрузки не ограничен
+    '''
+    
+    vacancies_repo = VacanciesRepo(session)
+    result = await vacancies_repo.export(company_id=at.company_id,
+                                         filters=query,
+                                         batch_size=config.EXPORT_BATCH_SIZE)
+    return export_response(session, result, query.format, 'vacancies')
+
+
 @router.get('/{id}',
              name='Получение данных вакансии',
              responses=generate_openapi_responses(
@@ -110,7 +148,7 @@ async def get_one(id: UUID,
     except sa_exc.NoResultFound:
         raise exc.InvalidClientError
     
-    return sch.GetOne.Response.Body(**vacancy.dict())
+    return ModelResponse(vacancy)
 
 
 @router.get('',
@@ -133,7 +171,37 @@ async def get_list(query: Query = Depends(sch.GetList.Request.Query),
     
     vacancies_repo = VacanciesRepo(session)
     vacancies = await vacancies_repo.get_list(company_id=at.company_id, filters=query)
-    return sch.GetList.Response.Body(vacancies=vacancies, count=len(vacancies))
+    return ModelResponse(sch.GetList.Response.Body.construct(vacancies=vacancies, count=len(vacancies)))
+
+
+@router.get('/{id}/matches',
+             name='Подбор кандидатов на вакансию',
+             responses=generate_openapi_responses(
+                 exc.InvalidRequestError,
+                 exc.InvalidTokenError,
+                 exc.ExpiredTokenError,
+                 exc.InvalidClientError
+                 ),
+             response_model=sch.GetMatches.Response.Body,
+             dependencies=[Depends(CheckRoles(Roles.manager, Roles.recruiter, Roles.admin))]
+             )
+async def get_matches(id: UUID,
+                      query: Query = Depends(sch.GetMatches.Request.Query),
+                      session: AsyncSession = Depends(get_session),
+                      at: AccessToken = Depends(AccessJWTCookie())):
+    '''
+    Кандидаты компании по убыванию соответствия вакансии: доля навыков вакансии,
+    которыми владеет кандидат (вес 0.7), совпадение должности, грейда и
+    минимальной зарплаты кандидата с бюджетом вакансии (по 0.1)
+    '''
+    
+    vacancies_repo = VacanciesRepo(session)
+    try:
+        matches = await vacancies_repo.get_matches(id, at.company_id, query)
+    except sa_exc.NoResultFound:
+        raise exc.InvalidClientError
+    
+    return ModelResponse(sch.GetMatches.Response.Body.construct(matches=matches, count=len(matches)))
 
 
 @router.delete('/{id}',
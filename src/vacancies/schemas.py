@@ -3,7 +3,8 @@ import typing as tp
 
 from pydantic import BaseModel, Field
 
-from ..service.pd_models import vacancy
+from ..service.fastapi_custom import query_lists
+from ..service.pd_models import vacancy, candidate_match, export
 
 
 class Create:
@@ -24,6 +25,7 @@ class GetOne:
 
 class GetList:
     class Request:
+        @query_lists
         class Query(vacancy.Filters):
             ...
             
@@ -34,6 +36,24 @@ class GetList:
             count: int
 
 
+class Export:
+    class Request:
+        @query_lists
+        class Query(export.Params, vacancy.Filters):
+            ...
+
+
+class GetMatches:
+    class Request:
+        class Query(candidate_match.Filters):
+            ...
+
+    class Response:
+        class Body(BaseModel):
+            matches: tp.List[candidate_match.Read] = Field(default_factory=list)
+            count: int
+
+
 class Update:
     class Request:
         class Body(vacancy.Update):
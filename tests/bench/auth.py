@@ -0,0 +1,57 @@
+"""
+Накладные расходы проверки access-токена на запрос: вызов зависимости
+AccessJWTCookie и чтение трех полей токена, как в обработчике с CheckRoles.
+
+Запуск из корня репозитория:
+    python -m tests.bench.auth
+Для сравнения воспроизводится прежний путь: отдельные декодирования для проверки
+структуры, срока и подписи и по декодированию на каждое чтение поля.
+"""
+import argparse
+import timeit
+import uuid
+
+from starlette.requests import Request
+
+from src import config
+from src.service.dependencies import AccessJWTCookie
+from src.service.tokens import AccessToken, AccessTokenFactory
+
+
+def make_request(raw_at: str) -> Request:
+    cookie = f'{config.ACCESS_TOKEN_NAME}={raw_at}'.encode()
+    return Request({'type': 'http', 'method': 'GET', 'path': '/', 'headers': [(b'cookie', cookie)]})
+
+
+def legacy(request: Request) -> None:
+    at = AccessToken(request.cookies[config.ACCESS_TOKEN_NAME])
+    assert at.check_structure() and at.check_exp()
+    assert at.check_sign(secret=config.jwt_env.SECRET, algorithm=config.JWT_ALG)
+    at.decode()['sub'], at.decode()['company_id'], at.decode()['role']
+
+
+def verify(request: Request) -> None:
+    AccessJWTCookie.cache.clear()
+    at = AccessJWTCookie()(request)
+    at.user_id, at.company_id, at.role
+
+
+def cached(request: Request) -> None:
+    at = AccessJWTCookie()(request)
+    at.user_id, at.company_id, at.role
+
+
+def main(number: int, repeat: int) -> None:
+    raw_at = str(AccessTokenFactory.create(uuid.uuid4(), 'admin', uuid.uuid4()))
+    request = make_request(raw_at)
+    for name, func in (('legacy: 6 decodes', legacy), ('verify: 1 decode', verify), ('cache hit', cached)):
+        best = min(timeit.repeat(lambda: func(request), number=number, repeat=repeat)) / number
+        print(f'{name:<20} {best * 1e6:8.1f} us')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Накладные расходы проверки access-токена')
+    parser.add_argument('--number', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    main(args.number, args.repeat)
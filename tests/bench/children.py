@@ -0,0 +1,71 @@
+"""
+PATCH /candidates/{id} на кандидате с большим числом дочерних записей:
+медиана времени запроса и число sql-запросов. Тело запроса чередует два набора
+строк, поэтому каждый PATCH удаляет, добавляет и обновляет записи.
+
+Запуск из корня репозитория (нужна бд из переменных окружения сервиса и
+демонстрационные данные, SEED_MOCKS=true):
+    python -m tests.bench.children --rows 5 25 100 400
+"""
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault('SEED_MOCKS', 'true')
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from src.main import app
+from src.service.database import engine
+from src.service.tokens import AccessTokenFactory
+from tests.conftest import MOCK_ADMIN_ID, MOCK_COMPANY_ID
+from tests.test_children import candidate_body
+
+
+def shifted_body(rows: int, shift: int) -> dict:
+    # половина строк совпадает с прошлым запросом, половина новая
+    body = candidate_body(rows + shift)
+    for key in ('contacts', 'work_places', 'notes'):
+        body[key] = body[key][shift:]
+    return body
+
+
+def main(sizes, repeat: int) -> None:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with TestClient(app) as client:
+        client.cookies.set('at', str(AccessTokenFactory.create(MOCK_ADMIN_ID, 'admin', MOCK_COMPANY_ID)))
+        event.listen(engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            for rows in sizes:
+                candidate_id = client.post('/api/v1/candidates', json=candidate_body(rows)).json()['id']
+                url = f'/api/v1/candidates/{candidate_id}'
+                durations = []
+                for attempt in range(repeat + 1):
+                    body = shifted_body(rows, rows // 2 * (attempt % 2))
+                    statements.clear()
+                    started = time.perf_counter()
+                    assert client.patch(url, json=body).status_code == 200
+                    durations.append(time.perf_counter() - started)
+                patch_statements = len(statements)
+                client.delete(url)
+                child_rows = sum(len(body[key]) for key in ('contacts', 'work_places', 'languages', 'notes', 'skills'))
+                # первый запрос прогревает кэши
+                print(f'{child_rows:>6} child rows  {patch_statements:>3} statements  '
+                      f'median {statistics.median(durations[1:]) * 1000:7.1f} ms')
+        finally:
+            event.remove(engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Время PATCH кандидата в зависимости от числа дочерних записей')
+    parser.add_argument('--rows', type=int, nargs='+', default=[5, 25, 100, 400],
+                        help='строк в каждой из коллекций contacts, work_places, notes')
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
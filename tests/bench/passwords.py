@@ -0,0 +1,84 @@
+"""
+Задержка event loop и время входа при одновременных проверках паролей.
+Пока идут concurrency проверок pbkdf2 (как в /auth/login), на loop каждую
+миллисекунду тикает задача, замеряющая опоздание: это задержка, которую
+получили бы все прочие запросы процесса.
+
+Запуск из корня репозитория:
+    python -m tests.bench.passwords --concurrency 20
+"""
+import argparse
+import asyncio
+import time
+import typing as tp
+
+from sqlalchemy_utils.types.password import Password
+
+from src.service import models as m
+from src.service.passwords import PasswordHasher
+
+
+TICK = 0.001
+SECRET = 'password'
+
+
+class Result(tp.NamedTuple):
+    max_lag: float
+    login_p50: float
+    login_p99: float
+
+
+def make_password() -> Password:
+    context = m.User.password.type.context
+    return Password(context.hash(SECRET), context=context)
+
+
+async def _ticker(stop: asyncio.Event, lags: tp.List[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - started - TICK)
+
+
+async def measure(concurrency: int, hasher: tp.Optional[PasswordHasher]) -> Result:
+    '''
+    :param hasher: пул проверки; None - проверка прямо в event loop, как до PasswordHasher
+    '''
+
+    password = make_password()
+
+    async def login(arrived: float) -> float:
+        # время входа считается от одновременного прихода запросов, включая ожидание очереди
+        if hasher is None:
+            assert password == SECRET
+        else:
+            assert await hasher.verify(password, SECRET)
+        return time.perf_counter() - arrived
+
+    stop, lags = asyncio.Event(), []
+    ticker = asyncio.create_task(_ticker(stop, lags))
+    await asyncio.sleep(TICK * 10)
+    arrived = time.perf_counter()
+    durations = sorted(await asyncio.gather(*(login(arrived) for _ in range(concurrency))))
+    stop.set()
+    await ticker
+    return Result(max(lags), durations[len(durations) // 2], durations[int(len(durations) * 0.99)])
+
+
+def main(concurrency: int, workers: int) -> None:
+    hasher = PasswordHasher(m.User.password.type.context, workers)
+    try:
+        for name, mode in (('inline', None), (f'pool, {workers} workers', hasher)):
+            result = asyncio.run(measure(concurrency, mode))
+            print(f'{name:<18} max loop lag {result.max_lag * 1000:7.1f} ms   '
+                  f'login p50 {result.login_p50 * 1000:7.1f} ms   p99 {result.login_p99 * 1000:7.1f} ms')
+    finally:
+        hasher.shutdown()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Задержка event loop при одновременных проверках паролей')
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=2)
+    args = parser.parse_args()
+    main(args.concurrency, args.workers)
@@ -0,0 +1,90 @@
+"""
+Рендер тела GET /candidates для больших списков: прежний путь FastAPI
+(проверка по response_model, jsonable_encoder, стандартный json) против
+ModelResponse. Строки читаются тем же CandidatesRepo.get_list, что и в
+обработчике, но без ограничения limit из запроса (не больше 500).
+
+Запуск из корня репозитория (нужна бд из переменных окружения сервиса;
+по умолчанию берется компания с наибольшим числом кандидатов):
+    python -m tests.bench.responses --rows 1000 10000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import typing as tp
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from sqlalchemy import func, select
+
+from src.candidates import schemas as sch
+from src.candidates.repos import CandidatesRepo
+from src.main import app
+from src.service import models as m
+from src.service.database import async_session
+from src.service.pd_models import candidate
+from src.service.responses import ModelResponse
+
+
+def find_route(path: str, method: str) -> APIRoute:
+    return next(route for route in app.routes
+                if isinstance(route, APIRoute) and route.path == path and method in route.methods)
+
+
+async def largest_company() -> UUID:
+    async with async_session() as session:
+        return await session.scalar(select(m.Candidate.company_id)
+                                    .where(m.Candidate.is_deleted.is_(False))
+                                    .group_by(m.Candidate.company_id)
+                                    .order_by(func.count().desc())
+                                    .limit(1))
+
+
+async def load_body(company_id: UUID, rows: int) -> sch.GetList.Response.Body:
+    async with async_session() as session:
+        candidates, _ = await CandidatesRepo(session).get_list(company_id=company_id,
+                                                               filters=candidate.Filters(),
+                                                               limit=rows)
+    return sch.GetList.Response.Body.construct(candidates=candidates, count=len(candidates), next_cursor=None)
+
+
+def median_ms(func: tp.Callable[[], bytes], repeat: int) -> tp.Tuple[float, bytes]:
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rendered = func()
+        durations.append(time.perf_counter() - started)
+    return statistics.median(durations) * 1000, rendered
+
+
+async def main(sizes: tp.List[int], repeat: int, company_id: tp.Optional[UUID]) -> None:
+    route = find_route('/api/v1/candidates', 'GET')
+    company_id = company_id or await largest_company()
+
+    for rows in sizes:
+        body = await load_body(company_id, rows)
+
+        durations = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            content = await serialize_response(field=route.response_field, response_content=body)
+            legacy = JSONResponse(content).body
+            durations.append(time.perf_counter() - started)
+        legacy_ms = statistics.median(durations) * 1000
+
+        model_ms, rendered = median_ms(lambda: ModelResponse(body).body, repeat)
+        # ModelResponse обязан отдавать те же байты, что и путь через response_model
+        assert rendered == legacy, 'ModelResponse differs from the response_model output'
+        print(f'{len(body.candidates):>6} candidates  {len(rendered) / 2 ** 20:6.1f} MB   '
+              f'response_model {legacy_ms:8.1f} ms   ModelResponse {model_ms:7.1f} ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Рендер списка кандидатов: response_model против ModelResponse')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--company', type=UUID, default=None)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat, args.company))
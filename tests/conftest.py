@@ -0,0 +1,51 @@
+"""
+Тесты с бд используют PostgreSQL из тех же переменных окружения, что и сервис,
+и демонстрационные данные (SEED_MOCKS), которые приложение загружает при старте.
+Без доступной бд такие тесты пропускаются.
+"""
+import os
+
+os.environ.setdefault('SEED_MOCKS', 'true')
+os.environ.setdefault('METRICS_TOKEN', 'test-metrics-token')
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+
+# администратор и компания из src/service/mocks.py
+MOCK_ADMIN_ID = '00000000-0000-0000-0000-000000000001'
+MOCK_COMPANY_ID = '00000000-0000-0000-0000-000000000000'
+
+
+@pytest.fixture(scope='session')
+def client():
+    from src.main import app
+    from src.service.tokens import AccessTokenFactory
+
+    test_client = TestClient(app)
+    try:
+        test_client.__enter__()
+    except OSError as e:
+        pytest.skip(f'PostgreSQL недоступен: {e}')
+    test_client.cookies.set('at', str(AccessTokenFactory.create(MOCK_ADMIN_ID, 'admin', MOCK_COMPANY_ID)))
+    yield test_client
+    test_client.__exit__(None, None, None)
+
+
+@pytest.fixture
+def statements(client):
+    '''
+    SQL-запросы, выполненные за время теста
+    '''
+
+    from src.service.database import engine
+
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
+    yield executed
+    event.remove(engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
@@ -0,0 +1,47 @@
+import copy
+
+import pytest
+
+from src.service.pd_models import candidate
+
+
+# навык из src/service/mocks.py
+MOCK_SKILL_ID = '00000000-0000-0000-0000-000000000012'
+CHILD_TABLES = ('candidate_contacts', 'candidate_work_places', 'candidate_language_ability',
+                'candidate_notes', 'candidate_skills')
+
+
+def candidate_body(rows):
+    body = copy.deepcopy(candidate.Create.Config.schema_extra['example'])
+    body['contacts'] = [{'type_code': 1, 'value': f'7978{i:07}', 'is_priority': False} for i in range(rows)]
+    body['work_places'] = [{'position': f'Должность {i}', 'company': 'SpaceX', 'work_from': '2019-01-01',
+                            'work_to': '2020-01-01', 'is_actual': False} for i in range(rows)]
+    body['notes'] = [{'note': f'Примечание {i}'} for i in range(rows)]
+    body['skills'] = [{'skill_id': MOCK_SKILL_ID}]
+    return body
+
+
+@pytest.fixture
+def candidate_id(client):
+    response = client.post('/api/v1/candidates', json=candidate_body(1))
+    assert response.status_code == 200
+    yield response.json()['id']
+    client.delete(f'/api/v1/candidates/{response.json()["id"]}')
+
+
+def patch(client, statements, candidate_id, rows):
+    statements.clear()
+    assert client.patch(f'/api/v1/candidates/{candidate_id}', json=candidate_body(rows)).status_code == 200
+    return list(statements)
+
+
+def test_candidate_update_statements_do_not_depend_on_child_rows(client, statements, candidate_id):
+    patch(client, statements, candidate_id, 1)
+    few = patch(client, statements, candidate_id, 2)
+    many = patch(client, statements, candidate_id, 60)
+
+    assert len(many) == len(few)
+    # на дочернюю таблицу - удаление отсутствующих и один upsert остальных
+    for table in CHILD_TABLES:
+        assert sum(statement.startswith(f'DELETE FROM {table} ') for statement in many) == 1, table
+        assert sum(statement.startswith(f'INSERT INTO {table} ') for statement in many) == 1, table
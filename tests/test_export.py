@@ -0,0 +1,57 @@
+import asyncio
+import csv
+import io
+import json
+
+from src.service.export import iter_csv, iter_ndjson
+
+
+class StubResult:
+    """
+    Заменяет AsyncResult из AsyncSession.stream: ключи и пачки строк
+    """
+
+    def __init__(self, keys, *partitions):
+        self._keys = keys
+        self._partitions = partitions
+
+    def keys(self):
+        return self._keys
+
+    async def partitions(self):
+        for rows in self._partitions:
+            yield rows
+
+
+def read(chunks) -> bytes:
+    async def collect():
+        return b''.join([chunk async for chunk in chunks])
+    return asyncio.run(collect())
+
+
+def test_csv_escapes_formulas():
+    formulas = ['=HYPERLINK("http://evil","x")', '+7 999 123-45-67', '-2+3', '@SUM(A1)', '\tcmd', '\rcmd']
+    plain = ['Иванов', 'ООО "Рога; копыта"', 'a=b', '', None, -5, 100000]
+    result = StubResult(('value',), [(value,) for value in formulas], [(value,) for value in plain])
+
+    content = read(iter_csv(result))
+
+    assert content.startswith('\ufeff'.encode())
+    rows = list(csv.reader(io.StringIO(content.decode('utf-8-sig'), newline='')))
+    assert rows[0] == ['value']
+    assert [row[0] for row in rows[1:]] == ["'" + value for value in formulas] \
+                                           + ['Иванов', 'ООО "Рога; копыта"', 'a=b', '', '', '-5', '100000']
+
+
+def test_csv_header_without_rows():
+    content = read(iter_csv(StubResult(('id', 'last_name'))))
+
+    assert content.decode('utf-8-sig') == 'id,last_name\r\n'
+
+
+def test_ndjson_keeps_values():
+    result = StubResult(('id', 'notes'), [(1, '=1+1'), (2, None)])
+
+    lines = read(iter_ndjson(result)).splitlines()
+
+    assert [json.loads(line) for line in lines] == [{'id': 1, 'notes': '=1+1'}, {'id': 2, 'notes': None}]
@@ -0,0 +1,31 @@
+import json
+
+from tests.test_children import candidate_body
+
+
+NDJSON_HEADERS = {'Content-Type': 'application/x-ndjson'}
+
+
+def test_import_isolates_rows_rejected_by_db(client):
+    # записи 2 и 6 проходят проверку схемы, но нарушают внешний ключ: пачку
+    # отвергает бд, и savepoint делится пополам, пока не останутся только они
+    rows = [candidate_body(1) for _ in range(7)]
+    rows[1]['family_status_code'] = rows[5]['family_status_code'] = 999_999
+    lines = [json.dumps(row) for row in rows]
+    lines[3] = '{"first_name": "Без фамилии"}'
+
+    response = client.post('/api/v1/candidates/import', content='\n'.join(lines), headers=NDJSON_HEADERS)
+    results = [json.loads(line) for line in response.text.splitlines()]
+    ids = {result['line']: result['id'] for result in results if 'id' in result}
+    try:
+        assert response.status_code == 200
+        assert results[-1] == {'imported': 4, 'failed': 3}
+        assert set(ids) == {1, 3, 5, 7}
+        errors = {result['line']: result['detail'] for result in results if 'error' in result}
+        assert set(errors) == {2, 4, 6}
+        assert 'family_status' in errors[2] and 'family_status' in errors[6]
+        for id_ in ids.values():
+            assert client.get(f'/api/v1/candidates/{id_}').status_code == 200
+    finally:
+        for id_ in ids.values():
+            client.delete(f'/api/v1/candidates/{id_}')
@@ -0,0 +1,172 @@
+import asyncio
+import typing as tp
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
+
+from sqlalchemy import text
+
+from src.vacancies.matching import CompanyIndex, MatchIndexes
+
+
+# вакансия из src/service/mocks.py
+MOCK_VACANCY_ID = '00000000-0000-0000-0000-000000000030'
+
+
+def set_deleted(client, candidate_id, is_deleted):
+    '''
+    Меняет is_deleted, не трогая updated_at: индекс подбора изменения не увидит
+    '''
+
+    from src.service.database import engine
+
+    async def run():
+        async with engine.begin() as conn:
+            await conn.execute(text('UPDATE candidates SET is_deleted = :is_deleted, updated_at = updated_at '
+                                    'WHERE id = :id'), {'id': candidate_id, 'is_deleted': is_deleted})
+
+    client.portal.call(run)
+
+
+def test_matches_fill_limit_when_indexed_candidate_is_gone(client):
+    url = f'/api/v1/vacancies/{MOCK_VACANCY_ID}/matches?limit=3'
+    before = [match['candidate']['id'] for match in client.get(url).json()['matches']]
+    assert len(before) == 3
+
+    set_deleted(client, before[0], True)
+    try:
+        after = [match['candidate']['id'] for match in client.get(url).json()['matches']]
+    finally:
+        set_deleted(client, before[0], False)
+
+    assert len(after) == 3
+    assert after[:2] == before[1:]
+
+
+class Row(tp.NamedTuple):
+    id: UUID
+    position_id: UUID
+    grade_id: tp.Optional[UUID]
+    min_salary: tp.Optional[int]
+    is_deleted: bool
+    created_at: datetime
+    updated_at: datetime
+
+
+POSITION, OTHER_POSITION, GRADE = uuid4(), uuid4(), uuid4()
+SKILLS = [uuid4() for _ in range(7)]
+NOW = datetime(2026, 1, 1)
+
+
+def row(name, created, position=OTHER_POSITION, grade=None, salary=200, is_deleted=False, updated=None):
+    created_at = NOW - timedelta(days=created)
+    return Row(UUID(int=name), position, grade, salary, is_deleted, created_at, updated or created_at)
+
+
+def build(rows, skills=()):
+    index = CompanyIndex()
+    index.apply(sorted(rows, key=lambda r: (r.created_at, r.id), reverse=True), skills)
+    return index
+
+
+def ranked(index, limit=10):
+    return [(match.candidate_id.int, match.score) for match in index.rank(SKILLS, POSITION, GRADE, 100, limit)]
+
+
+def test_count_equals():
+    # суммы кандидатов 0..3 равны их номерам: разряд 0 - нечетные, разряд 1 - 2 и 3
+    counter = [0b1010, 0b1100]
+
+    assert CompanyIndex._count_equals(counter, 0, 0b1111) == 0b0001
+    assert CompanyIndex._count_equals(counter, 2, 0b1111) == 0b0100
+    assert CompanyIndex._count_equals(counter, 3, 0b0111) == 0
+    assert CompanyIndex._count_equals(counter, 4, 0b1111) == 0
+
+
+def test_rank_orders_equal_scores_newest_first_across_criteria():
+    # из 7 навыков один совпавший навык стоит столько же, сколько любой один критерий
+    rows = [row(1, created=4, position=POSITION),
+            row(2, created=1, grade=GRADE),
+            row(3, created=3, salary=50),
+            row(4, created=2),
+            row(5, created=0)]
+    index = build(rows, [(SKILLS[0], [UUID(int=4)])])
+
+    assert ranked(index) == [(2, 0.1), (4, 0.1), (3, 0.1), (1, 0.1), (5, 0.0)]
+    assert ranked(index, limit=2) == [(2, 0.1), (4, 0.1)]
+
+
+def test_rank_merges_added_candidates_by_created_at():
+    index = build([row(1, created=4, position=POSITION), row(2, created=1, grade=GRADE)])
+    index.apply([row(3, created=2, salary=50), row(4, created=0, position=POSITION)], [])
+
+    assert ranked(index) == [(4, 0.1), (2, 0.1), (3, 0.1), (1, 0.1)]
+
+
+def test_apply_updates_and_deletes():
+    index = build([row(1, created=2, position=POSITION), row(2, created=1)], [(SKILLS[0], [UUID(int=1)])])
+    assert ranked(index) == [(1, 0.2), (2, 0.0)]
+
+    index.apply([row(1, created=2), row(2, created=1, grade=GRADE)], [(SKILLS[1], [UUID(int=2)])])
+    assert ranked(index) == [(2, 0.2), (1, 0.0)]
+
+    index.apply([row(2, created=1, is_deleted=True)], [])
+    assert ranked(index) == [(1, 0.0)]
+    assert index.size == 1
+
+
+class MemoryIndexes(MatchIndexes):
+    '''
+    Кандидаты и навыки берутся из памяти вместо бд
+    '''
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.rows: tp.Dict[UUID, Row] = {}
+        self.skills: tp.Dict[UUID, tp.List[UUID]] = {}
+
+    async def _load_candidates(self, session, criteria):
+        # как и бд, отдает строки не старее watermark - overlap (отбор по criteria не разбирается)
+        return sorted(self.rows.values(), key=lambda r: (r.created_at, r.id), reverse=True)
+
+    async def _load_skills(self, session, criteria):
+        return list(self.skills.items())
+
+
+def test_refresh_applies_only_changed_rows():
+    indexes = MemoryIndexes(maxsize=2, ttl=3600, overlap=timedelta(seconds=5))
+    company_id = uuid4()
+    indexes.rows = {r.id: r for r in (row(1, created=0, position=POSITION, updated=NOW),
+                                      row(2, created=1, updated=NOW))}
+
+    index = asyncio.run(indexes.get(None, company_id))
+    assert (indexes.builds, indexes.refreshes) == (1, 0)
+    assert index.watermark == NOW
+
+    # те же строки внутри окна overlap повторно не применяются
+    asyncio.run(indexes.get(None, company_id))
+    assert indexes.refreshes == 0
+
+    # строка, закоммиченная позже более новой, попадает в окно и применяется
+    late = NOW - timedelta(seconds=1)
+    indexes.rows[UUID(int=2)] = row(2, created=1, grade=GRADE, updated=late)
+    indexes.rows[UUID(int=1)] = row(1, created=0, is_deleted=True, updated=NOW + timedelta(seconds=1))
+    index = asyncio.run(indexes.get(None, company_id))
+
+    assert indexes.refreshes == 1
+    assert ranked(index) == [(2, 0.1)]
+    assert index.watermark == NOW + timedelta(seconds=1)
+    assert set(index.recent) == {UUID(int=1), UUID(int=2)}
+
+
+def test_evicted_company_releases_lock():
+    indexes = MemoryIndexes(maxsize=1, ttl=3600, overlap=timedelta(seconds=5))
+    first, second = uuid4(), uuid4()
+
+    async def run():
+        await indexes.get(None, first)
+        await indexes.get(None, second)
+
+    asyncio.run(run())
+
+    assert indexes.stats()['companies'] == 1
+    assert set(indexes._locks) == {second}
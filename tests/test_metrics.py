@@ -0,0 +1,21 @@
+import os
+
+import pytest
+
+
+@pytest.mark.parametrize('headers', [
+    {},
+    {'Authorization': 'Bearer wrong'},
+    {'Authorization': os.environ['METRICS_TOKEN']},
+])
+def test_metrics_require_token(client, headers):
+    response = client.get('/metrics', headers=headers)
+
+    assert response.status_code == 401
+
+
+def test_metrics_with_token(client):
+    response = client.get('/metrics', headers={'Authorization': f'Bearer {os.environ["METRICS_TOKEN"]}'})
+
+    assert response.status_code == 200
+    assert 'http_requests_in_flight' in response.text
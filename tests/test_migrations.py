@@ -0,0 +1,40 @@
+import os
+
+from src.config import MIGRATIONS_PATH
+from src.service.migrations import POST_DEPLOY_DIR, migration_files, migration_name, split_statements
+
+
+def test_split_statements():
+    sql = """-- комментарий; не оператор
+SELECT 'a;''b';
+DO $$ BEGIN PERFORM 1; COMMIT; END $$;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix ON t (a); -- хвост
+"""
+
+    assert split_statements(sql) == [
+        "SELECT 'a;''b'",
+        'DO $$ BEGIN PERFORM 1; COMMIT; END $$',
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix ON t (a)',
+    ]
+
+
+def test_migrations_build_indexes_concurrently():
+    # вне транзакции обычный CREATE INDEX заблокировал бы запись в таблицу на время построения
+    for path in migration_files(MIGRATIONS_PATH):
+        for statement in split_statements(open(path).read()):
+            if statement.upper().startswith(('CREATE INDEX', 'DROP INDEX')):
+                assert 'CONCURRENTLY' in statement.upper(), (path, statement)
+
+
+def test_migration_names():
+    assert migration_name('data/migrations/0002_x.sql') == 'migrations/0002_x.sql'
+    assert migration_name('data/migrations/post_deploy/0001_y.sql') == 'migrations/post_deploy/0001_y.sql'
+
+
+def test_post_deploy_migrations_are_separate():
+    # основной шаг выполняется до развертывания и не должен захватывать post_deploy
+    names = [migration_name(path) for path in migration_files(MIGRATIONS_PATH)]
+    post_deploy = migration_files(os.path.join(MIGRATIONS_PATH, POST_DEPLOY_DIR))
+
+    assert post_deploy
+    assert not any(POST_DEPLOY_DIR in name for name in names)
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from src.service.ndjson import iter_lines
+
+
+def split(chunks, max_line_bytes=16):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def collect():
+        return [line async for line in iter_lines(stream(), max_line_bytes)]
+
+    return asyncio.run(collect())
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize('chunks', [[b'{"a":1}\r', b'\n{"b":2}\r\n'],
+                                    [b'{"a":1}', b'\r\n{"b":2}', b'\r', b'\n'],
+                                    [b'{"a"', b':1}\n{"b":2}\n']])
+def test_line_split_across_chunks(chunks):
+    assert split(chunks) == [(1, b'{"a":1}'), (2, b'{"b":2}')]
+
+
+def test_crlf_does_not_count_towards_limit():
+    line = b'x' * 16
+    assert split([line + b'\r', b'\n' + line + b'\r\n']) == [(1, line), (2, line)]
+    assert split([line + b'x\r', b'\n']) == [(1, None)]
+
+
+def test_long_line_spanning_several_chunks():
+    chunks = [b'ok\n0123456789', b'0123456789', b'01234', b'56789\r', b'\nnext\n']
+
+    assert split(chunks) == [(1, b'ok'), (2, None), (3, b'next')]
+    # хвост длинной строки без перевода строки в конце потока
+    assert split(chunks[:4]) == [(1, b'ok'), (2, None)]
+
+
+def test_trailing_line_without_newline():
+    assert split([b'{"a":1}\n{"b"', b':2}']) == [(1, b'{"a":1}'), (2, b'{"b":2}')]
+    assert split([b'{"a":1}\r\n{"b":2}\r']) == [(1, b'{"a":1}'), (2, b'{"b":2}')]
+
+
+def test_line_numbers_count_skipped_blank_lines():
+    assert split([b'\n\r\n  \n{"a":1}\n', b'\n', b'\t\r\n{"b":2}']) == [(4, b'{"a":1}'), (7, b'{"b":2}')]
+
+
+def test_result_does_not_depend_on_chunk_size():
+    data = b'\r\n{"a":1}\r\n' + b'y' * 40 + b'\n\n{"b":2}\n' + b'z' * 17 + b'\r\n' + b'w' * 16
+    expected = [(2, b'{"a":1}'), (3, None), (5, b'{"b":2}'), (6, None), (7, b'w' * 16)]
+
+    for size in range(1, len(data) + 1):
+        assert split(chunked(data, size)) == expected, size
@@ -0,0 +1,19 @@
+import asyncio
+
+from src.service import models as m
+from src.service.passwords import PasswordHasher
+from tests.bench.passwords import measure
+
+
+def test_loop_lag_stays_bounded_while_pool_is_busy():
+    concurrency = 8
+    hasher = PasswordHasher(m.User.password.type.context, max_workers=2)
+    try:
+        inline = asyncio.run(measure(concurrency, None))
+        pooled = asyncio.run(measure(concurrency, hasher))
+    finally:
+        hasher.shutdown()
+
+    # проверки в loop блокируют его на все concurrency проверок подряд,
+    # через пул loop не должен стоять даже на время одной из них
+    assert pooled.max_lag < inline.max_lag / 4
@@ -0,0 +1,57 @@
+"""
+Количество запросов к бд на чтение фиксирует профили загрузки (service.loaders):
+новая связь в модели ответа без профиля либо падает на lazy='raise',
+либо добавляет запросы на каждую строку списка.
+"""
+import pytest
+
+
+# основной запрос и по одному на каждую коллекцию кандидата:
+# contacts, languages, notes, skills, work_places
+CANDIDATE_QUERIES = 6
+# основной запрос и skills
+VACANCY_QUERIES = 2
+
+
+def get(client, statements, url):
+    # первый запрос прогревает кэши токенов и справочников
+    assert client.get(url).status_code == 200
+    statements.clear()
+    response = client.get(url)
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.fixture(scope='module')
+def ids(client):
+    return {
+        'candidate': client.get('/api/v1/candidates?limit=1').json()['candidates'][0]['id'],
+        'vacancy': client.get('/api/v1/vacancies').json()['vacancies'][0]['id'],
+        'interview': client.get('/api/v1/interviews').json()['interviews'][0]['id'],
+    }
+
+
+@pytest.mark.parametrize('url, field', [
+    ('/api/v1/candidates?limit=20', 'candidates'),
+    ('/api/v1/vacancies', 'vacancies'),
+    ('/api/v1/interviews', 'interviews'),
+])
+def test_list_query_count_does_not_depend_on_rows(client, statements, url, field):
+    expected = {'candidates': CANDIDATE_QUERIES, 'vacancies': VACANCY_QUERIES, 'interviews': 1}[field]
+
+    body = get(client, statements, url)
+
+    assert len(body[field]) > 1, 'на одной строке лишние запросы на строку не видны'
+    assert len(statements) == expected, statements
+
+
+@pytest.mark.parametrize('entity, url, expected', [
+    ('candidate', '/api/v1/candidates/{}', CANDIDATE_QUERIES),
+    ('vacancy', '/api/v1/vacancies/{}', VACANCY_QUERIES),
+    # собеседование с кандидатом и вакансией одним запросом, их коллекции - отдельными
+    ('interview', '/api/v1/interviews/{}', 1 + (CANDIDATE_QUERIES - 1) + (VACANCY_QUERIES - 1)),
+])
+def test_get_one_query_count(client, statements, ids, entity, url, expected):
+    get(client, statements, url.format(ids[entity]))
+
+    assert len(statements) == expected, statements
@@ -0,0 +1,63 @@
+import inspect
+import time
+
+import pytest
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+from src.service import instrumentation
+from src.service.responses import ModelResponse
+
+
+def test_model_response_render_counts_as_serialize():
+    stats = instrumentation.RequestStats()
+    token = instrumentation._current_stats.set(stats)
+    try:
+        stats.handler_started_at = stats.started_at
+        ModelResponse([{'id': i, 'name': 'x' * 100} for i in range(10_000)])
+        stats.handler_finished_at = stats.response_started_at = time.perf_counter()
+    finally:
+        instrumentation._current_stats.reset(token)
+
+    assert stats.render_time > 0
+    assert stats.serialize_time == pytest.approx(stats.render_time)
+    assert stats.handler_time + stats.render_time == pytest.approx(
+        stats.handler_finished_at - stats.handler_started_at)
+
+
+@pytest.mark.parametrize('url', ['/api/v1/departments', '/api/v1/grades', '/api/v1/positions'])
+def test_refs_list_etag(client, url):
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert response.headers['cache-control'] == 'private, no-cache'
+    assert client.get(url, headers={'If-None-Match': response.headers['etag']}).status_code == 304
+
+
+def _model_fields(model, seen):
+    if model in seen:
+        return
+    seen.add(model)
+    for field in model.__fields__.values():
+        yield model, field
+        for sub_field in [field, *(field.sub_fields or ())]:
+            if isinstance(sub_field.type_, type) and issubclass(sub_field.type_, BaseModel):
+                yield from _model_fields(sub_field.type_, seen)
+
+
+def test_model_response_routes_have_no_aliases_or_excludes():
+    # ModelResponse пишет поля модели как есть: алиасы, include/exclude и exclude_*
+    # маршрута или схемы в ответ бы не попали, и он разошелся бы с документацией
+    from src.main import app
+
+    routes = [route for route in app.routes
+              if isinstance(route, APIRoute) and 'ModelResponse(' in inspect.getsource(route.endpoint)]
+    assert routes
+
+    for route in routes:
+        assert route.response_model_include is None and route.response_model_exclude is None, route.path
+        assert not (route.response_model_exclude_unset or route.response_model_exclude_defaults
+                    or route.response_model_exclude_none), route.path
+        for model, field in _model_fields(route.response_model, set()):
+            assert field.alias == field.name, (route.path, model, field.name)
+            assert field.field_info.exclude is None and field.field_info.include is None, (route.path, model, field.name)
@@ -0,0 +1,22 @@
+from uuid import UUID, uuid4
+
+from src.skills.cache import SkillsCache
+
+
+def test_company_id_str_and_uuid_share_entries():
+    cache = SkillsCache(maxsize=10, ttl=60)
+    company_id, skill_id = uuid4(), uuid4()
+
+    cache.set_many(str(company_id), {'Python': skill_id})
+
+    assert cache.get_many(company_id, ['Python']) == {'Python': skill_id}
+    assert cache.get_many(str(company_id).upper(), ['Python']) == {'Python': skill_id}
+    assert cache.stats()['size'] == 1
+
+
+def test_companies_do_not_share_entries():
+    cache = SkillsCache(maxsize=10, ttl=60)
+
+    cache.set_many(uuid4(), {'Python': uuid4()})
+
+    assert cache.get_many(UUID(int=0), ['Python']) == {}